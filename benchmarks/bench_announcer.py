@@ -0,0 +1,134 @@
+"""Announcements per minute: stable-set check vs the Announcer state machine
+
+Usage (from the repository root):
+    python benchmarks/bench_announcer.py [--frames 3000]
+
+Synthetic detection sequences at 10 detector frames/s: a person in view
+the whole time with 10% missed detections, cars passing every 20 s,
+a dog appearing twice and single-frame false positives. The previous
+policy (announce every label whenever the last three frames share one)
+is compared with Announcer on phrases queued and update time. The
+scripted checks at the start pin down the state machine's behaviour.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system"))
+from announcer import Announcer  # noqa: E402
+
+FPS = 10
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StableSetPolicy:
+    """The previous YOLODetector.should_announce + caller, for comparison"""
+
+    def __init__(self, history=10, max_objects=3):
+        self.last_detections = deque(maxlen=history)
+        self.max_objects = max_objects
+
+    def update(self, labels):
+        if not labels:
+            return []
+        self.last_detections.append(set(labels))
+        if len(self.last_detections) < 3:
+            return []
+        if not set.intersection(*list(self.last_detections)[-3:]):
+            return []
+        return list(set(labels))[:self.max_objects]
+
+
+def sequence(frames, seed=0):
+    """Detected labels per frame"""
+    rng = np.random.default_rng(seed)
+    noise = ("cup", "chair", "tvmonitor", "bottle")
+    for i in range(frames):
+        t = i / FPS
+        labels = []
+        if rng.random() > 0.1:
+            labels.append("person")
+        if t % 20 < 4:
+            labels.append("car")
+        if 30 <= t < 45 or 120 <= t < 125:
+            labels.append("dog")
+        if rng.random() < 0.05:
+            labels.append(noise[rng.integers(len(noise))])
+        yield labels
+
+
+def check_behaviour():
+    clock = FakeClock()
+    a = Announcer(enter_frames=3, exit_frames=2, cooldown=10.0, priority=("person", "dog"), max_objects=1,
+                  clock=clock)
+
+    # Enters on the third consecutive frame, once
+    assert a.update(["cup"]) == [] and a.update(["cup"]) == []
+    assert a.update(["cup"]) == ["cup"]
+    assert a.update(["cup"]) == []
+    # A single miss does not leave, a broken entry streak starts over
+    assert a.update([]) == [] and a.present() == ["cup"]
+    assert a.update(["dog"]) == [] and a.update([]) == [] and a.present() == []
+    # Priority order, the rest waits for the next update
+    for _ in range(2):
+        a.update(["dog", "person"])
+    assert a.update(["dog", "person"]) == ["person"]
+    assert a.update(["dog", "person"]) == ["dog"]
+    # Leaving and coming back inside the cooldown stays silent
+    for _ in range(2):
+        a.update([])
+    clock.now = 5.0
+    assert [a.update(["person"]) for _ in range(3)] == [[], [], []] and a.suppressed == 1
+    # After the cooldown it is announced again
+    for _ in range(2):
+        a.update([])
+    clock.now = 20.0
+    assert [a.update(["person"]) for _ in range(3)] == [[], [], ["person"]]
+    print("behaviour checks passed")
+
+
+def run(policy, frames, clock=None):
+    phrases = labels_spoken = 0
+    elapsed = 0.0
+    for i, labels in enumerate(sequence(frames)):
+        if clock is not None:
+            clock.now = i / FPS
+        start = time.perf_counter()
+        spoken = policy.update(labels)
+        elapsed += time.perf_counter() - start
+        if spoken:
+            phrases += 1
+            labels_spoken += len(spoken)
+    return phrases, labels_spoken, 1e6 * elapsed / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=3000)
+    args = parser.parse_args()
+
+    check_behaviour()
+    minutes = args.frames / FPS / 60
+    clock = FakeClock()
+    for name, policy, policy_clock in (
+        ("stable set", StableSetPolicy(), None),
+        ("announcer", Announcer(clock=clock, priority=("person", "car", "dog")), clock),
+    ):
+        phrases, labels, us = run(policy, args.frames, policy_clock)
+        print(f"{name:<12} {phrases:5d} phrases ({phrases / minutes:6.1f}/min), {labels:5d} labels, "
+              f"{us:5.2f} us/update")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Resolution cascade vs fixed input sizes: cost per frame and recall against fixed 608
+
+Usage (from the repository root, with yolo-coco/ downloaded):
+    python benchmarks/bench_cascade.py [recording.mp4 | image_dir] [--frames 200]
+        [--set NAME=VALUE ...]
+
+The test set (a recording, a directory of images, or generated frames
+when omitted) is decoded into memory once, then every mode runs over
+the same frames:
+
+    low        fixed CASCADE_LOW_SIZE
+    cascade    detect_cascade() without tracks
+    + tracks   detect_cascade() fed the boxes of an IoUTracker
+    high       fixed CASCADE_HIGH_SIZE, the reference
+
+Recall is the share of reference detections matched by a same-class
+detection with IoU >= 0.5, overall and for small objects (under 32x32
+frame pixels). Escalation counts per reason are listed for the cascade.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_roi import matched, survivors  # noqa: E402
+from bench_stages import SYSTEM_DIR, SyntheticSource, parse_override, working_directory  # noqa: E402
+
+SMALL_AREA = 32 * 32
+
+
+def load_frames(source, count):
+    if source is None:
+        synthetic = SyntheticSource(count)
+        return [synthetic.read_frame()[1] for _ in range(count)]
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, "*")))
+        frames = (cv2.imread(path) for path in paths)
+        return [frame for frame in frames if frame is not None][:count]
+    cap = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run(detector, frames, mode, tracker=None):
+    size = {"low": detector.config.CASCADE_LOW_SIZE, "high": detector.config.CASCADE_HIGH_SIZE}.get(mode)
+    results = []
+    start = time.perf_counter()
+    for frame in frames:
+        if size is not None:
+            result = detector._detect_full(frame, size)
+        else:
+            expected = tracker.results()[0] if tracker is not None else ()
+            result = detector.detect_cascade(frame, expected)
+            if tracker is not None:
+                tracker.update(*result[:4])
+        results.append(result)
+    return results, 1000 * (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", help="video file or image directory, generated frames if omitted")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Config override, value parsed as JSON when possible")
+    args = parser.parse_args()
+    source = os.path.abspath(args.source) if args.source else None
+
+    sys.path.insert(0, SYSTEM_DIR)
+    from config import Config
+    from tracker import IoUTracker, iou_matrix
+    from yolo_detector import YOLODetector
+
+    config = Config()
+    config.MOTION_GATING = False
+    config.ROI_MODE = False
+    config.CASCADE_MODE = True
+    for name, value in dict(parse_override(text) for text in args.set).items():
+        setattr(config, name, value)
+    with working_directory(SYSTEM_DIR):
+        detector = YOLODetector(config)
+
+    frames = load_frames(source, args.frames)
+    if not frames:
+        print("No frames read")
+        return
+    H, W = frames[0].shape[:2]
+
+    reference, high_ms = run(detector, frames, "high")
+    references = []
+    total = small_total = 0
+    for result in reference:
+        boxes, ids = survivors(result)
+        is_small = boxes[:, 2] * boxes[:, 3] < SMALL_AREA
+        references.append(((boxes, ids), (boxes[is_small], ids[is_small])))
+        total += len(ids)
+        small_total += int(is_small.sum())
+    print(f"{len(frames)} frames of {W}x{H}, {total} reference detections ({small_total} small) "
+          f"at {config.CASCADE_HIGH_SIZE}")
+
+    print(f"{'mode':<10} {'ms/frame':>9} {'cost':>6} {'recall':>7} {'small':>7} {'escalated':>10}")
+    for mode in ("low", "cascade", "+ tracks", "high"):
+        for reason in detector.cascade_escalations:
+            detector.cascade_escalations[reason] = 0
+        tracker = IoUTracker(config.TRACK_IOU_THRESHOLD, config.TRACK_MAX_MISSES, config.TRACK_MIN_HITS)
+        if mode == "high":
+            results, ms = reference, high_ms
+        else:
+            results, ms = run(detector, frames, mode, tracker if mode == "+ tracks" else None)
+
+        hits = small_hits = 0
+        for result, (everything, small) in zip(results, references):
+            hits += matched(everything, survivors(result), iou_matrix)
+            small_hits += matched(small, survivors(result), iou_matrix)
+        recall = hits / total if total else float("nan")
+        small_recall = small_hits / small_total if small_total else float("nan")
+        escalated = "-"
+        if mode in ("cascade", "+ tracks"):
+            counts = detector.cascade_escalations
+            escalated = f"{100 * sum(counts.values()) / len(frames):.0f}%"
+            escalated += " (" + ", ".join(f"{reason} {count}" for reason, count in counts.items()) + ")"
+        print(f"{mode:<10} {ms:9.2f} {ms / high_ms:6.2f} {recall:7.1%} {small_recall:7.1%} {escalated:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Micro-benchmark: per-row Python decode loop vs vectorized decode_outputs
+
+Also reports what the objectness pre-filter, a CLASS_ALLOWLIST of four
+classes and dropping the small-object head (YOLO_HEADS) save over the
+previous best-score filter.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system"))
+from postprocess import decode_outputs  # noqa: E402
+
+
+def make_outputs(input_size=320, num_classes=80, seed=0):
+    """Synthetic YOLOv3 heads with the same shapes and score sparsity as real output"""
+    rng = np.random.default_rng(seed)
+    outputs = []
+    for stride in (32, 16, 8):
+        cells = (input_size // stride) ** 2 * 3
+        out = np.zeros((cells, 5 + num_classes), dtype=np.float32)
+        out[:, :4] = rng.random((cells, 4), dtype=np.float32) * [1, 1, 0.3, 0.3]
+        # Class scores are objectness times class probability, as in cv2.dnn
+        out[:, 4] = rng.random(cells, dtype=np.float32) * 0.2
+        out[:, 5:] = out[:, 4:5] * rng.random((cells, num_classes), dtype=np.float32)
+        # About 5% of anchors see part of an object, 1% carry a confident class score
+        near = rng.choice(cells, size=cells // 20, replace=False)
+        out[near, 4] = rng.uniform(0.2, 0.9, len(near))
+        hits = near[:cells // 100]
+        scores = rng.uniform(0.5, 1.0, len(hits)).astype(np.float32)
+        out[hits, 4] = np.maximum(out[hits, 4], scores)
+        out[hits, 5 + rng.integers(0, num_classes, len(hits))] = scores
+        outputs.append(out)
+    return tuple(outputs)
+
+
+def loop_decode(outputs, width, height, threshold):
+    """The original per-row decode loop"""
+    boxes = []
+    confidences = []
+    class_ids = []
+
+    for output in outputs:
+        for detection in output:
+            scores = detection[5:]
+            class_id = np.argmax(scores)
+            confidence = scores[class_id]
+
+            if confidence > threshold:
+                box = detection[0:4] * np.array([width, height, width, height])
+                centerX, centerY, w, h = box.astype("int")
+
+                x = int(centerX - (w / 2))
+                y = int(centerY - (h / 2))
+
+                boxes.append([x, y, int(w), int(h)])
+                confidences.append(float(confidence))
+                class_ids.append(class_id)
+
+    return boxes, confidences, class_ids
+
+
+def best_score_decode(outputs, width, height, threshold):
+    """Previous decode: best score over all 80 columns of every row"""
+    kept = [output[output[:, 5:].max(axis=1) > threshold] for output in outputs]
+    return decode_outputs((np.concatenate(kept, axis=0),), width, height, threshold)
+
+
+def bench(fn, args, repeats):
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(*args)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    width, height, threshold = 640, 480, 0.6
+
+    for input_size in (320, 416, 608):
+        outputs = make_outputs(input_size)
+        rows = sum(len(o) for o in outputs)
+
+        ref_boxes, _, ref_ids = loop_decode(outputs, width, height, threshold)
+        boxes, _, class_ids = decode_outputs(outputs, width, height, threshold)
+        assert len(ref_boxes) == len(boxes)
+        # float32 vs float64 scaling may differ by one pixel on exact .5 boundaries
+        assert np.abs(np.asarray(ref_boxes).reshape(-1, 4) - boxes).max(initial=0) <= 1
+        assert np.array_equal(np.asarray(ref_ids, dtype=np.int32), class_ids)
+
+        loop_t = bench(loop_decode, (outputs, width, height, threshold), 5)
+        vec_t = bench(decode_outputs, (outputs, width, height, threshold), 50)
+        print(f"input {input_size}: {rows} rows, {len(boxes)} candidates | "
+              f"loop {loop_t * 1000:.2f} ms | vectorized {vec_t * 1000:.3f} ms | "
+              f"{loop_t / vec_t:.0f}x")
+
+    # COCO ids of person, bicycle, car, dog
+    allowlist = np.array([0, 1, 2, 16], dtype=np.int32)
+    print()
+    print(f"{'decode (ms)':<12} {'best score':>11} {'objectness':>11} {'allow-list':>11} {'+ heads 0,1':>12}")
+    for input_size in (320, 416, 608):
+        outputs = make_outputs(input_size)
+        subset = decode_outputs(outputs, width, height, threshold, allowlist)
+        assert np.isin(subset[2], allowlist).all()
+
+        times = [
+            bench(best_score_decode, (outputs, width, height, threshold), 200),
+            bench(decode_outputs, (outputs, width, height, threshold), 200),
+            bench(decode_outputs, (outputs, width, height, threshold, allowlist), 200),
+            bench(decode_outputs, (outputs[:2], width, height, threshold, allowlist), 200),
+        ]
+        print(f"input {input_size:<6} " + " ".join(f"{t * 1000:11.3f}" for t in times[:3])
+              + f" {times[3] * 1000:12.3f}  ({times[0] / times[2]:.1f}x with allow-list)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Motion gate hit rate and CPU saved on recorded footage
+
+Usage (from the repository root):
+    python benchmarks/bench_motion_gate.py video.mp4 [--with-model]
+
+--with-model loads yolo-coco/ to measure the real forward time saved;
+otherwise only the gate hit rate and its own overhead are reported.
+"""
+import os
+import sys
+import time
+
+import cv2
+
+SYSTEM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print(__doc__)
+        return
+    video = os.path.abspath(args[0])
+    with_model = "--with-model" in sys.argv
+
+    # Config paths are relative to detection-system/
+    sys.path.insert(0, SYSTEM_DIR)
+    os.chdir(SYSTEM_DIR)
+    from config import Config
+    from motion_gate import MotionGate
+
+    config = Config()
+    gate = MotionGate(config)
+    detector = None
+    if with_model:
+        from yolo_detector import YOLODetector
+        config.MOTION_GATING = False
+        detector = YOLODetector(config)
+
+    cap = cv2.VideoCapture(video)
+    frames = 0
+    forward_time = 0.0
+    forwards = 0
+    start = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+        if gate.should_detect(frame) and detector is not None:
+            forward_time += detector.detect_objects(frame)[4]
+            forwards += 1
+    elapsed = time.perf_counter() - start
+    cap.release()
+
+    print(f"{frames} frames in {elapsed:.1f} s")
+    print(gate.summary())
+    if forwards:
+        avg_forward = forward_time / forwards
+        saved = gate.reused * avg_forward - gate.gate_time
+        print(f"forward {1000 * avg_forward:.1f} ms avg | CPU saved {saved:.1f} s "
+              f"({saved / (saved + forward_time + gate.gate_time):.0%} of detector time)")
+
+
+if __name__ == "__main__":
+    main()
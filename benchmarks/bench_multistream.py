@@ -0,0 +1,107 @@
+"""Throughput of N separate detector processes vs one batched process
+
+Usage (from the repository root, with yolo-coco/ downloaded):
+    python benchmarks/bench_multistream.py clip1.mp4 clip2.mp4 [...]
+"""
+import multiprocessing as mp
+import os
+import sys
+import time
+
+SYSTEM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system")
+
+
+def _setup():
+    # Config paths are relative to detection-system/
+    sys.path.insert(0, SYSTEM_DIR)
+    os.chdir(SYSTEM_DIR)
+
+
+def _single_stream(video, max_frames, barrier, results):
+    _setup()
+    from config import Config
+    from camera_manager import CameraManager
+    from yolo_detector import YOLODetector
+
+    config = Config()
+    detector = YOLODetector(config)
+    camera = CameraManager(config, video)
+
+    # Start every process's loop together, after model loading
+    barrier.wait()
+    frames = 0
+    start = time.perf_counter()
+    while frames < max_frames:
+        ret, frame = camera.read_frame()
+        if not ret:
+            break
+        detector.detect_objects(frame)
+        frames += 1
+    results.put((frames, time.perf_counter() - start))
+    camera.release()
+
+
+def run_separate(videos, max_frames):
+    """One process and one loaded model per video"""
+    barrier = mp.Barrier(len(videos))
+    results = mp.Queue()
+    procs = [
+        mp.Process(target=_single_stream, args=(video, max_frames, barrier, results))
+        for video in videos
+    ]
+    for proc in procs:
+        proc.start()
+    stats = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    frames = sum(count for count, _ in stats)
+    elapsed = max(seconds for _, seconds in stats)
+    return frames, elapsed
+
+
+def run_batched(videos, max_frames):
+    """One process, one model, one forward per batch of N frames"""
+    _setup()
+    from config import Config
+    from camera_manager import CameraManager
+    from yolo_detector import YOLODetector
+
+    config = Config()
+    detector = YOLODetector(config)
+    cameras = [CameraManager(config, video) for video in videos]
+
+    frames = 0
+    start = time.perf_counter()
+    for _ in range(max_frames):
+        batch = []
+        for camera in cameras:
+            ret, frame = camera.read_frame()
+            if ret:
+                batch.append(frame)
+        if not batch:
+            break
+        detector.detect_batch(batch)
+        frames += len(batch)
+    elapsed = time.perf_counter() - start
+
+    for camera in cameras:
+        camera.release()
+    return frames, elapsed
+
+
+def main():
+    videos = [os.path.abspath(path) for path in sys.argv[1:]]
+    if not videos:
+        print(__doc__)
+        return
+    max_frames = int(os.environ.get("BENCH_MAX_FRAMES", 200))
+
+    for name, runner in (("separate", run_separate), ("batched", run_batched)):
+        frames, elapsed = runner(videos, max_frames)
+        print(f"{name:>8}: {len(videos)} streams, {frames} frames in {elapsed:.2f} s "
+              f"-> {frames / elapsed:.1f} FPS total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Overlay cost per displayed frame: putText per box vs cached sprites vs preview
+
+Usage (from the repository root):
+    python benchmarks/bench_overlay.py [--width 1920] [--height 1080]
+
+Draws N random detections on a 1080p frame with the previous
+draw_detections code path (rectangle + putText on the full frame), with
+OverlayRenderer drawing labels with putText (the default) and with
+cached label sprites on a full-size copy, and with putText on a 960 px
+wide preview. Timings include the copy or resize the renderer makes so
+the analysis frame is never drawn on.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system"))
+from overlay import OverlayRenderer  # noqa: E402
+
+LABELS = [f"class{i}" for i in range(80)]
+
+
+def put_text_draw(frame, labels, colors, boxes, confidences, class_ids, idxs):
+    """The previous YOLODetector.draw_detections body"""
+    for i in idxs:
+        x, y, w, h = boxes[i].tolist()
+        color = [int(c) for c in colors[class_ids[i]]]
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(frame, f"{labels[class_ids[i]]} {confidences[i]:.2f}", (x, y - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+
+
+def detections(count, width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(40, 300, (count, 2))
+    corners = rng.integers(0, [width - 300, height - 300], (count, 2))
+    boxes = np.concatenate([corners, sizes], axis=1).astype(np.int32)
+    confidences = rng.uniform(0.5, 1.0, count).astype(np.float32)
+    class_ids = rng.integers(0, len(LABELS), count).astype(np.int32)
+    return boxes, confidences, class_ids, np.arange(count)
+
+
+def bench(fn, repeats=50):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return 1000 * (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(1).integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    colors = np.random.default_rng(42).integers(0, 255, (len(LABELS), 3), dtype=np.uint8)
+    status = ["FPS: 24.3 | Objects: 12 | 416px every 3"]
+    full = OverlayRenderer(LABELS, colors, sprites=False, max_fps=0)
+    cached = OverlayRenderer(LABELS, colors, sprites=True, max_fps=0)
+    preview = OverlayRenderer(LABELS, colors, sprites=False, preview_width=960, max_fps=0)
+
+    print(f"{'boxes':>6} {'putText':>9} {'renderer':>9} {'sprites':>9} {'preview':>9}   (ms per frame)")
+    for count in (10, 50, 200):
+        dets = detections(count, args.width, args.height)
+        old = bench(lambda: put_text_draw(frame.copy(), LABELS, colors, *dets))
+        renderer = bench(lambda: full.render(frame, dets, status))
+        sprites = bench(lambda: cached.render(frame, dets, status))
+        small = bench(lambda: preview.render(frame, dets, status))
+        print(f"{count:6d} {old:9.2f} {renderer:9.2f} {sprites:9.2f} {small:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Scaling report for YOLODetectorPool from 1 to K worker processes
+
+Usage (from the repository root, with yolo-coco/ downloaded):
+    python benchmarks/bench_pool.py [video.mp4] [max_workers]
+
+Without a video, random 640x480 frames are used.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+SYSTEM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system")
+
+
+def load_frames(video, count, config):
+    import cv2
+
+    if video is None:
+        rng = np.random.default_rng(0)
+        shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3)
+        return [rng.integers(0, 255, shape, dtype=np.uint8) for _ in range(count)]
+
+    frames = []
+    cap = cv2.VideoCapture(video)
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (config.CAMERA_WIDTH, config.CAMERA_HEIGHT)))
+    cap.release()
+    return frames
+
+
+def main():
+    video = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else None
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    count = int(os.environ.get("BENCH_MAX_FRAMES", 200))
+
+    # Config paths are relative to detection-system/
+    sys.path.insert(0, SYSTEM_DIR)
+    os.chdir(SYSTEM_DIR)
+    from config import Config
+    from detector_pool import YOLODetectorPool
+
+    config = Config()
+    frames = load_frames(video, count, config)
+    print(f"{len(frames)} frames, up to {max_workers} workers")
+
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        with YOLODetectorPool(config, workers=workers) as pool:
+            # Warm every worker up (model load + first forward) before timing
+            list(pool.map(frames[:workers * 2]))
+
+            start = time.perf_counter()
+            for _ in pool.map(frames):
+                pass
+            elapsed = time.perf_counter() - start
+
+        fps = len(frames) / elapsed
+        baseline = baseline or fps
+        print(f"workers={workers:2d}: {fps:6.1f} FPS | speedup {fps / baseline:4.2f}x | "
+              f"efficiency {fps / baseline / workers:4.0%}")
+
+
+if __name__ == "__main__":
+    main()
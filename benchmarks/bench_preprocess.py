@@ -0,0 +1,110 @@
+"""Steady-state allocations per frame: blobFromImage vs the buffered Preprocessor
+
+Usage (from the repository root):
+    python benchmarks/bench_preprocess.py [--with-model]
+
+Allocations are measured with tracemalloc after a warm-up frame, so
+buffers created on first use are not counted: the peak traced bytes above
+the starting level while processing one frame, and the number of memory
+blocks allocated by the call that are still alive when it returns (the
+result included), from a snapshot diff. tracemalloc sees Python and
+NumPy allocations (including arrays OpenCV returns), not OpenCV's internal
+scratch memory. --with-model also measures YOLODetector._detect_full end
+to end with PREPROCESS_BUFFERS off and on (needs yolo-coco/).
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+SYSTEM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system")
+sys.path.insert(0, SYSTEM_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from preprocess import Preprocessor  # noqa: E402
+from postprocess import decode_outputs  # noqa: E402
+from bench_decode import make_outputs  # noqa: E402
+
+
+def _new_blocks(fn):
+    """Blocks allocated by fn() and still alive while its result is held"""
+    before = tracemalloc.take_snapshot()
+    result = fn()  # noqa: F841
+    after = tracemalloc.take_snapshot()
+    return sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+
+def per_frame(fn, frames=20):
+    """(peak traced bytes, allocated blocks, ms) per call in steady state"""
+    fn()
+    tracemalloc.start()
+    peaks = []
+    for _ in range(frames):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    # Taking the first snapshot allocates too; a no-op call measures that
+    overhead = min(_new_blocks(lambda: None) for _ in range(5))
+    blocks = [_new_blocks(fn) - overhead for _ in range(5)]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return int(np.median(peaks)), int(np.median(blocks)), 1000 * (time.perf_counter() - start) / frames
+
+
+def concat_decode(outputs, width, height, threshold):
+    """Previous decode: joins all heads before filtering"""
+    detections = np.concatenate(outputs, axis=0)
+    scores = detections[:, 5:]
+    keep = scores.max(axis=1) > threshold
+    kept = detections[keep]
+    return decode_outputs((kept,), width, height, threshold)
+
+
+def report(name, before, after):
+    (b_bytes, b_blocks, b_ms), (a_bytes, a_blocks, a_ms) = before, after
+    print(f"{name:<28} {b_bytes / 1024:9.1f} KiB {b_blocks:4d} blk {b_ms:7.2f} ms -> "
+          f"{a_bytes / 1024:7.1f} KiB {a_blocks:4d} blk {a_ms:7.2f} ms")
+
+
+def main():
+    frame = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+    print(f"{'':<28} {'before (peak, blocks/frame)':>30} -> {'after':>26}")
+
+    for size in (320, 416, 608):
+        preprocessor = Preprocessor()
+        letterbox = Preprocessor(letterbox=True)
+        reference = cv2.dnn.blobFromImage(frame, 1 / 255.0, (size, size), swapRB=True, crop=False)
+        assert np.array_equal(preprocessor(frame, size)[0], reference)
+
+        before = per_frame(lambda: cv2.dnn.blobFromImage(frame, 1 / 255.0, (size, size), swapRB=True, crop=False))
+        report(f"preprocess {size}", before, per_frame(lambda: preprocessor(frame, size)))
+        report(f"preprocess {size} letterbox", before, per_frame(lambda: letterbox(frame, size)))
+
+        outputs = make_outputs(size)
+        report(f"decode {size}",
+               per_frame(lambda: concat_decode(outputs, 1280, 720, 0.6)),
+               per_frame(lambda: decode_outputs(outputs, 1280, 720, 0.6)))
+
+    if "--with-model" in sys.argv:
+        os.chdir(SYSTEM_DIR)
+        from config import Config
+        from yolo_detector import YOLODetector
+
+        results = []
+        for buffers in (False, True):
+            config = Config()
+            config.PREPROCESS_BUFFERS = buffers
+            config.MOTION_GATING = False
+            detector = YOLODetector(config)
+            results.append(per_frame(lambda: detector._detect_full(frame)))
+        report(f"_detect_full {config.INPUT_SIZE}", *results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Frame recording: write cost, replay read cost vs decoding, pacing fidelity
+
+Usage (from the repository root):
+    python benchmarks/bench_recording.py [--frames 200] [--size 1280 720]
+
+Generates moving-shape frames with jittered capture timestamps and
+stores them as an MJPG video, a PNG directory and a .frames recording
+(RecordingCapture), then reads each back through CameraManager as fast
+as possible. The recording is checked to replay bit-for-bit while the
+codecs are not. Pacing replays the recording at REPLAY_SPEED 1 and 4 and
+reports how far frame delivery strays from the recorded timeline.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_stages import SYSTEM_DIR, SyntheticSource  # noqa: E402
+
+sys.path.insert(0, SYSTEM_DIR)
+from camera_manager import CameraManager  # noqa: E402
+from config import Config  # noqa: E402
+from recording import FrameRecorder  # noqa: E402
+
+
+def read_all(config, source, realtime=False):
+    """(frames, ms per frame, delivery times relative to the first frame)"""
+    camera = CameraManager(config, source, realtime=realtime)
+    frames, delivered = [], []
+    start = time.perf_counter()
+    while True:
+        ret, frame = camera.read_frame()
+        if not ret:
+            break
+        delivered.append(time.perf_counter())
+        frames.append(frame)
+    elapsed = time.perf_counter() - start
+    camera.release()
+    return frames, 1000 * elapsed / max(1, len(frames)), np.array(delivered) - delivered[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--size", type=int, nargs=2, default=(1280, 720), metavar=("W", "H"))
+    args = parser.parse_args()
+
+    source = SyntheticSource(args.frames, *args.size)
+    frames = [source.read_frame()[1] for _ in range(args.frames)]
+    rng = np.random.default_rng(0)
+    timestamps = 1e9 + np.cumsum(rng.uniform(0.02, 0.05, args.frames))
+    config = Config()
+    config.CAMERA_PREFETCH = 0
+
+    directory = tempfile.mkdtemp()
+    try:
+        video = os.path.join(directory, "clip.avi")
+        writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 30, tuple(args.size))
+        images = os.path.join(directory, "images")
+        os.mkdir(images)
+        for i, frame in enumerate(frames):
+            writer.write(frame)
+            cv2.imwrite(os.path.join(images, f"{i:06d}.png"), frame)
+        writer.release()
+
+        recording = os.path.join(directory, "clip.frames")
+        recorder = FrameRecorder(recording, args.frames * (frames[0].nbytes + 8192) + 65536)
+        for frame, timestamp in zip(frames, timestamps):
+            recorder.write(frame, timestamp)
+        recorder.close()
+        print(f"{args.frames} frames of {args.size[0]}x{args.size[1]}, "
+              f"write {1000 * recorder.write_time / args.frames:.2f} ms/frame, "
+              f"{os.path.getsize(recording) / 1024 ** 2:.0f} MiB recording")
+
+        print(f"{'source':<10} {'ms/frame':>9} {'bit-exact':>10}")
+        for name, path in (("mjpg", video), ("png dir", images), ("recording", recording)):
+            replayed, ms, _ = read_all(config, path)
+            exact = len(replayed) == len(frames) and all(np.array_equal(a, b) for a, b in zip(replayed, frames))
+            print(f"{name:<10} {ms:9.3f} {str(exact):>10}")
+
+        recorded = timestamps - timestamps[0]
+        for speed in (1.0, 4.0):
+            config.REPLAY_SPEED = speed
+            _, _, delivered = read_all(config, recording, realtime=True)
+            error = 1000 * np.abs(delivered - recorded / speed)
+            print(f"pacing x{speed:g}: {delivered[-1]:.2f} s for {recorded[-1] / speed:.2f} s of timeline, "
+                  f"error mean {error.mean():.2f} ms, max {error.max():.2f} ms")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
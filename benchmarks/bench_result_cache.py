@@ -0,0 +1,194 @@
+"""Result cache hit rate, cost per request and stale answers on a snapshot workload
+
+Usage (from the repository root, with yolo-coco/ downloaded):
+    python benchmarks/bench_result_cache.py [--images 50] [--requests 600]
+        [--reencoded 0.3] [--set NAME=VALUE ...]
+
+Requests pick one of --images distinct 640x480 synthetic scenes with a Zipf
+distribution, as thumbnails and retries do; a --reencoded fraction of
+them arrives JPEG re-encoded (same picture, different pixels). Each
+request goes through detect_objects() without cache, with the exact
+cache and with the perceptual cache at Hamming distances 0 and 4.
+"stale" counts hits whose classes differ from what the detector returns
+for that request's actual pixels, or whose boxes are more than 4 px off;
+"jitter" counts the remaining hits that are not bit-identical. The scripted checks at the
+start pin down the key, TTL and eviction.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_stages import SYSTEM_DIR, parse_override, working_directory  # noqa: E402
+
+sys.path.insert(0, SYSTEM_DIR)
+from result_cache import ResultCache, difference_hash  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeConfig:
+    INPUT_SIZE = 416
+    CONFIDENCE_THRESHOLD = 0.5
+    NMS_THRESHOLD = 0.4
+    CLASS_ALLOWLIST = ()
+    YOLO_HEADS = ()
+    LETTERBOX = False
+    INFERENCE_ENGINE = "opencv"
+    CASCADE_MODE = False
+    CASCADE_LOW_SIZE = 320
+    CASCADE_HIGH_SIZE = 608
+    CASCADE_MIN_SCORE = 0.3
+    CASCADE_MIN_BOX = 24
+
+
+def result(count):
+    return (np.zeros((count, 4), np.int32), np.zeros(count, np.float32), np.zeros(count, np.int32),
+            np.arange(count))
+
+
+def check_behaviour():
+    config = FakeConfig()
+    clock = FakeClock()
+    cache = ResultCache(config, max_entries=2, ttl=10.0, clock=clock)
+    frames = [np.full((48, 64, 3), value, np.uint8) for value in (0, 1, 2)]
+
+    # Settings are part of the key
+    key = cache.key(frames[0], "full")
+    assert cache.get(key) is None
+    cache.put(key, result(1))
+    assert cache.get(cache.key(frames[0], "full")) is not None
+    config.CONFIDENCE_THRESHOLD = 0.6
+    assert cache.get(cache.key(frames[0], "full")) is None
+    config.CONFIDENCE_THRESHOLD = 0.5
+    assert cache.get(cache.key(frames[0], "full")) is not None
+    # So is the detector path
+    assert cache.get(cache.key(frames[0], "batch")) is None
+    # LRU: the least recently used entry goes first
+    cache.clear()
+    for frame in frames[:2]:
+        cache.put(cache.key(frame, "full"), result(1))
+    cache.get(cache.key(frames[0], "full"))
+    cache.put(cache.key(frames[2], "full"), result(1))
+    assert cache.get(cache.key(frames[1], "full")) is None and cache.evictions == 1
+    # TTL
+    clock.now = 11.0
+    assert cache.get(cache.key(frames[0], "full")) is None and cache.expirations == 1
+    # Byte bound
+    small = ResultCache(config, max_bytes=1000)
+    for value in range(3):
+        small.put(small.key(frames[value], "full"), result(20))
+    assert small.bytes <= 1000 and len(small.entries) == 1 and small.evictions == 2
+    print("behaviour checks passed")
+
+
+def snapshot(rng):
+    """Random filled rectangles and circles on a gradient, with sensor noise"""
+    frame = np.empty((480, 640, 3), dtype=np.uint8)
+    frame[:] = np.linspace(rng.integers(0, 128), rng.integers(128, 256), 640, dtype=np.uint8)[None, :, None]
+    for _ in range(12):
+        color = rng.integers(0, 255, 3).tolist()
+        x, y = rng.integers(0, 600), rng.integers(0, 440)
+        if rng.random() < 0.5:
+            cv2.rectangle(frame, (x, y), (x + rng.integers(20, 200), y + rng.integers(20, 200)), color, -1)
+        else:
+            cv2.circle(frame, (x, y), int(rng.integers(10, 100)), color, -1)
+    noise = rng.normal(0, 3, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def make_requests(images, requests, reencoded, seed=0):
+    rng = np.random.default_rng(seed)
+    bases = [snapshot(rng) for _ in range(images)]
+    weights = 1.0 / np.arange(1, images + 1) ** 1.1
+    frames = []
+    for index in rng.choice(images, requests, p=weights / weights.sum()):
+        frame = bases[index]
+        if rng.random() < reencoded:
+            frame = cv2.imdecode(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])[1], cv2.IMREAD_COLOR)
+        frames.append(frame)
+    return frames
+
+
+def detections(result):
+    boxes, confidences, class_ids, idxs = result[:4]
+    idxs = np.asarray(idxs).reshape(-1)
+    return sorted(zip(class_ids[idxs].tolist(), map(tuple, boxes[idxs].tolist())))
+
+
+def differs(a, b, tolerance=0):
+    """True unless both have the same classes with boxes within tolerance pixels"""
+    a, b = detections(a), detections(b)
+    if [c for c, _ in a] != [c for c, _ in b]:
+        return True
+    return any(np.abs(np.subtract(box_a, box_b)).max() > tolerance for (_, box_a), (_, box_b) in zip(a, b))
+
+
+def run(config, frames, reference=None, **cache_settings):
+    from yolo_detector import YOLODetector
+
+    config.RESULT_CACHE = bool(cache_settings)
+    for name, value in cache_settings.items():
+        setattr(config, name, value)
+    with working_directory(SYSTEM_DIR):
+        detector = YOLODetector(config)
+    outputs = []
+    start = time.perf_counter()
+    for frame in frames:
+        outputs.append(detector.detect_objects(frame))
+    elapsed = time.perf_counter() - start
+    stale = jitter = 0
+    if reference is not None:
+        stale = sum(differs(a, b, 4) for a, b in zip(outputs, reference))
+        jitter = sum(differs(a, b) for a, b in zip(outputs, reference)) - stale
+    return detector.result_cache, outputs, 1000 * elapsed / len(frames), stale, jitter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--reencoded", type=float, default=0.3)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Config override, value parsed as JSON when possible")
+    args = parser.parse_args()
+
+    check_behaviour()
+    from config import Config
+    config = Config()
+    config.MOTION_GATING = False
+    config.ROI_MODE = False
+    for name, value in dict(parse_override(text) for text in args.set).items():
+        setattr(config, name, value)
+
+    frames = make_requests(args.images, args.requests, args.reencoded)
+    start = time.perf_counter()
+    for frame in frames:
+        difference_hash(frame)
+    print(f"{args.requests} requests over {args.images} images, {100 * args.reencoded:.0f}% re-encoded, "
+          f"dHash {1000 * (time.perf_counter() - start) / len(frames):.2f} ms")
+
+    _, reference, baseline, _, _ = run(config, frames)
+    print(f"{'mode':<16} {'hit rate':>8} {'ms/req':>8} {'speedup':>8} {'stale':>6} {'jitter':>6}")
+    print(f"{'no cache':<16} {'-':>8} {baseline:8.2f} {1.0:8.2f} {0:6d} {0:6d}")
+    for name, settings in (
+        ("exact", {"RESULT_CACHE_MODE": "exact", "RESULT_CACHE_DISTANCE": 0}),
+        ("perceptual d=0", {"RESULT_CACHE_MODE": "perceptual", "RESULT_CACHE_DISTANCE": 0}),
+        ("perceptual d=4", {"RESULT_CACHE_MODE": "perceptual", "RESULT_CACHE_DISTANCE": 4}),
+    ):
+        cache, _, ms, stale, jitter = run(config, frames, reference, **settings)
+        print(f"{name:<16} {100 * cache.hit_rate():7.1f}% {ms:8.2f} {baseline / ms:8.2f} {stale:6d} {jitter:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Full-frame vs ROI-mode FPS and small-object recall on high-resolution video
+
+Usage (from the repository root, with yolo-coco/ downloaded):
+    python benchmarks/bench_roi.py video.mp4
+
+Recall is measured against a dense reference: every frame tiled at native
+resolution (ROI_TILE_SIZE tiles, 20% overlap). Small objects are those
+under 32x32 pixels in the reference.
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+SYSTEM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system")
+SMALL_AREA = 32 * 32
+
+
+def survivors(result):
+    boxes, _, class_ids, idxs, _ = result
+    return boxes[idxs].astype(np.float32), class_ids[idxs]
+
+
+def matched(reference, candidate, iou_matrix, threshold=0.5):
+    """Number of reference boxes hit by a same-class candidate with IoU >= threshold"""
+    ref_boxes, ref_ids = reference
+    boxes, ids = candidate
+    if not len(ref_boxes) or not len(boxes):
+        return 0
+    iou = iou_matrix(ref_boxes, boxes)
+    iou[ref_ids[:, None] != ids[None]] = 0
+    return int((iou.max(axis=1) >= threshold).sum())
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    video = os.path.abspath(sys.argv[1])
+    max_frames = int(os.environ.get("BENCH_MAX_FRAMES", 300))
+
+    # Config paths are relative to detection-system/
+    sys.path.insert(0, SYSTEM_DIR)
+    os.chdir(SYSTEM_DIR)
+    from config import Config
+    from roi import grid_tiles
+    from tracker import iou_matrix
+    from yolo_detector import YOLODetector
+
+    config = Config()
+    config.MOTION_GATING = False
+    full = YOLODetector(config)
+    roi_config = Config()
+    roi_config.MOTION_GATING = False
+    roi_config.ROI_MODE = True
+    roi = YOLODetector(roi_config)
+
+    times = {"full": 0.0, "roi": 0.0}
+    small = {"reference": 0, "full": 0, "roi": 0}
+    frames = 0
+
+    cap = cv2.VideoCapture(video)
+    while frames < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+        H, W = frame.shape[:2]
+
+        start = time.perf_counter()
+        full_result = full.detect_objects(frame)
+        times["full"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        roi_result = roi.detect_objects(frame)
+        times["roi"] += time.perf_counter() - start
+
+        ref_boxes, ref_ids = survivors(full.detect_tiles(frame, grid_tiles(W, H, config.ROI_TILE_SIZE)))
+        is_small = ref_boxes[:, 2] * ref_boxes[:, 3] < SMALL_AREA
+        reference = (ref_boxes[is_small], ref_ids[is_small])
+        small["reference"] += int(is_small.sum())
+        small["full"] += matched(reference, survivors(full_result), iou_matrix)
+        small["roi"] += matched(reference, survivors(roi_result), iou_matrix)
+    cap.release()
+
+    if not frames:
+        print("No frames read")
+        return
+    print(f"{frames} frames of {W}x{H}, {small['reference']} small reference objects")
+    for name in ("full", "roi"):
+        recall = small[name] / small["reference"] if small["reference"] else float("nan")
+        print(f"{name:>4}: {frames / times[name]:6.1f} FPS | small-object recall {recall:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Load generator for service.py: latency percentiles against request rate
+
+Usage (from the repository root, with the service running):
+    python detection-system/service.py &
+    python benchmarks/bench_service.py [--host 127.0.0.1] [--port 8080]
+        [--rates 5,10,20,40,80] [--duration 10] [--image photo.jpg]
+
+Open loop: at each rate, requests are sent on schedule whether or not
+earlier ones returned, each on its own connection like independent
+clients, so queueing in the service shows up as latency instead of a
+lower send rate. Latency is measured from the scheduled send time.
+Per rate it reports completed and shed (503) requests, throughput,
+p50/p95/p99 latency of completed requests and the mean batch size the
+service formed, read from /health.
+"""
+import argparse
+import asyncio
+import json
+
+import cv2
+import numpy as np
+
+
+async def request(host, port, method, path, body=b""):
+    """(status, JSON payload) over a fresh connection"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: image/jpeg\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        return status, json.loads(await reader.read())
+    finally:
+        writer.close()
+
+
+async def run_rate(host, port, body, rate, duration, timeout):
+    loop = asyncio.get_running_loop()
+    count = max(1, int(rate * duration))
+    start = loop.time() + 0.05
+    latencies = []
+    counts = {"ok": 0, "shed": 0, "errors": 0}
+
+    async def one(scheduled):
+        await asyncio.sleep(max(0.0, scheduled - loop.time()))
+        try:
+            status, _ = await asyncio.wait_for(request(host, port, "POST", "/detect", body), timeout)
+        except (OSError, asyncio.TimeoutError, ValueError):
+            counts["errors"] += 1
+            return
+        if status == 200:
+            counts["ok"] += 1
+            latencies.append(loop.time() - scheduled)
+        elif status == 503:
+            counts["shed"] += 1
+        else:
+            counts["errors"] += 1
+
+    await asyncio.gather(*(one(start + i / rate) for i in range(count)))
+    elapsed = loop.time() - start
+    return count, counts, np.array(latencies) * 1000, elapsed
+
+
+async def main_async(args):
+    frame = cv2.imread(args.image) if args.image else None
+    if frame is None:
+        rng = np.random.default_rng(0)
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8), (9, 9), 0)
+    body = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes()
+    print(f"{frame.shape[1]}x{frame.shape[0]} JPEG, {len(body) / 1024:.0f} KiB, {args.duration:g} s per rate")
+
+    # Warm the service up so the first rate does not pay for it
+    await request(args.host, args.port, "POST", "/detect", body)
+
+    print(f"{'rate/s':>7} {'sent':>6} {'ok':>6} {'shed':>6} {'err':>5} {'ok/s':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for rate in args.rates:
+        _, before = await request(args.host, args.port, "GET", "/health")
+        sent, counts, latencies, elapsed = await run_rate(
+            args.host, args.port, body, rate, args.duration, args.timeout
+        )
+        _, after = await request(args.host, args.port, "GET", "/health")
+        batches = after["batches"] - before["batches"]
+        batch = (after["frames"] - before["frames"]) / batches if batches else 0.0
+        p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) if len(latencies) else (np.nan,) * 3
+        print(f"{rate:7g} {sent:6d} {counts['ok']:6d} {counts['shed']:6d} {counts['errors']:5d} "
+              f"{counts['ok'] / elapsed:7.1f} {p50:8.1f} {p95:8.1f} {p99:8.1f} {batch:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--rates", type=lambda s: [float(r) for r in s.split(",")], default=[5, 10, 20, 40, 80])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--image", help="Frame to send (default: synthetic 640x480)")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
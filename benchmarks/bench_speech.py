@@ -0,0 +1,71 @@
+"""Announcement latency: one synthesizer process per phrase vs cached SpeechEngine
+
+Runs against a local fake synthesizer and a null sink, so no audio
+hardware or TTS binaries are needed. The fake adds a fixed start-up delay
+per call to model process launch (PowerShell is often 300+ ms).
+"""
+import math
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system"))
+from speech import SpeechEngine  # noqa: E402
+
+PARAMS = (1, 2, 22050)
+LABELS = ["person", "bicycle", "car", "dog", "cat", "chair", "laptop", "cell phone"]
+
+
+class FakeSynthesizer:
+    """Renders a short tone per character after a simulated start-up delay"""
+
+    def __init__(self, startup=0.15):
+        self.startup = startup
+        self.calls = 0
+
+    def synthesize(self, text):
+        self.calls += 1
+        time.sleep(self.startup)
+        samples = int(PARAMS[2] * 0.05 * len(text))
+        pcm = b"".join(struct.pack("<h", int(8000 * math.sin(i / 10))) for i in range(samples))
+        return pcm, PARAMS
+
+
+class NullSink:
+    def __init__(self, params):
+        self.bytes = 0
+
+    def play(self, pcm):
+        self.bytes += len(pcm)
+
+    def close(self):
+        pass
+
+
+def main():
+    phrases = [f"Detected: {LABELS[i % len(LABELS)]}, {LABELS[(i * 3 + 1) % len(LABELS)]}"
+               for i in range(20)]
+
+    # Old path: a fresh synthesizer invocation for every announcement
+    synthesizer = FakeSynthesizer()
+    start = time.perf_counter()
+    for phrase in phrases:
+        synthesizer.synthesize(phrase)
+    per_process = (time.perf_counter() - start) / len(phrases)
+
+    # Cached path: labels and template prerendered, announcements concatenate clips
+    engine = SpeechEngine(FakeSynthesizer(), sink_factory=NullSink)
+    start = time.perf_counter()
+    engine.prerender(["Detected"] + LABELS)
+    prerender = time.perf_counter() - start
+    latencies = sorted(engine.say(phrase) for phrase in phrases)
+
+    print(f"process per phrase: {1000 * per_process:8.1f} ms per announcement")
+    print(f"cached engine:      {1000 * latencies[len(latencies) // 2]:8.3f} ms median, "
+          f"{1000 * latencies[-1]:.3f} ms max (prerender {prerender:.1f} s, "
+          f"{engine.synthesizer.calls} synth calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""Per-stage latency of YOLODetector, FastYOLODetector and DetectionSystem, headless
+
+Usage (from the repository root, with yolo-coco/ downloaded):
+    python benchmarks/bench_stages.py [--video clip.mp4] [--frames 300]
+        [--targets yolo,fast,system] [--json out.json] [--csv out.csv]
+        [--baseline baseline.json] [--save-baseline baseline.json]
+        [--set INPUT_SIZE=416 ...]
+
+Without --video, frames are generated (moving shapes over fixed noise), so
+runs are reproducible. Stages are timed by wrapping the real methods, not
+by re-implementing the loops: capture, blob, forward, decode, nms, track,
+draw and announce. Each stage reports count, mean and p50/p95/p99 in ms;
+each target reports end-to-end throughput.
+
+--baseline compares p50/p95 and FPS against a saved run and exits with
+status 1 if any got worse by more than --tolerance (and by more than
+--min-delta-ms, so microsecond stages don't trip on noise).
+
+--set overrides Config attributes for the yolo and system targets.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import sys
+import time
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SYSTEM_DIR = os.path.join(ROOT, "detection-system")
+STAGES = ("capture", "blob", "forward", "decode", "nms", "track", "draw", "announce")
+
+
+class StageTimer:
+    """Collects per-call durations of wrapped callables, per stage"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._restore = []
+
+    def wrap(self, stage, fn):
+        samples = self.samples[stage]
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+        return timed
+
+    def patch(self, owner, name, stage):
+        """Replace owner.name with a timed wrapper until restore()"""
+        original = getattr(owner, name)
+        self._restore.append((owner, name, original, name in vars(owner)))
+        setattr(owner, name, self.wrap(stage, original))
+
+    def restore(self):
+        for owner, name, original, own in reversed(self._restore):
+            if own:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+        self._restore.clear()
+
+    def summary(self):
+        stats = {}
+        for stage in STAGES:
+            samples = self.samples.get(stage)
+            if not samples:
+                continue
+            ms = 1000 * np.asarray(samples)
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            stats[stage] = {
+                "count": len(ms),
+                "mean_ms": float(ms.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "total_ms": float(ms.sum()),
+            }
+        return stats
+
+
+class SyntheticSource:
+    """Deterministic frames: a few shapes moving over fixed noise"""
+
+    def __init__(self, frames, width=640, height=480, seed=0):
+        rng = np.random.default_rng(seed)
+        self.remaining = frames
+        self.background = rng.integers(0, 80, (height, width, 3), dtype=np.uint8)
+        self.shapes = [
+            (rng.integers(0, width), rng.integers(0, height), rng.integers(-6, 7), rng.integers(-4, 5),
+             tuple(int(c) for c in rng.integers(100, 255, 3)))
+            for _ in range(4)
+        ]
+        self.size = (width, height)
+        self.index = 0
+
+    def read_frame(self):
+        if self.remaining <= 0:
+            return False, None
+        self.remaining -= 1
+        self.index += 1
+        width, height = self.size
+        frame = self.background.copy()
+        for x, y, dx, dy, color in self.shapes:
+            cx = int((x + dx * self.index) % width)
+            cy = int((y + dy * self.index) % height)
+            cv2.rectangle(frame, (cx - 40, cy - 60), (cx + 40, cy + 60), color, -1)
+        return True, frame
+
+    def release(self):
+        pass
+
+
+class VideoSource:
+    """Frames decoded from a file as fast as possible"""
+
+    def __init__(self, path, frames):
+        self.cap = cv2.VideoCapture(path)
+        self.remaining = frames
+
+    def read_frame(self):
+        if self.remaining <= 0:
+            return False, None
+        self.remaining -= 1
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class _TimedNet:
+    """cv2.dnn.Net proxy: the C++ object does not accept attribute patches"""
+
+    def __init__(self, net, timer):
+        self._net = net
+        self.forward = timer.wrap("forward", net.forward)
+
+    def __getattr__(self, name):
+        return getattr(self._net, name)
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _time_blob(timer, detector=None):
+    timer.patch(cv2.dnn, "blobFromImage", "blob")
+    timer.patch(cv2.dnn, "blobFromImages", "blob")
+    # With PREPROCESS_BUFFERS the full-frame path never calls blobFromImage
+    if detector is not None and detector.preprocessor is not None:
+        timer.patch(detector, "preprocessor", "blob")
+
+
+def run_yolo(source, timer):
+    """YOLODetector on every frame, as a library caller would use it"""
+    with working_directory(SYSTEM_DIR):
+        from config import Config
+        from announcer import Announcer
+        import yolo_detector
+        detector = yolo_detector.YOLODetector(Config())
+        announcer = Announcer()
+
+    _time_blob(timer, detector)
+    timer.patch(detector.engine, "infer_batch", "forward")
+    timer.patch(detector, "_process_detections", "decode")
+    timer.patch(yolo_detector, "batched_nms", "nms")
+    timer.patch(detector, "draw_detections", "draw")
+    timer.patch(announcer, "update", "announce")
+    read = timer.wrap("capture", source.read_frame)
+
+    frames = 0
+    start = time.perf_counter()
+    while True:
+        ret, frame = read()
+        if not ret:
+            break
+        frames += 1
+        boxes, confidences, class_ids, idxs, _ = detector.detect_objects(frame)
+        detected_objects = detector.draw_detections(frame, boxes, confidences, class_ids, idxs)
+        announcer.update(detected_objects)
+    return frames, time.perf_counter() - start
+
+
+def run_fast(source, timer):
+    """FastYOLODetector.run() loop body without the window"""
+    with working_directory(ROOT):
+        sys.path.insert(0, ROOT)
+        from object_detection import FastYOLODetector
+        detector = FastYOLODetector()
+    # Time the queue hand-off, not speech itself
+    detector.speak_fast = lambda text: None
+
+    _time_blob(timer)
+    detector.net = _TimedNet(detector.net, timer)
+    timer.patch(detector, "decode_outputs", "decode")
+    timer.patch(detector, "batched_nms", "nms")
+    timer.patch(detector.tracker, "update", "track")
+    timer.patch(detector.tracker, "predict", "track")
+    timer.patch(detector, "draw_detections", "draw")
+    announce = timer.wrap("announce", _fast_announce)
+    read = timer.wrap("capture", source.read_frame)
+
+    frames = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            ret, frame = read()
+            if not ret:
+                break
+            frames += 1
+            detector.frame_count += 1
+            if detector.frame_count % detector.process_every_n_frames == 0:
+                boxes, confidences, class_ids, idxs, _ = detector.detect_objects(frame)
+                detector.tracker.update(boxes, confidences, class_ids, idxs)
+                announce(detector)
+            else:
+                detector.tracker.predict()
+            boxes, confidences, class_ids, idxs, _ = detector.tracker.results()
+            detector.draw_detections(frame, boxes, confidences, class_ids, idxs)
+    finally:
+        detector.running = False
+    return frames, time.perf_counter() - start
+
+
+def _fast_announce(detector):
+    unique_objects = detector.objects_to_announce()
+    if unique_objects and not detector.detection_queue.full():
+        detector.detection_queue.put_nowait(f"Detected: {', '.join(unique_objects[:3])}")
+
+
+def run_system(source, timer):
+    """DetectionSystem's sequential loop without HighGUI"""
+    with working_directory(SYSTEM_DIR):
+        import yolo_detector
+        from camera_manager import DetectionSystem
+        system = DetectionSystem()
+    system.camera_manager.release()
+    system.camera_manager = source
+    system.audio_manager._speak_fast = lambda text: None
+
+    detector = system.detector
+    _time_blob(timer, detector)
+    timer.patch(detector.engine, "infer_batch", "forward")
+    timer.patch(detector, "_process_detections", "decode")
+    timer.patch(yolo_detector, "batched_nms", "nms")
+    # The loop draws through the overlay renderer, at display rate
+    if system.renderer is not None:
+        timer.patch(system.renderer, "render", "draw")
+    timer.patch(system, "_announce", "announce")
+    if system.tracker is not None:
+        timer.patch(system.tracker, "update", "track")
+        timer.patch(system.tracker, "predict", "track")
+    read = timer.wrap("capture", system.camera_manager.read_frame)
+
+    frames = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            ret, frame = read()
+            if not ret:
+                break
+            frames += 1
+            system.frame_count += 1
+            if system.frame_count % system.config.PROCESS_EVERY_N_FRAMES == 0:
+                system._process_frame(frame)
+            elif system.tracker is not None:
+                system._propagate_tracks()
+            if system.renderer is not None and system.renderer.due():
+                objects = 0 if system.overlay is None else len(system.overlay[3])
+                system.renderer.render(frame, system.overlay, (f"Objects: {objects}",), in_place=True)
+    finally:
+        system.audio_manager.stop()
+    return frames, time.perf_counter() - start
+
+
+TARGETS = {"yolo": run_yolo, "fast": run_fast, "system": run_system}
+
+
+def run_target(name, args):
+    if args.video:
+        source = VideoSource(args.video, args.frames)
+    else:
+        source = SyntheticSource(args.frames, *args.size)
+
+    timer = StageTimer()
+    try:
+        frames, seconds = TARGETS[name](source, timer)
+    finally:
+        timer.restore()
+        source.release()
+    return {
+        "frames": frames,
+        "seconds": seconds,
+        "fps": frames / seconds if seconds else 0.0,
+        "stages": timer.summary(),
+    }
+
+
+def write_csv(path, results):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["target", "stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms",
+                         "total_ms", "fps"])
+        for target, result in results["targets"].items():
+            for stage, stats in result["stages"].items():
+                writer.writerow([target, stage, stats["count"]]
+                                + [f"{stats[key]:.4f}" for key in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "total_ms")]
+                                + [""])
+            writer.writerow([target, "frame", result["frames"], "", "", "", "", f"{1000 * result['seconds']:.4f}",
+                             f"{result['fps']:.2f}"])
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Print changes against a baseline run, returns the list of regressions"""
+    regressions = []
+    for target, result in results["targets"].items():
+        base = baseline.get("targets", {}).get(target)
+        if base is None:
+            print(f"{target}: not in baseline")
+            continue
+
+        change = result["fps"] / base["fps"] - 1 if base["fps"] else 0.0
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(f"{target} fps")
+        print(f"{target:>6} {'fps':>8}: {base['fps']:9.2f} -> {result['fps']:9.2f} ({change:+.1%}){flag}")
+
+        for stage, stats in result["stages"].items():
+            base_stats = base["stages"].get(stage)
+            if base_stats is None:
+                continue
+            for key in ("p50_ms", "p95_ms"):
+                old, new = base_stats[key], stats[key]
+                change = new / old - 1 if old else 0.0
+                flag = ""
+                if change > tolerance and new - old > min_delta_ms:
+                    flag = "  REGRESSION"
+                    regressions.append(f"{target} {stage} {key}")
+                print(f"{target:>6} {stage:>8} {key[:3]}: {old:9.3f} -> {new:9.3f} ms ({change:+.1%}){flag}")
+    return regressions
+
+
+def parse_override(text):
+    name, _, value = text.partition("=")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    if isinstance(value, list):
+        value = tuple(value)
+    return name, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", help="video file, generated frames if omitted")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", type=int, nargs=2, default=(640, 480), metavar=("W", "H"),
+                        help="generated frame size")
+    parser.add_argument("--targets", default="yolo,fast,system")
+    parser.add_argument("--json", help="write results as JSON")
+    parser.add_argument("--csv", help="write results as CSV")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--save-baseline", help="also write results to this path")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--min-delta-ms", type=float, default=0.1)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Config override for the yolo and system targets")
+    args = parser.parse_args()
+    if args.video:
+        args.video = os.path.abspath(args.video)
+    for path in ("json", "csv", "baseline", "save_baseline"):
+        if getattr(args, path):
+            setattr(args, path, os.path.abspath(getattr(args, path)))
+
+    sys.path.insert(0, SYSTEM_DIR)
+    overrides = dict(parse_override(text) for text in args.set)
+    from config import Config
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+    results = {
+        "source": args.video or f"synthetic {args.size[0]}x{args.size[1]}",
+        "opencv": cv2.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "overrides": overrides,
+        "targets": {},
+    }
+    for name in args.targets.split(","):
+        result = run_target(name, args)
+        results["targets"][name] = result
+        print(f"{name}: {result['frames']} frames, {result['fps']:.1f} FPS")
+        for stage, stats in result["stages"].items():
+            print(f"  {stage:>8}: n={stats['count']:<5} p50 {stats['p50_ms']:8.3f}  "
+                  f"p95 {stats['p95_ms']:8.3f}  p99 {stats['p99_ms']:8.3f} ms")
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+    if args.csv:
+        write_csv(args.csv, results)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
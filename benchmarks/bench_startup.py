@@ -0,0 +1,130 @@
+"""Time from process start to the first detection, per engine and cache state
+
+Usage (from the repository root, with yolo-coco/ downloaded):
+    python benchmarks/bench_startup.py [--repeat 3] [--warmup-runs 1]
+        [--modes opencv,onnxruntime-cold,onnxruntime-cached] [--set NAME=VALUE ...]
+
+Every run is a fresh interpreter, so imports, model parsing, session
+creation and the first forward are all paid again. Each run reports,
+relative to the moment the process was spawned:
+
+    imports   cv2, numpy and the detector modules imported
+    ready     YOLODetector constructed (model loaded, warm-up done)
+    first     first detect_objects() on a frame returned
+
+plus the latency of that first call and of a steady-state call, to show
+what warm-up moves out of the first frame. Runs are medians of --repeat.
+
+onnxruntime-cold deletes the optimized model cache before every run;
+onnxruntime-cached creates it once and reuses it. Both need the model
+from `python convert_darknet.py` (skipped otherwise).
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_stages import parse_override  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SYSTEM_DIR = os.path.join(ROOT, "detection-system")
+
+CHILD = r"""
+import json, os, sys, time
+spawned = float(os.environ["BENCH_SPAWNED"])
+marks = {"interpreter": time.time() - spawned}
+
+import numpy as np
+from config import Config
+from yolo_detector import YOLODetector
+marks["imports"] = time.time() - spawned
+
+config = Config()
+for name, value in json.loads(sys.argv[4]).items():
+    setattr(config, name, tuple(value) if isinstance(value, list) else value)
+config.INFERENCE_ENGINE = sys.argv[1]
+config.ONNX_OPTIMIZED_CACHE = sys.argv[2] == "1"
+config.WARMUP_RUNS = int(sys.argv[3])
+config.MOTION_GATING = False
+detector = YOLODetector(config)
+marks["ready"] = time.time() - spawned
+
+frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+start = time.perf_counter()
+detector.detect_objects(frame)
+marks["first_call"] = time.perf_counter() - start
+marks["first"] = time.time() - spawned
+
+start = time.perf_counter()
+detector.detect_objects(frame)
+marks["steady_call"] = time.perf_counter() - start
+print("BENCH " + json.dumps(marks))
+"""
+
+MODES = {
+    # name: (engine, cache enabled, clear cache before each run)
+    "opencv": ("opencv", False, False),
+    "onnxruntime-cold": ("onnxruntime", False, True),
+    "onnxruntime-cached": ("onnxruntime", True, False),
+}
+
+
+def clear_cache(model_path):
+    for path in glob.glob(f"{os.path.splitext(model_path)[0]}.*.opt.onnx"):
+        os.remove(path)
+
+
+def run_once(engine, cache, warmup_runs, overrides):
+    env = dict(os.environ, BENCH_SPAWNED=repr(time.time()))
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, engine, "1" if cache else "0", str(warmup_runs), json.dumps(overrides)],
+        cwd=SYSTEM_DIR, env=env, capture_output=True, text=True
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])
+    raise RuntimeError(f"{engine} run failed:\n{result.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup-runs", type=int, default=1)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Config override applied in every run")
+    args = parser.parse_args()
+    overrides = dict(parse_override(text) for text in args.set)
+
+    sys.path.insert(0, SYSTEM_DIR)
+    from config import Config
+    model_path = os.path.join(SYSTEM_DIR, Config.ONNX_MODEL_PATH)
+
+    print(f"{'mode':<20} {'imports':>8} {'ready':>8} {'first':>8} {'1st call':>9} {'steady':>8}  (s, median of {args.repeat})")
+    for name in args.modes.split(","):
+        engine, cache, cold = MODES[name]
+        if engine == "onnxruntime" and not os.path.exists(model_path):
+            print(f"{name:<20} skipped, {Config.ONNX_MODEL_PATH} not found")
+            continue
+        if cache:
+            # Untimed run that writes the cache
+            run_once(engine, cache, args.warmup_runs, overrides)
+
+        runs = []
+        for _ in range(args.repeat):
+            if cold:
+                clear_cache(model_path)
+            runs.append(run_once(engine, cache, args.warmup_runs, overrides))
+        median = {key: float(np.median([run[key] for run in runs])) for key in runs[0]}
+        print(f"{name:<20} {median['imports']:8.3f} {median['ready']:8.3f} {median['first']:8.3f} "
+              f"{median['first_call']:9.3f} {median['steady_call']:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Detection-loop stall per announcement: blocking gTTS speak() vs VoiceWorker
+
+Uses a stub synthesizer (fixed delay, writes dummy bytes) and a stub player
+that sleeps for the clip length, so no network or audio device is needed.
+Also exercises cache hits, restart persistence and LRU eviction.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "detection-system"))
+from voice_cache import AudioCache, VoiceWorker  # noqa: E402
+
+LABELS = ["person", "car", "dog", "chair", "laptop"]
+SYNTH_DELAY = 0.3
+CLIP_LENGTH = 0.2
+CLIP_BYTES = 4096
+
+
+class StubSynthesizer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text, lang, path):
+        self.calls += 1
+        time.sleep(SYNTH_DELAY)
+        with open(path, "wb") as f:
+            f.write(b"\x00" * CLIP_BYTES)
+
+
+class StubPlayer:
+    def play(self, path, interrupt):
+        interrupt.wait(CLIP_LENGTH)
+
+    def close(self):
+        pass
+
+
+def main():
+    phrases = [f"I see: {LABELS[i % 3]}, {LABELS[i % 5]}" for i in range(30)]
+
+    # Old path: synthesize and play inline on every announcement
+    synthesize = StubSynthesizer()
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        for phrase in phrases[:5]:
+            synthesize(phrase, "en", os.path.join(directory, "clip.mp3"))
+            time.sleep(CLIP_LENGTH)
+        blocking = (time.perf_counter() - start) / 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        synthesize = StubSynthesizer()
+        voice = VoiceWorker(AudioCache(directory), synthesize, StubPlayer, queue_size=len(phrases))
+        stalls = []
+        for phrase in phrases:
+            start = time.perf_counter()
+            voice.speak(phrase)
+            stalls.append(time.perf_counter() - start)
+        voice.wait_idle()
+        voice.stop()
+        stalls.sort()
+        print(f"blocking speak():  {1000 * blocking:8.1f} ms stall per announcement")
+        print(f"VoiceWorker:       {1000 * stalls[len(stalls) // 2]:8.3f} ms median, "
+              f"{1000 * stalls[-1]:.3f} ms max stall")
+        print(f"  {voice.cache.summary()} ({synthesize.calls} synth calls for {len(phrases)} phrases)")
+
+        # A new cache over the same directory starts warm
+        restarted = AudioCache(directory)
+        restarted.get(phrases[0], "en", synthesize)
+        print(f"  after restart: {restarted.summary()}")
+
+        # Shrinking the budget evicts the least recently used clips
+        small = AudioCache(directory, max_bytes=2 * CLIP_BYTES)
+        small.get("new phrase", "en", synthesize)
+        print(f"  2-clip budget: {small.summary()}, {len(os.listdir(directory))} files on disk")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,28 @@
-"""Entry point for the YOLO detection system"""
+"""Entry point for the YOLO detection system
 
+Usage: python __init__.py [source] [--headless] [--fast] [--motion-gate]
+
+source is a device index, video file, rtsp:// URL, image directory or
+.frames recording (default Config.CAMERA_SOURCE). --headless never opens a window, --fast
+replays recorded sources as fast as they decode instead of in real time,
+--motion-gate reuses detections while the scene is static.
+"""
+import sys
 
 
 if __name__ == "__main__":
+    from config import Config
+    from camera_manager import DetectionSystem
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    Config.HEADLESS = "--headless" in sys.argv
+    Config.REPLAY_REALTIME = "--fast" not in sys.argv
+    Config.MOTION_GATING = "--motion-gate" in sys.argv
+
     try:
-        system = DetectionSystem()
+        system = DetectionSystem(args[0] if args else None)
         system.run()
     except Exception as e:
         print(f"Error starting detection system: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
@@ -0,0 +1,158 @@
+"""Offline detection backfill over a directory of videos, one process per core
+
+Usage:
+    python annotate.py VIDEO_DIR OUTPUT_DIR [--workers N] [--format dets|jsonl]
+        [--motion-gate]
+
+Every video under VIDEO_DIR (recursively) gets OUTPUT_DIR/<relative path>
+plus .dets (BinarySink records, see records.read_binary) or .jsonl. Videos
+are handed to a process pool whose workers each load YOLODetector once
+and run every frame through detect_stream, so the detections match the
+live system for the same Config.
+
+Outputs are written under a .part name and renamed when the video is
+complete, so an interrupted run can simply be restarted: finished videos
+are skipped and partial ones redone.
+
+The motion gate is off unless --motion-gate is given, since its refresh
+interval is wall-clock time, which has no meaning when decoding faster
+than real time.
+"""
+import multiprocessing as mp
+import os
+import sys
+import time
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg", ".ts", ".wmv")
+FORMATS = {"dets": ".dets", "jsonl": ".jsonl"}
+
+# Per-process state set by _init_worker
+_detector = None
+_config = None
+
+
+def find_videos(directory):
+    """Video paths under directory, relative to it, in sorted order"""
+    videos = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(videos)
+
+
+def _init_worker(config, num_threads):
+    import cv2
+    from yolo_detector import YOLODetector
+
+    global _detector, _config
+    cv2.setNumThreads(num_threads)
+    if not config.ONNX_THREADS:
+        config.ONNX_THREADS = num_threads
+    _config = config
+    _detector = YOLODetector(config)
+
+
+def _annotate(task):
+    """Write the detections of one video; returns (video, frames, detections, seconds, error)"""
+    from records import BinarySink, JsonlSink
+    from stream import detect_stream
+
+    video, output, fmt = task
+    start = time.perf_counter()
+
+    # No state carries over from the previous video
+    _detector.last_result = None
+    if _detector.motion_gate is not None:
+        from motion_gate import MotionGate
+        _detector.motion_gate = MotionGate(_config)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    partial = output + ".part"
+    sink = BinarySink(partial) if fmt == "dets" else JsonlSink(partial, _detector.labels)
+    frames = detections = 0
+    try:
+        with sink:
+            for result in detect_stream(video, _config, _detector, (sink,)):
+                frames += 1
+                detections += len(result)
+    except Exception as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        return video, 0, 0, time.perf_counter() - start, str(e)
+
+    os.replace(partial, output)
+    return video, frames, detections, time.perf_counter() - start, None
+
+
+def annotate(config, video_dir, output_dir, workers=None, fmt="dets"):
+    """Annotate every unfinished video under video_dir; returns (videos, frames, seconds)"""
+    suffix = FORMATS[fmt]
+    tasks = []
+    skipped = 0
+    for relative in find_videos(video_dir):
+        output = os.path.join(output_dir, relative + suffix)
+        if os.path.exists(output):
+            skipped += 1
+            continue
+        tasks.append((os.path.join(video_dir, relative), output, fmt))
+
+    print(f"{len(tasks)} videos to annotate, {skipped} already done")
+    if not tasks:
+        return 0, 0, 0.0
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    # Split cores between workers instead of letting each grab all of them
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    total_frames = done = 0
+    start = time.perf_counter()
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(config, num_threads)) as pool:
+        # Longest videos first, so the tail of the run is not one big file
+        tasks.sort(key=lambda task: os.path.getsize(task[0]), reverse=True)
+        for video, frames, detections, seconds, error in pool.imap_unordered(_annotate, tasks):
+            done += 1
+            elapsed = time.perf_counter() - start
+            video = os.path.relpath(video, video_dir)
+            if error is not None:
+                print(f"[{done}/{len(tasks)}] {video}: failed, {error}")
+                continue
+            total_frames += frames
+            print(f"[{done}/{len(tasks)}] {video}: {frames} frames, {detections} detections, "
+                  f"{frames / max(seconds, 1e-9):.1f} FPS | total {total_frames / elapsed:.1f} FPS")
+
+    return done, total_frames, time.perf_counter() - start
+
+
+def _option(name, default=None):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+if __name__ == "__main__":
+    from config import Config
+
+    options = {"--workers", "--format"}
+    args = [a for i, a in enumerate(sys.argv[1:], 1)
+            if not a.startswith("--") and sys.argv[i - 1] not in options]
+    if len(args) != 2:
+        print(__doc__)
+        sys.exit(2)
+
+    config = Config()
+    config.MOTION_GATING = "--motion-gate" in sys.argv
+    workers = int(_option("--workers", 0)) or None
+    fmt = _option("--format", "dets")
+    if fmt not in FORMATS:
+        print(f"Unknown format '{fmt}', expected one of {sorted(FORMATS)}")
+        sys.exit(2)
+
+    try:
+        videos, frames, seconds = annotate(config, args[0], args[1], workers, fmt)
+    except KeyboardInterrupt:
+        print("Interrupted, finished videos are kept and the rest redone on the next run")
+        sys.exit(130)
+    if videos:
+        print(f"{videos} videos, {frames} frames in {seconds:.1f}s ({frames / max(seconds, 1e-9):.1f} FPS)")
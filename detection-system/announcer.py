@@ -0,0 +1,107 @@
+"""Per-label presence tracking that decides what to announce"""
+import time
+
+
+class LabelState:
+    """Hysteresis counters of one label that is present or on its way in or out"""
+
+    __slots__ = ("present", "seen", "missed")
+
+    def __init__(self):
+        self.present = False
+        self.seen = 0  # Consecutive frames with the label, while absent
+        self.missed = 0  # Consecutive frames without it, while present
+
+
+class Announcer:
+    """Announces a label once when it appears, not on every frame it is seen
+
+    A label enters after enter_frames consecutive frames containing it and
+    leaves after exit_frames consecutive frames without it, so a single
+    missed or spurious detection changes nothing. Entering queues the label
+    for announcement unless it was spoken less than cooldown seconds ago.
+
+    Only labels seen in the frame or still carrying state are visited, so
+    update() costs O(labels in play), independent of history length.
+    Queued labels come out in priority order (labels listed in priority
+    first, then in order of entry), at most max_objects per announcement;
+    the rest wait for the next update while they stay present.
+    """
+
+    def __init__(self, enter_frames=3, exit_frames=5, cooldown=10.0, priority=(),
+                 max_objects=3, clock=time.monotonic):
+        self.enter_frames = enter_frames
+        self.exit_frames = exit_frames
+        self.cooldown = cooldown
+        self.rank = {label: i for i, label in enumerate(priority)}
+        self.max_objects = max_objects
+        self.clock = clock
+
+        self.states = {}
+        self.pending = []
+        self.last_spoken = {}
+
+        # Statistics
+        self.frames = 0
+        self.entered = 0
+        self.announced = 0
+        self.suppressed = 0  # Entries inside the cooldown
+
+    def update(self, labels):
+        """Feed one frame's detected labels, returns the labels to announce now"""
+        self.frames += 1
+        now = self.clock()
+        current = dict.fromkeys(labels)
+
+        for label in current:
+            state = self.states.get(label)
+            if state is None:
+                state = self.states[label] = LabelState()
+            if state.present:
+                state.missed = 0
+                continue
+            state.seen += 1
+            if state.seen >= self.enter_frames:
+                state.present = True
+                state.seen = 0
+                self.entered += 1
+                last = self.last_spoken.get(label)
+                if last is not None and now - last < self.cooldown:
+                    self.suppressed += 1
+                else:
+                    self.pending.append(label)
+
+        for label in [label for label in self.states if label not in current]:
+            state = self.states[label]
+            if state.present:
+                state.missed += 1
+                if state.missed < self.exit_frames:
+                    continue
+            # Left, or an entry streak was broken
+            del self.states[label]
+
+        return self._take(now)
+
+    def _take(self, now):
+        if not self.pending:
+            return []
+        # Labels that left before being spoken are dropped
+        self.pending = [label for label in self.pending if label in self.states and self.states[label].present]
+        self.pending.sort(key=lambda label: self.rank.get(label, len(self.rank)))
+        spoken, self.pending = self.pending[:self.max_objects], self.pending[self.max_objects:]
+        for label in spoken:
+            self.last_spoken[label] = now
+        self.announced += len(spoken)
+        return spoken
+
+    def present(self):
+        """Labels currently considered in view"""
+        return [label for label, state in self.states.items() if state.present]
+
+    def reset(self):
+        self.states.clear()
+        self.pending.clear()
+
+    def summary(self):
+        return (f"announcer: {self.frames} frames, {self.entered} entries, "
+                f"{self.announced} announced, {self.suppressed} in cooldown")
@@ -6,10 +6,13 @@ import platform
 
 
 class AudioManager:
-    def __init__(self, queue_size=2):
+    def __init__(self, queue_size=2, speech_engine=None):
         self.detection_queue = queue.Queue(maxsize=queue_size)
+        self.speech_engine = speech_engine
         self.audio_thread = None
         self.running = True
+        self.announced = 0
+        self.dropped = 0  # Announcements discarded because the queue was full
         self._start_audio_thread()
 
     def _start_audio_thread(self):
@@ -31,6 +34,14 @@ class AudioManager:
 
     def _speak_fast(self, text):
         """Optimized offline TTS"""
+        if self.speech_engine is not None:
+            try:
+                self.speech_engine.say(text)
+                return
+            except Exception as e:
+                print(f"Speech engine failed, falling back to subprocess TTS: {e}")
+                self.speech_engine = None
+
         try:
             system = platform.system().lower()
 
@@ -56,9 +67,11 @@ class AudioManager:
         if not self.detection_queue.full():
             try:
                 self.detection_queue.put_nowait(text)
+                self.announced += 1
                 return True
             except queue.Full:
                 pass
+        self.dropped += 1
         return False
 
     def stop(self):
@@ -66,3 +79,5 @@ class AudioManager:
         self.running = False
         if self.audio_thread and self.audio_thread.is_alive():
             self.audio_thread.join(timeout=1.0)
+        if self.speech_engine is not None:
+            self.speech_engine.close()
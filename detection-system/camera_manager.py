@@ -1,29 +1,211 @@
 # camera_manager.py
 """Camera capture and management"""
+import os
+import queue
+import threading
+import time
+
 import cv2
 
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+STREAM_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+RECORDING_EXTENSION = ".frames"  # recording.FrameRecorder files
+
+
+def source_kind(source):
+    """'device', 'stream', 'images', 'recording' or 'file' for a CAMERA_SOURCE value"""
+    if isinstance(source, int) or str(source).isdigit():
+        return "device"
+    text = str(source)
+    if text.lower().startswith(STREAM_SCHEMES):
+        return "stream"
+    if os.path.isdir(text):
+        return "images"
+    if text.lower().endswith(RECORDING_EXTENSION):
+        return "recording"
+    return "file"
+
+
+class ImageDirectoryCapture:
+    """cv2.VideoCapture look-alike over the images in a directory, in name order"""
+
+    def __init__(self, directory):
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.position = 0
+
+    def read(self):
+        while self.position < len(self.paths):
+            frame = cv2.imread(self.paths[self.position])
+            self.position += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.paths))
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.paths = []
+
+
+class FramePrefetcher:
+    """Decodes frames on a background thread ahead of the consumer
+
+    Live sources keep only the newest frames (older ones are dropped), so
+    the consumer never falls behind real time. Recorded sources block the
+    decoder instead, so no frame is lost. read() returns (ret, frame,
+    grab time), the time.time() at which the frame was decoded.
+    """
+
+    def __init__(self, cap, size, live):
+        from pipeline import LatestQueue
+
+        self.cap = cap
+        self.live = live
+        self.frames = LatestQueue(size) if live else queue.Queue(maxsize=size)
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def _worker(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            item = ret, frame, time.time()
+            if self.live:
+                self.frames.put(item)
+            else:
+                while self.running:
+                    try:
+                        self.frames.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+            if not item[0]:
+                break
+
+    def read(self):
+        while self.running or self.frames.qsize():
+            try:
+                return self.frames.get(timeout=0.1)
+            except queue.Empty:
+                if not self.thread.is_alive():
+                    break
+        return False, None, None
+
+    @property
+    def dropped(self):
+        return getattr(self.frames, "dropped", 0)
+
+    def stop(self):
+        self.running = False
+        self.thread.join(timeout=1.0)
+
 
 class CameraManager:
-    def __init__(self, config):
+    """Frames from a device index, video file, stream URL, image directory or frame recording
+
+    Recorded sources (files, image directories, recordings) are replayed
+    at their own pace, REPLAY_SPEED times faster, when realtime is set,
+    otherwise as fast as they decode. Frame recordings follow their
+    capture timestamps instead of a fixed rate. With CAMERA_PREFETCH > 0
+    decoding runs on a background thread. With RECORD_PATH every frame
+    read is also appended to a frame recording.
+    """
+
+    def __init__(self, config, source=None, realtime=None):
         self.config = config
+        self.source = config.CAMERA_SOURCE if source is None else source
+        self.kind = source_kind(self.source)
+        self.realtime = config.REPLAY_REALTIME if realtime is None else realtime
         self.cap = None
+        self.prefetcher = None
+        self.frame_interval = 0.0
+        self.replay_start = None
+        self.frames_read = 0
+        self.first_timestamp = None
+        self.recorder = None
         self._setup_camera()
 
     def _setup_camera(self):
         """Initialize and configure camera"""
-        self.cap = cv2.VideoCapture(0)
-
-        # Configure camera properties
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.config.CAMERA_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config.CAMERA_HEIGHT)
-        self.cap.set(cv2.CAP_PROP_FPS, self.config.CAMERA_FPS)
-        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.config.CAMERA_BUFFER_SIZE)
+        if self.kind == "device":
+            self.cap = cv2.VideoCapture(int(self.source))
+
+            # Configure camera properties
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.config.CAMERA_WIDTH)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config.CAMERA_HEIGHT)
+            self.cap.set(cv2.CAP_PROP_FPS, self.config.CAMERA_FPS)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.config.CAMERA_BUFFER_SIZE)
+        elif self.kind == "images":
+            self.cap = ImageDirectoryCapture(self.source)
+        elif self.kind == "recording":
+            from recording import RecordingCapture
+            self.cap = RecordingCapture(self.source)
+        else:
+            self.cap = cv2.VideoCapture(self.source)
+            if self.kind == "stream":
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.config.CAMERA_BUFFER_SIZE)
+
+        if self.is_recorded() and self.realtime and self.kind != "recording":
+            fps = self.cap.get(cv2.CAP_PROP_FPS) or self.config.CAMERA_FPS
+            self.frame_interval = 1.0 / (fps * self.config.REPLAY_SPEED)
+
+        # Recordings are read without decoding, and their timestamps belong to the frame just read
+        if self.config.CAMERA_PREFETCH and self.cap.isOpened() and self.kind != "recording":
+            self.prefetcher = FramePrefetcher(self.cap, self.config.CAMERA_PREFETCH, live=not self.is_recorded())
+
+        # Raw copies of the frames read, for bit-exact replay
+        if self.config.RECORD_PATH and self.kind != "recording" and self.cap.isOpened():
+            from recording import FrameRecorder
+            self.recorder = FrameRecorder(self.config.RECORD_PATH, self.config.RECORD_MAX_BYTES)
+
+    def is_recorded(self):
+        """True for files, image directories and recordings, which have no natural pace"""
+        return self.kind in ("file", "images", "recording")
 
     def read_frame(self):
         """Read frame from camera"""
         if self.cap is None:
             return False, None
-        return self.cap.read()
+        # Capture time for the recorder, taken where the frame is grabbed
+        if self.prefetcher is not None:
+            ret, frame, grabbed = self.prefetcher.read()
+        else:
+            ret, frame = self.cap.read()
+            grabbed = time.time()
+
+        offset = None
+        if ret and self.frame_interval:
+            offset = self.frames_read * self.frame_interval
+        elif ret and self.kind == "recording" and self.realtime:
+            if self.first_timestamp is None:
+                self.first_timestamp = self.cap.timestamp
+            offset = (self.cap.timestamp - self.first_timestamp) / self.config.REPLAY_SPEED
+
+        if offset is not None:
+            # Sleep until this frame's place on the source timeline
+            now = time.perf_counter()
+            if self.replay_start is None:
+                self.replay_start = now
+            delay = self.replay_start + offset - now
+            if delay > 0:
+                time.sleep(delay)
+        if ret:
+            self.frames_read += 1
+            if self.recorder is not None:
+                self.recorder.write(frame, grabbed)
+        return ret, frame
 
     def is_opened(self):
         """Check if camera is open"""
@@ -31,6 +213,11 @@ class CameraManager:
 
     def release(self):
         """Release camera resources"""
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            self.prefetcher = None
+        if self.recorder is not None:
+            self.recorder.close()
         if self.cap:
             self.cap.release()
             self.cap = None
@@ -41,25 +228,124 @@ class CameraManager:
 # detection_system.py
 """Main detection system that coordinates all components"""
 import cv2
+import queue
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 
 class DetectionSystem:
-    def __init__(self):
+    def __init__(self, source=None):
         from config import Config
         from yolo_detector import YOLODetector
         from audio_manager import AudioManager
+        from announcer import Announcer
         from camera_manager import CameraManager
 
         self.config = Config()
-        self.detector = YOLODetector(self.config)
-        self.audio_manager = AudioManager(self.config.AUDIO_QUEUE_SIZE)
-        self.camera_manager = CameraManager(self.config)
+
+        # Opening a camera or stream can take as long as loading the model,
+        # so the source is opened on a helper thread while the model loads
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            opening = executor.submit(CameraManager, self.config, source)
+            self.detector = YOLODetector(self.config)
+            self.camera_manager = opening.result()
+
+        # Persistent synthesizer with COCO labels prerendered in the background
+        speech_engine = None
+        if self.config.SPEECH_CACHE_ENABLED:
+            from speech import create_speech_engine
+            speech_engine = create_speech_engine(self.detector.labels)
+        self.audio_manager = AudioManager(self.config.AUDIO_QUEUE_SIZE, speech_engine)
+        self.announcer = Announcer(
+            self.config.ANNOUNCE_ENTER_FRAMES,
+            self.config.ANNOUNCE_EXIT_FRAMES,
+            self.config.ANNOUNCE_COOLDOWN,
+            self.config.ANNOUNCE_PRIORITY,
+            self.config.MAX_ANNOUNCED_OBJECTS
+        )
+
+        # Tracker carries boxes across the frames the detector skips
+        self.tracker = None
+        if self.config.TRACKING_ENABLED:
+            from tracker import IoUTracker
+            self.tracker = IoUTracker(
+                self.config.TRACK_IOU_THRESHOLD,
+                self.config.TRACK_MAX_MISSES,
+                self.config.TRACK_MIN_HITS
+            )
+
+        # Display rendering, decoupled from detection; nothing is drawn headless
+        self.renderer = None
+        self.overlay = None  # (boxes, confidences, class_ids, idxs) shown on screen
+        if not self.config.HEADLESS:
+            from overlay import OverlayRenderer
+            self.renderer = OverlayRenderer(
+                self.detector.labels,
+                self.detector.colors,
+                self.config.OVERLAY_SPRITES,
+                self.config.OVERLAY_PREVIEW_WIDTH,
+                self.config.OVERLAY_MAX_FPS,
+                self.config.OVERLAY_STATUS_INTERVAL
+            )
 
         # Performance tracking
         self.frame_count = 0
         self.fps_counter = deque(maxlen=self.config.FPS_COUNTER_SIZE)
+        self.last_inference_time = None
+        self.scheduler = None
+
+        # Stage histograms and counters behind a Prometheus endpoint
+        self.metrics = None
+        if self.config.METRICS_ENABLED:
+            from metrics import create_metrics
+            self.metrics = create_metrics(self.config)
+            self._register_metrics()
+
+    def _register_metrics(self):
+        """Expose counters and queues the components already keep"""
+        self.detector.metrics = self.metrics
+        self.metrics.describe("frames_total", "Frames captured")
+        self.metrics.describe("nms_survivors_total", "Detections kept after NMS")
+        audio = self.audio_manager
+        self.metrics.register("announcements_total", "counter", lambda: audio.announced,
+                              "Announcements queued for speech")
+        self.metrics.register("announcements_dropped_total", "counter", lambda: audio.dropped,
+                              "Announcements dropped because the audio queue was full")
+        self.metrics.register("queue_depth", "gauge", audio.detection_queue.qsize,
+                              "Items waiting per queue", queue="audio")
+        announcer = self.announcer
+        self.metrics.register("announcements_suppressed_total", "counter", lambda: announcer.suppressed,
+                              "Labels that reappeared within their announcement cooldown")
+        gate = self.detector.motion_gate
+        if gate is not None:
+            self.metrics.register("frames_skipped_total", "counter", lambda: gate.reused,
+                                  "Frames that did not run the detector", reason="motion_gate")
+        cache = self.detector.result_cache
+        if cache is not None:
+            self.metrics.register("result_cache_hits_total", "counter", lambda: cache.hits,
+                                  "Frames answered from the result cache")
+            self.metrics.register("result_cache_misses_total", "counter", lambda: cache.misses,
+                                  "Result cache lookups that ran the detector")
+            self.metrics.register("result_cache_entries", "gauge", lambda: len(cache.entries))
+        if self.tracker is not None:
+            self.metrics.register("tracks_active", "gauge", lambda: len(self.tracker.tracks))
+
+    def _register_scheduler_metrics(self):
+        """Expose the scheduler's current level and the stage time averages it decides on"""
+        scheduler = self.scheduler
+        nan = float("nan")
+        self.metrics.register("scheduler_level", "gauge", lambda: scheduler.level,
+                              "Scheduler ladder level, 0 is the most expensive")
+        self.metrics.register("scheduler_input_size", "gauge", lambda: scheduler.levels[scheduler.level][0])
+        self.metrics.register("scheduler_every_n", "gauge", lambda: scheduler.levels[scheduler.level][1])
+        self.metrics.register("scheduler_unit_seconds", "gauge",
+                              lambda: nan if scheduler.unit_time is None else scheduler.unit_time,
+                              "Forward time per input pixel (moving average)")
+        self.metrics.register("scheduler_other_seconds", "gauge",
+                              lambda: nan if scheduler.other_time is None else scheduler.other_time,
+                              "Per-frame time outside the forward pass (moving average)")
+        self.metrics.register("scheduler_switches_total", "counter", lambda: scheduler.switches)
 
     def run(self):
         """Main detection loop"""
@@ -67,8 +353,29 @@ class DetectionSystem:
             print("Error: Could not open camera")
             return
 
-        print("Starting detection... Press 'q' to quit")
-
+        if self.config.HEADLESS:
+            print(f"Starting headless detection on {self.camera_manager.source}... Ctrl+C to stop")
+        else:
+            print("Starting detection... Press 'q' to quit")
+
+        # Fast replay of a recording must not drop frames, which the pipeline does by design
+        backfill = self.camera_manager.is_recorded() and not self.camera_manager.realtime
+        pipelined = self.config.PIPELINE_ENABLED and not backfill
+
+        if self.config.ADAPTIVE_SCHEDULING:
+            from scheduler import AdaptiveScheduler
+            # The pipeline always detects on the newest frame, so only input size adapts
+            self.scheduler = AdaptiveScheduler(self.config, cadence=not pipelined)
+            if self.metrics is not None:
+                self._register_scheduler_metrics()
+
+        if pipelined:
+            self._run_pipelined()
+        else:
+            self._run_sequential()
+
+    def _run_sequential(self):
+        """Capture, detect and render one after another on this thread"""
         try:
             while True:
                 loop_start = time.time()
@@ -78,23 +385,41 @@ class DetectionSystem:
                 if not ret:
                     print("Failed to read frame")
                     break
+                capture_time = time.time() - loop_start
 
                 self.frame_count += 1
-                detected_objects = []
+                self.last_inference_time = None
 
                 # Process frame (skip frames for performance)
-                if self.frame_count % self.config.PROCESS_EVERY_N_FRAMES == 0:
-                    detected_objects = self._process_frame(frame)
-
-                # Update display
-                self._update_display(frame, detected_objects)
-
-                # Handle user input
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
+                skipped = self.frame_count % self.config.PROCESS_EVERY_N_FRAMES != 0
+                if not skipped:
+                    self._process_frame(frame)
+                elif self.tracker is not None:
+                    self._propagate_tracks()
+
+                # Update display, at display rate rather than capture rate
+                display_start = time.time()
+                displayed = self.renderer is not None and self.renderer.due()
+                if displayed:
+                    self._update_display(frame, self.overlay, in_place=True)
+
+                    # Handle user input
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+
+                if self.metrics is not None:
+                    self.metrics.observe("capture", capture_time)
+                    if displayed:
+                        self.metrics.observe("display", time.time() - display_start)
+                    self.metrics.inc("frames_total")
+                    if skipped:
+                        self.metrics.inc("frames_skipped_total", reason="cadence")
 
                 # Update FPS counter
-                self.fps_counter.append(time.time() - loop_start)
+                frame_time = time.time() - loop_start
+                self.fps_counter.append(frame_time)
+                if self.scheduler is not None:
+                    self.scheduler.observe(frame_time, self.last_inference_time)
 
         except KeyboardInterrupt:
             print("\nInterrupted by user")
@@ -104,40 +429,166 @@ class DetectionSystem:
     def _process_frame(self, frame):
         """Process a single frame for object detection"""
         # Run detection
-        boxes, confidences, class_ids, idxs, inf_time = self.detector.detect_objects(frame)
+        # In ROI mode, tracked boxes are searched alongside changed regions
+        tracked = self.tracker.results()[0] if self.tracker is not None else ()
+        boxes, confidences, class_ids, idxs, inf_time = self.detector.detect_objects(frame, tracked)
+        # Reused results (motion gate, unchanged ROI frame) carry no forward time for the scheduler
+        self.last_inference_time = None if self.detector.last_reused else inf_time
 
-        # Draw detections
-        detected_objects = self.detector.draw_detections(
-            frame, boxes, confidences, class_ids, idxs
-        )
+        if self.tracker is not None:
+            self.tracker.update(boxes, confidences, class_ids, idxs)
+            boxes, confidences, class_ids, idxs, _ = self.tracker.results()
+
+        # Drawn by the renderer when the display is next refreshed
+        self.overlay = (boxes, confidences, class_ids, idxs)
+        detected_objects = [self.detector.labels[class_ids[i]] for i in idxs]
 
         # Handle audio announcements
-        if self.detector.should_announce(detected_objects):
-            unique_objects = list(set(detected_objects))
-            if unique_objects:
-                objects_text = ", ".join(unique_objects[:self.config.MAX_ANNOUNCED_OBJECTS])
-                self.audio_manager.announce(f"Detected: {objects_text}")
+        self._announce(detected_objects)
 
         return detected_objects
 
-    def _update_display(self, frame, detected_objects):
-        """Update the display window with current frame and stats"""
-        # Calculate FPS
-        avg_fps = 0
-        if self.fps_counter:
-            avg_fps = len(self.fps_counter) / sum(self.fps_counter)
+    def _propagate_tracks(self):
+        """Move tracked boxes forward by their motion model, no detector run"""
+        self.tracker.predict()
+        boxes, confidences, class_ids, idxs, _ = self.tracker.results()
+        self.overlay = (boxes, confidences, class_ids, idxs)
+        return [self.detector.labels[class_ids[i]] for i in idxs]
+
+    def _run_pipelined(self):
+        """Capture and inference on background threads, render on this thread"""
+        from pipeline import LatestQueue, CaptureStage, InferenceStage, StageStats
+
+        inference_frames = LatestQueue(self.config.PIPELINE_QUEUE_SIZE)
+        render_frames = LatestQueue(self.config.PIPELINE_QUEUE_SIZE)
+        # Headless runs never render, so capture feeds inference only
+        outputs = [inference_frames] if self.config.HEADLESS else [inference_frames, render_frames]
+        capture = CaptureStage(self.camera_manager, outputs, self.metrics)
+        inference = InferenceStage(self.detector, inference_frames, self._on_detection, self.metrics)
+        render_stats = StageStats("render", metrics=self.metrics)
+        stages = [capture.stats, inference.stats, render_stats]
+
+        if self.metrics is not None:
+            self.metrics.register("frames_total", "counter", lambda: capture.stats.count)
+            for name, frames in (("inference", inference_frames), ("render", render_frames)):
+                self.metrics.register("queue_depth", "gauge", frames.qsize, queue=name)
+                self.metrics.register("frames_skipped_total", "counter", lambda frames=frames: frames.dropped,
+                                      reason=f"stale_{name}")
+
+        capture.start()
+        inference.start()
+        try:
+            while not capture.finished.is_set() and inference.error is None:
+                if self.config.HEADLESS:
+                    capture.finished.wait(0.1)
+                    continue
+
+                try:
+                    _, frame = render_frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if not self.renderer.due():
+                    continue
+
+                start = time.time()
+                # HighGUI must stay on the main thread; the renderer draws on a
+                # copy so the inference stage never sees overlay pixels
+                overlay = None
+                if self.tracker is not None:
+                    self._propagate_tracks()
+                    overlay = self.overlay
+                elif inference.latest is not None:
+                    _, boxes, confidences, class_ids, idxs, _ = inference.latest
+                    overlay = (boxes, confidences, class_ids, idxs)
+
+                self._update_display(frame, overlay, stages)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+                render_stats.record(time.time() - start)
+
+            # A recording ends: let inference finish the frames it already delivered
+            if self.camera_manager.is_recorded():
+                inference.drain()
+            if inference.error is not None:
+                raise inference.error
 
-        # Display status
-        status = f"FPS: {avg_fps:.1f} | Objects: {len(detected_objects)}"
-        cv2.putText(frame, status, (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        except KeyboardInterrupt:
+            print("\nInterrupted by user")
+        finally:
+            capture.stop()
+            inference.stop()
+            for stats in stages:
+                print(stats.summary())
+            print(f"Dropped stale frames: inference {inference_frames.dropped}, "
+                  f"render {render_frames.dropped}")
+            self._cleanup()
 
-        cv2.imshow("YOLO Object Detection", frame)
+    def _on_detection(self, result):
+        """Announce objects from an inference stage result"""
+        _, boxes, confidences, class_ids, idxs, inference_time = result
+        if self.scheduler is not None and not self.detector.last_reused:
+            self.scheduler.observe(0.0, inference_time)
+        if self.tracker is not None:
+            self.tracker.update(boxes, confidences, class_ids, idxs)
+        self._announce([self.detector.labels[class_ids[i]] for i in idxs])
+
+    def _announce(self, detected_objects):
+        """Queue an announcement for stable detections"""
+        start = time.time()
+        if self.tracker is not None:
+            # Labels of tracks matched often enough, so one-off detections never count
+            detected_objects = [self.detector.labels[t.class_id] for t in self.tracker.stable()]
+        # Only labels that just came into view, in priority order
+        entered = self.announcer.update(detected_objects)
+        if entered:
+            self.audio_manager.announce(f"Detected: {', '.join(entered)}")
+
+        if self.metrics is not None:
+            self.metrics.observe("announce", time.time() - start)
+
+    def _update_display(self, frame, overlay, stage_stats=None, in_place=False):
+        """Update the display window with current frame and stats"""
+        status_lines = []
+        if stage_stats:
+            # Per-stage throughput shows which stage is the bottleneck
+            status_lines = [stats.summary() for stats in stage_stats]
+        else:
+            # Calculate FPS
+            avg_fps = 0
+            if self.fps_counter:
+                avg_fps = len(self.fps_counter) / sum(self.fps_counter)
+
+            # Display status
+            status = f"FPS: {avg_fps:.1f} | Objects: {0 if overlay is None else len(overlay[3])}"
+            if self.scheduler is not None:
+                status += f" | {self.config.INPUT_SIZE}px every {self.config.PROCESS_EVERY_N_FRAMES}"
+            status_lines = [status]
+
+        if not self.config.OVERLAY_ENABLED:
+            overlay, status_lines = None, ()
+        start = time.perf_counter()
+        image = self.renderer.render(frame, overlay, status_lines, in_place)
+        if self.metrics is not None:
+            self.metrics.observe("draw", time.perf_counter() - start)
+        cv2.imshow("YOLO Object Detection", image)
 
     def _cleanup(self):
         """Clean up resources"""
         print("Cleaning up...")
+        if self.detector.motion_gate is not None:
+            print(self.detector.motion_gate.summary())
+        if self.detector.result_cache is not None:
+            print(self.detector.result_cache.summary())
+        if self.config.CASCADE_MODE:
+            print(self.detector.cascade_summary())
+        print(self.announcer.summary())
+        if self.renderer is not None:
+            print(self.renderer.summary())
+        if self.metrics is not None:
+            print(self.metrics.summary())
+            self.metrics.stop()
         self.audio_manager.stop()
         self.camera_manager.release()
-        cv2.destroyAllWindows()
+        if not self.config.HEADLESS:
+            cv2.destroyAllWindows()
         print("Detection stopped.")
@@ -7,24 +7,133 @@ class Config:
     CONFIG_PATH = "../yolo-coco/yolov3.cfg"
     LABELS_PATH = "../yolo-coco/coco.names"
 
+    # Inference Engine
+    INFERENCE_ENGINE = "opencv"  # "opencv" (cv2.dnn) or "onnxruntime"
+    ONNX_MODEL_PATH = "../yolo-coco/yolov3.onnx"  # Created by convert_darknet.py
+    ONNX_THREADS = 0  # 0 lets ONNX Runtime pick
+    ONNX_OPTIMIZED_CACHE = True  # Reuse the optimized graph across launches
+    WARMUP_RUNS = 1  # Dummy forwards after loading
+    WARMUP_SIZES = ()  # Input sizes warmed besides INPUT_SIZE, e.g. SCHEDULER_INPUT_SIZES
+
     # Detection Parameters
     INPUT_SIZE = 320  # 320, 416, or 608
     CONFIDENCE_THRESHOLD = 0.6
     NMS_THRESHOLD = 0.4
     PROCESS_EVERY_N_FRAMES = 3
+    PREPROCESS_BUFFERS = True  # Reuse blob buffers instead of blobFromImage per frame
+    LETTERBOX = False  # Keep aspect ratio with gray padding (full-frame path)
+    CLASS_ALLOWLIST = ()  # Labels to detect, e.g. ("person", "car", "bicycle", "dog"); empty keeps all
+    YOLO_HEADS = ()  # [yolo] outputs to decode in cfg order (0 large, 1 medium, 2 small objects); empty keeps all.
+    # Forward time drops only on cv2.dnn and only when trailing heads are left out, e.g. (0, 1)
+
+    # Adaptive scheduling (overrides INPUT_SIZE / PROCESS_EVERY_N_FRAMES at runtime)
+    ADAPTIVE_SCHEDULING = False
+    TARGET_FPS = 20  # Frame budget, or detection rate in pipeline mode
+    SCHEDULER_INPUT_SIZES = (320, 416, 608)
+    SCHEDULER_MAX_EVERY_N = 4
+    SCHEDULER_HYSTERESIS = 0.15  # Fractional margin around the budget
+    SCHEDULER_INTERVAL = 30  # Frames between decisions
+    SCHEDULER_PATIENCE = 3  # Evaluations with headroom before stepping up
+    SCHEDULER_HISTORY_SIZE = 50  # Decisions kept for telemetry
+
+    # Motion gating (reuse detections while the scene is static). Opt-in: a reused
+    # result misses new or small objects until the next refresh
+    MOTION_GATING = False
+    MOTION_GATE_WIDTH = 64  # Thumbnail width used for differencing
+    MOTION_PIXEL_THRESHOLD = 25  # Grey-level change that counts as changed
+    MOTION_AREA_THRESHOLD = 0.01  # Fraction of changed pixels that triggers detection
+    MOTION_MAX_REUSE = 30  # Detector runs that may be skipped in a row
+    MOTION_REFRESH_SECONDS = 5.0  # Forced refresh interval
+
+    # Region-of-interest mode (detect only on tiles around changed regions)
+    ROI_MODE = False
+    ROI_TILE_SIZE = 320  # Crop size in frame pixels, resized to INPUT_SIZE
+    ROI_MARGIN = 16  # Pixels added around each changed region
+    ROI_DIFF_WIDTH = 160  # Thumbnail width used to locate changes
+    ROI_MIN_REGION_AREA = 64  # Changed areas smaller than this (pixels) are ignored
+    ROI_MAX_TILES = 6  # More tiles than this falls back to a full-frame pass
+    ROI_MAX_AREA = 0.6  # Tile area fraction above which a full frame is cheaper
+    ROI_FULL_FRAME_EVERY = 30  # Periodic full-frame refresh (ROI frames)
+
+    # Resolution cascade (full-frame path; replaces INPUT_SIZE when enabled)
+    CASCADE_MODE = False
+    CASCADE_LOW_SIZE = 320  # Input size of the pass every frame gets
+    CASCADE_HIGH_SIZE = 608  # Input size of the escalation pass
+    CASCADE_MIN_SCORE = 0.3  # Low-pass survivors between this and CONFIDENCE_THRESHOLD escalate
+    CASCADE_MIN_BOX = 24  # Detections narrower than this at the low input size (pixels) escalate
+    CASCADE_TRACK_IOU = 0.3  # Tracked boxes without a low-pass match this good escalate
+
+    # Result cache (repeated still images skip the forward pass)
+    RESULT_CACHE = False
+    RESULT_CACHE_MODE = "exact"  # "exact" pixels or "perceptual" difference hash
+    RESULT_CACHE_DISTANCE = 0  # Perceptual: differing hash bits (of 64) that still count as the same image
+    RESULT_CACHE_ENTRIES = 256
+    RESULT_CACHE_BYTES = 16 * 1024 * 1024  # Cached result arrays
+    RESULT_CACHE_TTL = 300.0  # Seconds, 0 keeps entries until evicted
+
+    # Tracking (propagates boxes on skipped frames)
+    TRACKING_ENABLED = True
+    TRACK_IOU_THRESHOLD = 0.3
+    TRACK_MAX_MISSES = 2  # Detector runs a track may go unmatched
+    TRACK_MIN_HITS = 3  # Detector matches before a track's label counts for announcements
 
     # Camera Settings
+    CAMERA_SOURCE = 0  # Device index, video file, rtsp:// (or http://) URL, or image directory
     CAMERA_WIDTH = 640
     CAMERA_HEIGHT = 480
-    CAMERA_FPS = 30
+    CAMERA_FPS = 30  # Also the replay rate of image directories
     CAMERA_BUFFER_SIZE = 1
+    CAMERA_PREFETCH = 0  # Frames decoded ahead on a background thread, 0 reads inline
+    REPLAY_REALTIME = True  # Files / image directories / recordings at source pace, False = as fast as possible
+    REPLAY_SPEED = 1.0  # Pace multiplier for REPLAY_REALTIME, e.g. 4.0 replays four times faster
+    RECORD_PATH = ""  # Append every frame read to this .frames recording (recording.py), empty disables
+    RECORD_MAX_BYTES = 1024 * 1024 * 1024  # Recording ring size, the oldest frames are overwritten
+
+    # Display
+    HEADLESS = False  # Never open HighGUI windows (servers, bulk processing)
+    OVERLAY_ENABLED = True  # Draw boxes, labels and status on the displayed frame
+    OVERLAY_SPRITES = False  # Blit cached label images instead of putText per box (no measured gain)
+    OVERLAY_PREVIEW_WIDTH = 0  # Draw on and show a copy scaled to this width, 0 keeps full size
+    OVERLAY_MAX_FPS = 30  # Display refresh limit, independent of capture and detection (0 = every frame)
+    OVERLAY_STATUS_INTERVAL = 0.5  # Seconds between status text refreshes
 
     # Audio Settings
-    DETECTION_HISTORY_SIZE = 10
     AUDIO_QUEUE_SIZE = 2
     MAX_ANNOUNCED_OBJECTS = 3
+    ANNOUNCE_ENTER_FRAMES = 3  # Consecutive detections before a label is announced
+    ANNOUNCE_EXIT_FRAMES = 5  # Consecutive misses before a label counts as gone
+    ANNOUNCE_COOLDOWN = 10.0  # Seconds before the same label is announced again
+    ANNOUNCE_PRIORITY = ("person", "car", "bicycle", "motorbike", "bus", "truck", "dog")  # Spoken first
+    SPEECH_CACHE_ENABLED = True  # Persistent synthesizer + prerendered label clips
 
     # Performance
     FPS_COUNTER_SIZE = 30
 
+    # Metrics (stage histograms and counters)
+    METRICS_ENABLED = False
+    METRICS_HOST = "127.0.0.1"
+    METRICS_PORT = 9108  # Prometheus text at /metrics, 0 disables the endpoint
+    METRICS_LOG_INTERVAL = 0  # Seconds between summary log lines, 0 disables
+
+    # Pipeline (capture / inference / render on separate stages)
+    PIPELINE_ENABLED = True
+    PIPELINE_QUEUE_SIZE = 1  # Frames kept per stage, older ones are dropped
+
+    # Multi-stream batching
+    BATCH_MAX_WAIT = 0.02  # Seconds to wait for other streams before a forward
+
+    # Detection service (service.py)
+    SERVICE_HOST = "127.0.0.1"
+    SERVICE_PORT = 8080
+    SERVICE_MAX_BATCH = 8  # Frames per batched forward
+    SERVICE_MAX_WAIT = 0.01  # Seconds a frame waits for others to join its batch
+    SERVICE_QUEUE_SIZE = 32  # Frames waiting for inference before requests get 503
+    SERVICE_DECODE_THREADS = 4  # Image decoding off the event loop
+    SERVICE_WS_INFLIGHT = 2  # Frames per WebSocket in flight before new ones are dropped
+    SERVICE_MAX_BODY = 8 * 1024 * 1024  # Largest accepted image, bytes
+
+    # Process pool
+    POOL_WORKERS = 4  # Detector processes, each loads its own net
+    POOL_RING_SLOTS = 8  # Shared-memory frame slots (at least 2 per worker)
+
 
@@ -0,0 +1,202 @@
+"""Convert the Darknet YOLOv3 cfg/weights in yolo-coco/ to ONNX
+
+Usage (from detection-system/):
+    python convert_darknet.py [output.onnx] [--verify]
+
+The exported graph takes a (N, 3, H, W) blob as produced by
+cv2.dnn.blobFromImage(s) and outputs the raw tensor feeding each [yolo]
+layer. --verify runs both engines on sample frames and checks that the
+detections match within tolerance.
+"""
+import sys
+
+import numpy as np
+
+from config import Config
+from darknet import parse_cfg, read_weights
+
+OPSET = 13
+IR_VERSION = 7  # Oldest IR that supports opset 13, loadable by older runtimes
+BN_EPSILON = 1e-6  # Darknet's batchnorm epsilon
+
+
+def build_onnx(cfg_path, weights_path):
+    """Build an onnx.ModelProto equivalent to the Darknet network"""
+    import onnx
+    from onnx import helper, numpy_helper, TensorProto
+
+    sections = parse_cfg(cfg_path)
+    net, layers = sections[0], sections[1:]
+    weights = read_weights(weights_path)
+    position = 0
+
+    nodes = []
+    initializers = []
+    outputs = []
+    layer_outputs = []
+    layer_channels = []
+    channels = int(net.get("channels", 3))
+    current = "images"
+
+    def take(count):
+        nonlocal position
+        chunk = weights[position:position + count]
+        if len(chunk) != count:
+            raise ValueError("Weights file is shorter than the cfg requires")
+        position += count
+        return chunk
+
+    def const(name, array):
+        initializers.append(numpy_helper.from_array(np.ascontiguousarray(array), name))
+        return name
+
+    for i, layer in enumerate(layers):
+        kind = layer["type"]
+        name = f"layer{i}"
+
+        if kind == "convolutional":
+            filters = int(layer["filters"])
+            size = int(layer["size"])
+            stride = int(layer.get("stride", 1))
+            pad = size // 2 if int(layer.get("pad", 0)) else 0
+
+            # Darknet stores BN (bias, scale, mean, var) or plain bias before weights
+            if int(layer.get("batch_normalize", 0)):
+                bias, scale, mean, var = (take(filters) for _ in range(4))
+                kernel = take(filters * channels * size * size).reshape(filters, channels, size, size)
+                factor = scale / np.sqrt(var + BN_EPSILON)
+                kernel = kernel * factor[:, None, None, None]
+                bias = bias - mean * factor
+            else:
+                bias = take(filters)
+                kernel = take(filters * channels * size * size).reshape(filters, channels, size, size)
+
+            conv_out = name if layer.get("activation") == "linear" else f"{name}_conv"
+            nodes.append(helper.make_node(
+                "Conv",
+                [current, const(f"{name}_w", kernel.astype(np.float32)),
+                 const(f"{name}_b", bias.astype(np.float32))],
+                [conv_out],
+                kernel_shape=[size, size], strides=[stride, stride], pads=[pad] * 4
+            ))
+            if layer.get("activation") == "leaky":
+                nodes.append(helper.make_node("LeakyRelu", [conv_out], [name], alpha=0.1))
+            elif layer.get("activation") != "linear":
+                raise ValueError(f"Unsupported activation '{layer.get('activation')}'")
+            current, channels = name, filters
+
+        elif kind == "shortcut":
+            source = int(layer["from"])
+            source = source if source >= 0 else i + source
+            nodes.append(helper.make_node("Add", [current, layer_outputs[source]], [name]))
+            current = name
+
+        elif kind == "route":
+            sources = [int(v) for v in layer["layers"].split(",")]
+            sources = [s if s >= 0 else i + s for s in sources]
+            inputs = [layer_outputs[s] for s in sources]
+            if len(inputs) == 1:
+                nodes.append(helper.make_node("Identity", inputs, [name]))
+            else:
+                nodes.append(helper.make_node("Concat", inputs, [name], axis=1))
+            current = name
+            channels = sum(layer_channels[s] for s in sources)
+
+        elif kind == "upsample":
+            stride = float(layer.get("stride", 2))
+            nodes.append(helper.make_node(
+                "Resize",
+                [current, "", const(f"{name}_scales", np.array([1, 1, stride, stride], dtype=np.float32))],
+                [name],
+                mode="nearest"
+            ))
+            current = name
+
+        elif kind == "yolo":
+            outputs.append(helper.make_tensor_value_info(
+                current, TensorProto.FLOAT, ["batch", channels, f"{name}_h", f"{name}_w"]
+            ))
+
+        else:
+            raise ValueError(f"Unsupported Darknet layer type [{kind}]")
+
+        layer_outputs.append(current)
+        layer_channels.append(channels)
+
+    if position != len(weights):
+        print(f"Warning: {len(weights) - position} trailing weights were not used")
+
+    height, width = int(net.get("height", 416)), int(net.get("width", 416))
+    graph = helper.make_graph(
+        nodes, "yolov3",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT,
+                                       ["batch", int(net.get("channels", 3)), "height", "width"])],
+        outputs, initializers
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", OPSET)],
+                              ir_version=IR_VERSION, producer_name="convert_darknet")
+    onnx.checker.check_model(model)
+    print(f"Converted {len(layers)} layers for {width}x{height} input, {len(outputs)} outputs")
+    return model
+
+
+def verify(config, frames, box_tolerance=2, score_tolerance=1e-3):
+    """Check that the ONNX engine reproduces the OpenCV engine's detections"""
+    from yolo_detector import YOLODetector
+
+    config.INFERENCE_ENGINE = "opencv"
+    reference = YOLODetector(config)
+    config.INFERENCE_ENGINE = "onnxruntime"
+    candidate = YOLODetector(config)
+
+    ok = True
+    for n, frame in enumerate(frames):
+        ref_boxes, ref_conf, ref_ids, ref_idxs, _ = reference.detect_objects(frame)
+        boxes, conf, ids, idxs, _ = candidate.detect_objects(frame)
+
+        ref_set = sorted(zip(ref_ids[ref_idxs], ref_boxes[ref_idxs].tolist(), ref_conf[ref_idxs]))
+        new_set = sorted(zip(ids[idxs], boxes[idxs].tolist(), conf[idxs]))
+        match = len(ref_set) == len(new_set) and all(
+            a[0] == b[0]
+            and np.abs(np.subtract(a[1], b[1])).max() <= box_tolerance
+            and abs(a[2] - b[2]) <= score_tolerance
+            for a, b in zip(ref_set, new_set)
+        )
+        print(f"frame {n}: {len(ref_set)} vs {len(new_set)} detections {'OK' if match else 'MISMATCH'}")
+        ok = ok and match
+    return ok
+
+
+def _sample_frames(config, count=4):
+    """Frames from the configured camera source, random frames as fallback"""
+    import cv2
+
+    frames = []
+    cap = cv2.VideoCapture(config.CAMERA_SOURCE)
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+
+    rng = np.random.default_rng(0)
+    while len(frames) < count:
+        frames.append(rng.integers(0, 255, (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3), dtype=np.uint8))
+    return frames
+
+
+if __name__ == "__main__":
+    import onnx
+
+    config = Config()
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if args:
+        config.ONNX_MODEL_PATH = args[0]
+
+    model = build_onnx(config.CONFIG_PATH, config.WEIGHTS_PATH)
+    onnx.save(model, config.ONNX_MODEL_PATH)
+    print(f"Saved {config.ONNX_MODEL_PATH}")
+
+    if "--verify" in sys.argv:
+        sys.exit(0 if verify(config, _sample_frames(config)) else 1)
@@ -0,0 +1,85 @@
+"""Darknet cfg / weights parsing shared by the converter and inference engines"""
+import numpy as np
+
+# cv2.dnn's Region layer zeroes class scores at or below this threshold
+REGION_SCORE_THRESHOLD = 0.2
+
+
+def parse_cfg(path):
+    """Parse a Darknet .cfg file into a list of {"type": ..., key: value} sections"""
+    sections = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("["):
+                sections.append({"type": line.strip("[]").strip()})
+            else:
+                key, value = line.split("=", 1)
+                sections[-1][key.strip()] = value.strip()
+    return sections
+
+
+def _ints(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def yolo_heads(sections):
+    """Anchor sets (pixels) and class count for each [yolo] section in order"""
+    heads = []
+    for section in sections:
+        if section["type"] != "yolo":
+            continue
+        anchors = np.array(_ints(section["anchors"]), dtype=np.float32).reshape(-1, 2)
+        mask = _ints(section.get("mask", ",".join(str(i) for i in range(len(anchors)))))
+        heads.append({
+            "anchors": anchors[mask],
+            "classes": int(section["classes"]),
+            "scale_x_y": float(section.get("scale_x_y", 1.0)),
+        })
+    return heads
+
+
+def read_weights(path):
+    """Return the flat float32 weight array following the Darknet header"""
+    with open(path, "rb") as f:
+        major, minor, _ = np.fromfile(f, dtype=np.int32, count=3)
+        # 'seen' counter is 64-bit from format 0.2 onwards
+        if major * 10 + minor >= 2:
+            np.fromfile(f, dtype=np.int64, count=1)
+        else:
+            np.fromfile(f, dtype=np.int32, count=1)
+        return np.fromfile(f, dtype=np.float32)
+
+
+def decode_head(raw, anchors, scale_x_y, input_width, input_height):
+    """Decode a raw (N, A*(5+C), H, W) YOLO head into cv2.dnn's row layout
+
+    Rows are ordered by cell then anchor and hold normalized
+    [cx, cy, w, h, objectness, class scores * objectness], matching the
+    output of OpenCV's Region layer.
+    """
+    batch, _, rows, cols = raw.shape
+    num_anchors = len(anchors)
+    out = raw.reshape(batch, num_anchors, -1, rows, cols).transpose(0, 3, 4, 1, 2).copy()
+
+    grid_y, grid_x = np.mgrid[0:rows, 0:cols].astype(np.float32)
+    sig = 1.0 / (1.0 + np.exp(-out[..., [0, 1, 4]]))
+    offset = (scale_x_y - 1) / 2
+
+    out[..., 0] = (grid_x[None, :, :, None] + sig[..., 0] * scale_x_y - offset) / cols
+    out[..., 1] = (grid_y[None, :, :, None] + sig[..., 1] * scale_x_y - offset) / rows
+    out[..., 2] = np.exp(out[..., 2]) * anchors[:, 0] / input_width
+    out[..., 3] = np.exp(out[..., 3]) * anchors[:, 1] / input_height
+    out[..., 4] = sig[..., 2]
+
+    # Scores never exceed objectness, so class sigmoids are only needed
+    # on rows whose objectness clears the region threshold
+    live = out[..., 4] > REGION_SCORE_THRESHOLD
+    rows_out = out[live]
+    scores = rows_out[:, 4:5] / (1.0 + np.exp(-rows_out[:, 5:]))
+    out[..., 5:] = 0
+    out[live, 5:] = np.where(scores > REGION_SCORE_THRESHOLD, scores, 0)
+
+    return out.reshape(batch, rows * cols * num_anchors, -1)
@@ -0,0 +1,217 @@
+"""Process pool of YOLO detectors fed through a shared-memory frame ring"""
+import multiprocessing as mp
+import os
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class FrameRing:
+    """Preallocated frame slots in shared memory, addressed by slot index"""
+
+    def __init__(self, slots, shape, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        size = slots * int(np.prod(self.shape))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, slot, frame):
+        """Copy a frame into a slot"""
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match ring slot shape {self.shape}")
+        np.copyto(self.frames[slot], frame)
+
+    def close(self):
+        del self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class WorkerError(RuntimeError):
+    """A pool worker failed; carries the worker's traceback text"""
+
+
+# Seconds between liveness checks while waiting on the pool queues
+POLL_INTERVAL = 0.5
+
+
+def _pool_worker(config, ring_name, slots, shape, num_threads, tasks, results, free_slots):
+    """Load one net and detect frames referenced by slot index
+
+    Failures go back through results as (seq, WorkerError), with seq None
+    when the net could not be loaded.
+    """
+    import cv2
+    from yolo_detector import YOLODetector
+
+    cv2.setNumThreads(num_threads)
+    # Frames are dealt round-robin, so a worker never sees consecutive frames:
+    # state carried from the previous frame (motion gate reuse, ROI tiles)
+    # would answer with another frame's result. The result cache is keyed by
+    # frame content and stays as configured.
+    config.MOTION_GATING = False
+    config.ROI_MODE = False
+    ring = FrameRing(slots, shape, name=ring_name)
+    try:
+        try:
+            detector = YOLODetector(config)
+        except Exception:
+            results.put((None, WorkerError(f"Worker {os.getpid()} failed to load the model:\n"
+                                           f"{traceback.format_exc()}")))
+            return
+
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            seq, slot = task
+            try:
+                boxes, confidences, class_ids, idxs, inf_time = detector.detect_objects(ring.frames[slot])
+            except Exception:
+                results.put((seq, WorkerError(f"Frame {seq} failed in worker {os.getpid()}:\n"
+                                              f"{traceback.format_exc()}")))
+                continue
+            finally:
+                free_slots.put(slot)
+            results.put((seq, boxes, confidences, class_ids, idxs, inf_time))
+    finally:
+        ring.close()
+
+
+class YOLODetectorPool:
+    """Runs YOLODetector in K worker processes, returning results in frame order"""
+
+    def __init__(self, config, workers=None, frame_shape=None):
+        self.config = config
+        self.workers = workers or config.POOL_WORKERS
+        shape = frame_shape or (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3)
+        slots = max(config.POOL_RING_SLOTS, self.workers * 2)
+        self.ring = FrameRing(slots, shape)
+
+        # Split cores between workers instead of letting each grab all of them
+        num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+
+        ctx = mp.get_context("spawn")
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.free_slots = ctx.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+
+        self.processes = [
+            ctx.Process(
+                target=_pool_worker,
+                args=(config, self.ring.name, slots, self.ring.shape, num_threads,
+                      self.tasks, self.results, self.free_slots),
+                daemon=True
+            )
+            for _ in range(self.workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+        self.next_submit = 0
+        self.next_result = 0
+        self.pending = {}
+
+    def submit(self, frame, timeout=None):
+        """Queue a frame for detection and return its sequence number
+
+        Blocks while every ring slot is in use by a worker. Raises
+        queue.Full on timeout and WorkerError when a worker has died.
+        """
+        try:
+            slot = self._poll(self.free_slots, timeout)
+        except queue.Empty:
+            raise queue.Full() from None
+        try:
+            self.ring.write(slot, frame)
+        except BaseException:
+            self.free_slots.put(slot)
+            raise
+        seq = self.next_submit
+        self.next_submit += 1
+        self.tasks.put((seq, slot))
+        return seq
+
+    def in_flight(self):
+        return self.next_submit - self.next_result
+
+    def get(self, timeout=None):
+        """Return the next result in sequence order
+
+        Result is (seq, boxes, confidences, class_ids, idxs, inference_time).
+        Raises queue.Empty on timeout, and WorkerError when the frame failed
+        in its worker (the pool stays usable) or a worker has died.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.next_result not in self.pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            result = self._poll(self.results, remaining)
+            if result[0] is None:
+                raise result[1]
+            self.pending[result[0]] = result
+
+        result = self.pending.pop(self.next_result)
+        self.next_result += 1
+        if len(result) == 2:
+            raise result[1]
+        return result
+
+    def _poll(self, source, timeout):
+        """source.get() that notices dead workers instead of waiting on them forever"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, deadline - time.monotonic())
+            try:
+                return source.get(timeout=max(0.0, wait))
+            except queue.Empty:
+                dead = [p for p in self.processes if p.exitcode is not None]
+                if dead:
+                    raise WorkerError(f"Pool worker {dead[0].pid} exited with code {dead[0].exitcode}") from None
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+
+    def map(self, frames):
+        """Detect an iterable of frames, yielding results in input order"""
+        for frame in frames:
+            # Keep every worker busy, drain in order once the ring is saturated
+            while self.in_flight() >= self.ring.slots:
+                yield self.get()
+            self.submit(frame)
+
+        while self.in_flight() > 0:
+            yield self.get()
+
+    def close(self):
+        """Stop workers and release shared memory"""
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self.ring.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
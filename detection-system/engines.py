@@ -0,0 +1,177 @@
+"""Pluggable inference engines behind YOLODetector"""
+import glob
+import hashlib
+import os
+import platform
+
+import cv2
+import numpy as np
+
+
+class InferenceEngine:
+    """Runs a preprocessed NCHW blob through the network
+
+    infer_batch returns one array per YOLO output head in cv2.dnn layout:
+    (rows, 85) for a single image, (N, rows, 85) for a batch. With
+    YOLO_HEADS set, only the listed heads are returned and decoded. How
+    much of the network still runs depends on the engine; see load().
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def load(self):
+        raise NotImplementedError
+
+    def infer_batch(self, blob):
+        raise NotImplementedError
+
+    def select_heads(self, heads):
+        """The entries of heads (one per [yolo] layer, cfg order) named by YOLO_HEADS"""
+        if not self.config.YOLO_HEADS:
+            return list(heads)
+        invalid = [i for i in self.config.YOLO_HEADS if not 0 <= i < len(heads)]
+        if invalid:
+            raise ValueError(f"YOLO_HEADS {invalid} out of range, the model has {len(heads)} heads")
+        return [heads[i] for i in sorted(set(self.config.YOLO_HEADS))]
+
+    def warmup(self, input_size, runs=1, batch_size=1):
+        """Run dummy forwards so lazy allocation happens before the first real frame"""
+        blob = np.zeros((batch_size, 3, input_size, input_size), dtype=np.float32)
+        for _ in range(runs):
+            self.infer_batch(blob)
+
+
+class OpenCVEngine(InferenceEngine):
+    """cv2.dnn Darknet network on CUDA when available, otherwise CPU"""
+
+    def load(self):
+        self.net = cv2.dnn.readNetFromDarknet(
+            self.config.CONFIG_PATH,
+            self.config.WEIGHTS_PATH
+        )
+
+        # Configure backend (GPU if available)
+        if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+            print("Using GPU acceleration")
+        else:
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            print("Using CPU backend")
+
+        # Get output layers. forward() runs every layer up to the latest
+        # requested output, so dropping YOLO_HEADS saves forward time only
+        # when they are the trailing (small-object) heads; dropping an
+        # earlier one saves decode time alone
+        layer_names = self.net.getLayerNames()
+        self.output_layers = self.select_heads([layer_names[i - 1] for i in self.net.getUnconnectedOutLayers()])
+
+    def infer_batch(self, blob):
+        self.net.setInput(blob)
+        return self.net.forward(self.output_layers)
+
+
+class OnnxRuntimeEngine(InferenceEngine):
+    """ONNX Runtime CPU session over a model exported by convert_darknet.py
+
+    The exported graph ends at the raw convolution feeding each [yolo]
+    layer; box decoding is done here in NumPy to match cv2.dnn's output.
+
+    With ONNX_OPTIMIZED_CACHE the fully optimized graph is saved on first
+    load and later sessions load it with optimization disabled, which
+    skips most of the session creation time. The optimized graph may be
+    hardware specific, so the cache name is keyed by the source model,
+    the runtime version and the machine.
+    """
+
+    def load(self):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("onnxruntime is required for INFERENCE_ENGINE = 'onnxruntime' "
+                              "(pip install onnxruntime)")
+        from darknet import parse_cfg, yolo_heads
+
+        self.session = None
+        cache_path = self._cache_path(ort) if self.config.ONNX_OPTIMIZED_CACHE else None
+        if cache_path is not None and os.path.exists(cache_path):
+            try:
+                self.session = self._session(ort, cache_path, ort.GraphOptimizationLevel.ORT_DISABLE_ALL)
+            except Exception as e:
+                print(f"Ignoring unreadable optimized model cache: {e}")
+
+        if self.session is None:
+            self.session = self._session(ort, self.config.ONNX_MODEL_PATH,
+                                         ort.GraphOptimizationLevel.ORT_ENABLE_ALL, cache_path)
+        self.input_name = self.session.get_inputs()[0].name
+        # The session runs the whole graph whatever is fetched, so YOLO_HEADS
+        # saves decode time only
+        self.output_names = self.select_heads([output.name for output in self.session.get_outputs()])
+        self.heads = self.select_heads(yolo_heads(parse_cfg(self.config.CONFIG_PATH)))
+        print("Using ONNX Runtime CPU backend")
+
+    def _session(self, ort, path, level, save_path=None):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = level
+        if self.config.ONNX_THREADS:
+            options.intra_op_num_threads = self.config.ONNX_THREADS
+        if save_path is None:
+            return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+        # Stale caches of older models or runtimes are replaced, not accumulated
+        root = os.path.splitext(self.config.ONNX_MODEL_PATH)[0]
+        for stale in glob.glob(f"{root}.*.opt.onnx"):
+            os.remove(stale)
+
+        # Written under a private name and renamed, so concurrent workers never
+        # load a half-written file; the hardware-specific warning is expected
+        partial = f"{save_path}.{os.getpid()}.part"
+        options.optimized_model_filepath = partial
+        options.log_severity_level = 3
+        try:
+            session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+            os.replace(partial, save_path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return session
+
+    def _cache_path(self, ort):
+        """Optimized model path for this source model, runtime and machine"""
+        stat = os.stat(self.config.ONNX_MODEL_PATH)
+        key = "|".join(str(part) for part in (
+            os.path.abspath(self.config.ONNX_MODEL_PATH), stat.st_size, stat.st_mtime_ns,
+            ort.__version__, platform.machine(), platform.processor(), os.cpu_count()
+        ))
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        return f"{os.path.splitext(self.config.ONNX_MODEL_PATH)[0]}.{digest}.opt.onnx"
+
+    def infer_batch(self, blob):
+        from darknet import decode_head
+
+        raw_outputs = self.session.run(self.output_names, {self.input_name: blob})
+        input_height, input_width = blob.shape[2:]
+
+        outputs = []
+        for raw, head in zip(raw_outputs, self.heads):
+            decoded = decode_head(raw, head["anchors"], head["scale_x_y"], input_width, input_height)
+            outputs.append(decoded[0] if len(decoded) == 1 else decoded)
+        return outputs
+
+
+ENGINES = {
+    "opencv": OpenCVEngine,
+    "onnxruntime": OnnxRuntimeEngine,
+}
+
+
+def create_engine(config):
+    """Instantiate the engine named by Config.INFERENCE_ENGINE"""
+    try:
+        engine_class = ENGINES[config.INFERENCE_ENGINE]
+    except KeyError:
+        raise ValueError(f"Unknown inference engine '{config.INFERENCE_ENGINE}', "
+                         f"expected one of {sorted(ENGINES)}")
+    return engine_class(config)
@@ -0,0 +1,195 @@
+"""Lightweight hot-path metrics with a Prometheus text endpoint
+
+Components hold `metrics = None` when instrumentation is disabled and
+check for None before timing anything, so the disabled cost is one
+attribute test per call site.
+"""
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds, Prometheus convention
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PREFIX = "detection_"
+
+
+class Histogram:
+    """Fixed-bucket histogram, observe() is a bisect and three adds"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Metrics:
+    """Stage histograms, counters and scrape-time callbacks
+
+    Counters and gauges that already exist as plain attributes elsewhere
+    (queue sizes, drop counts) are registered as callbacks and read only
+    when scraped, so the hot path does not touch them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.callbacks = []
+        self.help = {}
+        self.server = None
+        self.logger = None
+        self._stop = threading.Event()
+        self._last_log = {}
+
+    def observe(self, stage, seconds):
+        """Record one timing of a stage"""
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, value=1, **labels):
+        """Add to a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def describe(self, name, help_text):
+        """HELP text for a counter updated with inc()"""
+        self.help[name] = help_text
+
+    def register(self, name, kind, fn, help_text="", **labels):
+        """Expose fn() as a 'counter' or 'gauge' evaluated at scrape time"""
+        self.callbacks.append((name, kind, fn, tuple(sorted(labels.items()))))
+        if help_text:
+            self.help[name] = help_text
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            stages = {stage: (list(h.counts), h.sum, h.count, h.buckets) for stage, h in self.stages.items()}
+            counters = dict(self.counters)
+
+        if stages:
+            name = PREFIX + "stage_seconds"
+            lines.append(f"# HELP {name} Time spent per stage")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, (counts, total, count, buckets) in sorted(stages.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        series = [(name, "counter", value, labels) for (name, labels), value in counters.items()]
+        for name, kind, fn, labels in self.callbacks:
+            try:
+                series.append((name, kind, fn(), labels))
+            except Exception:
+                continue
+
+        declared = set()
+        for name, kind, value, labels in sorted(series, key=lambda s: (s[0], s[3])):
+            full = PREFIX + name
+            if full not in declared:
+                declared.add(full)
+                if name in self.help:
+                    lines.append(f"# HELP {full} {self.help[name]}")
+                lines.append(f"# TYPE {full} {kind}")
+            lines.append(f"{full}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One log line: mean ms per stage since the last call, then counters"""
+        parts = []
+        with self.lock:
+            for stage, histogram in sorted(self.stages.items()):
+                last_sum, last_count = self._last_log.get(stage, (0.0, 0))
+                count = histogram.count - last_count
+                if count:
+                    parts.append(f"{stage} {1000 * (histogram.sum - last_sum) / count:.1f}ms")
+                self._last_log[stage] = (histogram.sum, histogram.count)
+            counters = sorted(self.counters.items())
+
+        for (name, labels), value in counters:
+            parts.append(f"{name}{_labels(labels)}={value}")
+        for name, _, fn, labels in self.callbacks:
+            try:
+                parts.append(f"{name}{_labels(labels)}={fn()}")
+            except Exception:
+                continue
+        return "metrics: " + " | ".join(parts)
+
+    def start_server(self, host="127.0.0.1", port=9108):
+        """Serve /metrics on a daemon thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Metrics at http://{host}:{self.server.server_address[1]}/metrics")
+
+    def start_logging(self, interval):
+        """Print summary() every interval seconds"""
+        def worker():
+            while not self._stop.wait(interval):
+                print(self.summary())
+
+        self.logger = threading.Thread(target=worker, daemon=True)
+        self.logger.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.logger is not None:
+            self.logger.join(timeout=1.0)
+
+
+def create_metrics(config):
+    """Metrics with the endpoint and log line configured in config"""
+    metrics = Metrics()
+    if config.METRICS_PORT:
+        try:
+            metrics.start_server(config.METRICS_HOST, config.METRICS_PORT)
+        except OSError as e:
+            print(f"Metrics endpoint unavailable: {e}")
+    if config.METRICS_LOG_INTERVAL:
+        metrics.start_logging(config.METRICS_LOG_INTERVAL)
+    return metrics
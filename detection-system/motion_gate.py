@@ -0,0 +1,79 @@
+"""Cheap frame-differencing gate that lets static scenes skip the DNN"""
+import time
+
+import cv2
+
+
+class MotionGate:
+    """Decides per frame whether the detector needs to run
+
+    Each frame is reduced to a small grayscale thumbnail and compared with
+    the thumbnail of the last frame the detector actually ran on, so slow
+    drift still accumulates into a change. Detections are reused at most
+    MOTION_MAX_REUSE frames in a row and never for longer than
+    MOTION_REFRESH_SECONDS.
+    """
+
+    def __init__(self, config):
+        self.width = config.MOTION_GATE_WIDTH
+        self.pixel_threshold = config.MOTION_PIXEL_THRESHOLD
+        self.area_threshold = config.MOTION_AREA_THRESHOLD
+        self.max_reuse = config.MOTION_MAX_REUSE
+        self.refresh_interval = config.MOTION_REFRESH_SECONDS
+
+        self.reference = None
+        self.reuse_count = 0
+        self.last_refresh = 0.0
+
+        # Statistics
+        self.checks = 0
+        self.reused = 0
+        self.gate_time = 0.0
+
+    def _thumbnail(self, frame):
+        height = max(1, round(frame.shape[0] * self.width / frame.shape[1]))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def changed_fraction(self, thumbnail):
+        """Fraction of thumbnail pixels that differ from the reference"""
+        diff = cv2.absdiff(thumbnail, self.reference)
+        return cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1]) / diff.size
+
+    def should_detect(self, frame):
+        """True if the detector must run, False if the previous result can be reused"""
+        start = time.perf_counter()
+        self.checks += 1
+        thumbnail = self._thumbnail(frame)
+        now = time.time()
+
+        changed = (
+            self.reference is None
+            or thumbnail.shape != self.reference.shape
+            or self.changed_fraction(thumbnail) > self.area_threshold
+        )
+        stale = self.reuse_count >= self.max_reuse or now - self.last_refresh >= self.refresh_interval
+
+        if changed or stale:
+            self.reference = thumbnail
+            self.reuse_count = 0
+            self.last_refresh = now
+            detect = True
+        else:
+            self.reuse_count += 1
+            self.reused += 1
+            detect = False
+
+        self.gate_time += time.perf_counter() - start
+        return detect
+
+    def hit_rate(self):
+        """Fraction of checked frames that reused the previous detections"""
+        return self.reused / self.checks if self.checks else 0.0
+
+    def summary(self):
+        overhead = 1000 * self.gate_time / self.checks if self.checks else 0.0
+        return (f"motion gate: {self.reused}/{self.checks} frames reused "
+                f"({self.hit_rate():.0%}), {overhead:.2f} ms per check")
@@ -0,0 +1,113 @@
+"""One detector serving several camera / video sources with batched inference"""
+import queue
+import sys
+import time
+
+import cv2
+
+from camera_manager import CameraManager
+from pipeline import LatestQueue, CaptureStage, StageStats
+
+
+class MultiStreamDetector:
+    def __init__(self, config, sources, detector=None):
+        from yolo_detector import YOLODetector
+
+        self.config = config
+        self.detector = detector or YOLODetector(config)
+        self.cameras = [CameraManager(config, source) for source in sources]
+
+        # One capture thread per source, each keeping only its newest frame
+        self.frames = [LatestQueue(1) for _ in self.cameras]
+        self.captures = [
+            CaptureStage(camera, [frames])
+            for camera, frames in zip(self.cameras, self.frames)
+        ]
+        self.stats = StageStats("batch")
+
+    def start(self):
+        for camera, capture in zip(self.cameras, self.captures):
+            if camera.is_opened():
+                capture.start()
+            else:
+                print(f"Error: Could not open source {camera.source}")
+                capture.finished.set()
+
+    def is_running(self):
+        """True while any source can still deliver frames"""
+        return any(
+            not capture.finished.is_set() or frames.qsize() > 0
+            for capture, frames in zip(self.captures, self.frames)
+        )
+
+    def step(self):
+        """Gather the latest frame of each stream and detect them in one batch
+
+        Returns a list of (stream_id, frame_index, frame, result) where result
+        is (boxes, confidences, class_ids, idxs).
+        """
+        batch = []
+        deadline = time.time() + self.config.BATCH_MAX_WAIT
+        for stream_id, frames in enumerate(self.frames):
+            try:
+                frame_index, frame = frames.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                continue
+            batch.append((stream_id, frame_index, frame))
+
+        if not batch:
+            return []
+
+        start = time.time()
+        results, _ = self.detector.detect_batch([frame for _, _, frame in batch])
+        self.stats.record(time.time() - start)
+
+        return [item + (result,) for item, result in zip(batch, results)]
+
+    def run(self):
+        """Detect on all streams and show one window per stream"""
+        self.start()
+        print(f"Starting detection on {len(self.cameras)} streams... Press 'q' to quit")
+
+        try:
+            while self.is_running():
+                results = self.step()
+                if self.config.HEADLESS:
+                    continue
+
+                for stream_id, _, frame, result in results:
+                    self.detector.draw_detections(frame, *result)
+                    cv2.putText(frame, self.stats.summary(), (10, 30),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+                    cv2.imshow(f"Stream {stream_id}", frame)
+
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+
+        except KeyboardInterrupt:
+            print("\nInterrupted by user")
+        finally:
+            self.stop()
+            if not self.config.HEADLESS:
+                cv2.destroyAllWindows()
+
+    def stop(self):
+        for capture in self.captures:
+            capture.stop()
+        for camera in self.cameras:
+            camera.release()
+        print(self.stats.summary())
+
+
+def _parse_source(value):
+    return int(value) if value.isdigit() else value
+
+
+if __name__ == "__main__":
+    from config import Config
+
+    config = Config()
+    config.HEADLESS = "--headless" in sys.argv
+    config.REPLAY_REALTIME = "--fast" not in sys.argv
+    sources = [_parse_source(arg) for arg in sys.argv[1:] if not arg.startswith("--")] or [0]
+    MultiStreamDetector(config, sources).run()
@@ -0,0 +1,137 @@
+"""Detection overlays with optional cached text sprites, optionally on a downscaled preview"""
+import time
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+STATUS_COLOR = (0, 255, 0)
+
+
+def render_text(text, color, font_scale, thickness):
+    """Rasterize text once: (BGR image, uint8 mask, ascent in pixels)"""
+    (width, height), baseline = cv2.getTextSize(text, FONT, font_scale, thickness)
+    mask = np.zeros((height + baseline + thickness, width + thickness), dtype=np.uint8)
+    cv2.putText(mask, text, (0, height), FONT, font_scale, 255, thickness)
+    image = np.zeros(mask.shape + (3,), dtype=np.uint8)
+    image[mask > 0] = color
+    return image, mask, height
+
+
+def blit(target, sprite, x, y):
+    """Copy a render_text() sprite with its baseline at (x, y), like putText, clipped to target"""
+    image, mask, ascent = sprite
+    top = y - ascent
+    rows, cols = mask.shape
+    y0, x0 = max(top, 0), max(x, 0)
+    y1, x1 = min(top + rows, target.shape[0]), min(x + cols, target.shape[1])
+    if y0 >= y1 or x0 >= x1:
+        return
+    inner = (slice(y0 - top, y1 - top), slice(x0 - x, x1 - x))
+    # Writes through the view into target
+    cv2.copyTo(image[inner], mask[inner], target[y0:y1, x0:x1])
+
+
+class LabelSprites:
+    """"label 0.85" sprites keyed by class and confidence bucket
+
+    Confidences are floored to the bucket, so at most
+    classes * (1 / bucket) sprites are ever rendered.
+    """
+
+    def __init__(self, labels, colors, font_scale=0.5, thickness=1, bucket=0.05):
+        self.labels = labels
+        self.colors = colors
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.bucket = bucket
+        self.sprites = {}
+
+    def get(self, class_id, confidence):
+        step = int(confidence / self.bucket)
+        key = (class_id, step)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            text = f"{self.labels[class_id]} {step * self.bucket:.2f}"
+            color = [int(c) for c in self.colors[class_id]]
+            sprite = self.sprites[key] = render_text(text, color, self.font_scale, self.thickness)
+        return sprite
+
+
+class OverlayRenderer:
+    """Draws boxes, labels and status lines for display
+
+    Rendering is limited to max_fps (due() tells the caller when to draw),
+    independent of capture and detection rate. With preview_width the
+    frame is first scaled down and everything is drawn on the small copy;
+    otherwise drawing happens on a copy of the frame, or on the frame
+    itself with in_place. Status lines are re-rasterized at most every
+    status_interval seconds.
+    """
+
+    def __init__(self, labels, colors, sprites=False, preview_width=0, max_fps=30, status_interval=0.5):
+        self.labels = labels
+        self.colors = colors
+        self.sprites = LabelSprites(labels, colors) if sprites else None
+        self.preview_width = preview_width
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.status_interval = status_interval
+        self.status = {}
+        self.last_render = 0.0
+
+        # Statistics
+        self.rendered = 0
+        self.render_time = 0.0
+
+    def due(self):
+        """True when the display should be refreshed now"""
+        return time.perf_counter() - self.last_render >= self.min_interval
+
+    def render(self, frame, detections=None, status_lines=(), in_place=False):
+        """Display image for frame with detections (boxes, confidences, class_ids, idxs) drawn"""
+        start = time.perf_counter()
+        scale = 1.0
+        if self.preview_width and frame.shape[1] > self.preview_width:
+            scale = self.preview_width / frame.shape[1]
+            image = cv2.resize(frame, (self.preview_width, round(frame.shape[0] * scale)),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            image = frame if in_place else frame.copy()
+
+        if detections is not None:
+            self._draw_detections(image, scale, *detections)
+        for row, text in enumerate(status_lines):
+            self._draw_status(image, row, text, start)
+
+        self.last_render = start
+        self.rendered += 1
+        self.render_time += time.perf_counter() - start
+        return image
+
+    def _draw_detections(self, image, scale, boxes, confidences, class_ids, idxs):
+        if not len(idxs):
+            return
+        idxs = np.asarray(idxs).reshape(-1)
+        selected = np.asarray(boxes)[idxs]
+        if scale != 1.0:
+            selected = (selected * scale).astype(np.int32)
+
+        for (x, y, w, h), class_id, confidence in zip(selected.tolist(), np.asarray(class_ids)[idxs].tolist(),
+                                                      np.asarray(confidences)[idxs].tolist()):
+            color = [int(c) for c in self.colors[class_id]]
+            cv2.rectangle(image, (x, y), (x + w, y + h), color, 2)
+            if self.sprites is not None:
+                blit(image, self.sprites.get(class_id, confidence), x, y - 5)
+            else:
+                cv2.putText(image, f"{self.labels[class_id]} {confidence:.2f}", (x, y - 5),
+                            FONT, 0.5, color, 1)
+
+    def _draw_status(self, image, row, text, now):
+        cached = self.status.get(row)
+        if cached is None or (cached[0] != text and now - cached[1] >= self.status_interval):
+            cached = self.status[row] = (text, now, render_text(text, STATUS_COLOR, 0.6, 2))
+        blit(image, cached[2], 10, 30 + 25 * row)
+
+    def summary(self):
+        mean = 1000 * self.render_time / self.rendered if self.rendered else 0.0
+        return f"overlay: {self.rendered} frames rendered, {mean:.2f} ms per frame"
@@ -0,0 +1,186 @@
+"""Threaded capture / inference stages for the pipelined detection loop"""
+import queue
+import threading
+import time
+from collections import deque
+
+
+class StageStats:
+    """Rolling throughput and busy time for one pipeline stage
+
+    With metrics set, busy times are also recorded as the stage histogram.
+    """
+
+    def __init__(self, name, window=30, metrics=None):
+        self.name = name
+        self.metrics = metrics
+        self.count = 0
+        self.timestamps = deque(maxlen=window)
+        self.busy_times = deque(maxlen=window)
+
+    def record(self, busy_time):
+        """Record one processed item and the time spent on it"""
+        self.count += 1
+        self.timestamps.append(time.time())
+        self.busy_times.append(busy_time)
+        if self.metrics is not None:
+            self.metrics.observe(self.name, busy_time)
+
+    def fps(self):
+        """Items per second over the rolling window"""
+        if len(self.timestamps) < 2:
+            return 0.0
+        elapsed = self.timestamps[-1] - self.timestamps[0]
+        return (len(self.timestamps) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def busy_ms(self):
+        """Average time per item in milliseconds"""
+        if not self.busy_times:
+            return 0.0
+        return 1000 * sum(self.busy_times) / len(self.busy_times)
+
+    def summary(self):
+        return f"{self.name}: {self.fps():.1f} FPS ({self.busy_ms():.1f} ms)"
+
+
+class LatestQueue:
+    """Bounded queue that drops the oldest item instead of blocking the producer
+
+    Like queue.Queue, an item counts as unfinished from put() until the
+    consumer calls task_done() for it; dropped items finish on their own.
+    """
+
+    def __init__(self, maxsize=1):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        """Add item, discarding stale entries if the queue is full"""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Get the next item, raises queue.Empty on timeout"""
+        return self._queue.get(timeout=timeout)
+
+    def task_done(self):
+        """Mark an item returned by get() as processed"""
+        self._queue.task_done()
+
+    def unfinished(self):
+        """Items put but not yet processed, including one a consumer is working on"""
+        return self._queue.unfinished_tasks
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class CaptureStage:
+    """Reads frames on a background thread and keeps only the newest ones"""
+
+    def __init__(self, camera_manager, outputs, metrics=None):
+        self.camera_manager = camera_manager
+        self.outputs = outputs
+        self.stats = StageStats("capture", metrics=metrics)
+        self.running = False
+        self.finished = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def _worker(self):
+        frame_index = 0
+        while self.running:
+            start = time.time()
+            ret, frame = self.camera_manager.read_frame()
+            if not ret:
+                print("Failed to read frame")
+                break
+
+            frame_index += 1
+            for output in self.outputs:
+                output.put((frame_index, frame))
+            self.stats.record(time.time() - start)
+
+        self.finished.set()
+
+    def stop(self):
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
+
+class InferenceStage:
+    """Runs detection on the newest captured frame and publishes the result
+
+    An exception from the detector or on_result stops the stage; it is
+    kept in error for the caller to re-raise.
+    """
+
+    def __init__(self, detector, frames, on_result=None, metrics=None):
+        self.detector = detector
+        self.frames = frames
+        self.on_result = on_result
+        self.stats = StageStats("inference", metrics=metrics)
+        self.latest = None
+        self.error = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def _worker(self):
+        while self.running:
+            try:
+                frame_index, frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                start = time.time()
+                boxes, confidences, class_ids, idxs, inference_time = self.detector.detect_objects(frame)
+                self.latest = (frame_index, boxes, confidences, class_ids, idxs, inference_time)
+                self.stats.record(time.time() - start)
+
+                if self.on_result:
+                    self.on_result(self.latest)
+            except Exception as e:
+                print(f"Inference stage failed: {e}")
+                self.error = e
+                self.running = False
+            finally:
+                self.frames.task_done()
+
+    def drain(self, timeout=None):
+        """Wait until every queued frame has been processed
+
+        Returns early, like on timeout, if the stage has stopped.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while self.frames.unfinished():
+            if not (self.running and self.thread.is_alive()):
+                return False
+            if deadline is not None and time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=1.0)
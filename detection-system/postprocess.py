@@ -0,0 +1,69 @@
+"""Vectorized decoding and NMS for raw YOLO outputs"""
+import cv2
+import numpy as np
+
+
+def decode_outputs(outputs, width, height, confidence_threshold, classes=None):
+    """Decode YOLO output heads into compact box, confidence and class arrays
+
+    Returns (boxes, confidences, class_ids) where boxes is an (N, 4) int32
+    array of [x, y, w, h] in frame pixels. classes, a sorted int array of
+    class ids, restricts decoding to those score columns; rows of other
+    classes are never argmaxed, NMSed or drawn.
+    """
+    kept_boxes = []
+    kept_scores = []
+    for output in outputs:
+        # Class scores are objectness times class probability, so a row whose
+        # objectness is below the threshold cannot pass on any class
+        output = output[output[:, 4] > confidence_threshold]
+        scores = output[:, 5:] if classes is None else output[:, 5 + classes]
+        keep = scores.max(axis=1, initial=0) > confidence_threshold
+        kept_boxes.append(output[keep, :4])
+        kept_scores.append(scores[keep])
+
+    if len(kept_boxes) == 1:
+        kept, kept_scores = kept_boxes[0], kept_scores[0]
+    else:
+        kept, kept_scores = np.concatenate(kept_boxes), np.concatenate(kept_scores)
+    if not len(kept):
+        return (np.empty((0, 4), dtype=np.int32),
+                np.empty(0, dtype=np.float32),
+                np.empty(0, dtype=np.int32))
+
+    class_ids = kept_scores.argmax(axis=1).astype(np.int32)
+    confidences = kept_scores[np.arange(len(class_ids)), class_ids].astype(np.float32)
+    if classes is not None:
+        class_ids = classes[class_ids]
+
+    # Scale to frame size and convert center/size to top-left/size
+    scale = np.array([width, height, width, height], dtype=np.float32)
+    centers_sizes = (kept * scale).astype(np.int32)
+    boxes = np.empty_like(centers_sizes)
+    boxes[:, :2] = (centers_sizes[:, :2] - centers_sizes[:, 2:] / 2).astype(np.int32)
+    boxes[:, 2:] = centers_sizes[:, 2:]
+
+    return boxes, confidences, class_ids
+
+
+def batched_nms(boxes, confidences, class_ids, confidence_threshold, nms_threshold):
+    """Class-aware NMS, boxes of different classes never suppress each other"""
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int32)
+
+    if hasattr(cv2.dnn, "NMSBoxesBatched"):
+        idxs = cv2.dnn.NMSBoxesBatched(
+            boxes, confidences, class_ids,
+            confidence_threshold, nms_threshold
+        )
+    else:
+        # Older OpenCV: shift each class into its own disjoint coordinate range
+        offset = int((boxes[:, :2] + boxes[:, 2:]).max() - boxes[:, :2].min()) + 1
+        shifted = boxes.copy()
+        shifted[:, :2] += (class_ids * offset)[:, None]
+        idxs = cv2.dnn.NMSBoxes(
+            shifted, confidences,
+            confidence_threshold, nms_threshold
+        )
+
+    return np.asarray(idxs, dtype=np.int32).reshape(-1)
@@ -0,0 +1,91 @@
+"""Frame to network blob through preallocated buffers, with optional letterboxing"""
+import cv2
+import numpy as np
+
+MAX_BUFFER_SETS = 8
+
+
+class Geometry:
+    """How network coordinates map back to frame pixels
+
+    Decoding with (width, height) gives boxes on the padded canvas scaled
+    to frame resolution; unmap() then removes the padding offset in place.
+    """
+
+    __slots__ = ("width", "height", "offset")
+
+    def __init__(self, width, height, offset_x=0, offset_y=0):
+        self.width = width
+        self.height = height
+        self.offset = np.array([offset_x, offset_y], dtype=np.int32)
+
+    def unmap(self, boxes):
+        """Shift (N, 4) [x, y, w, h] boxes from canvas to frame pixels, in place"""
+        if self.offset.any():
+            boxes[:, :2] -= self.offset
+        return boxes
+
+
+class _Buffers:
+    __slots__ = ("canvas", "inner", "scaled", "blob", "geometry", "box")
+
+    def __init__(self, size, width, height, letterbox, pad_value):
+        self.canvas = np.empty((size, size, 3), dtype=np.uint8)
+        self.scaled = np.empty((size, size, 3), dtype=np.float32)
+        self.blob = np.empty((1, 3, size, size), dtype=np.float32)
+        self.inner = None
+        self.box = None
+
+        if not letterbox:
+            self.geometry = Geometry(width, height)
+            return
+
+        ratio = min(size / width, size / height)
+        inner_w, inner_h = round(width * ratio), round(height * ratio)
+        dx, dy = (size - inner_w) // 2, (size - inner_h) // 2
+        self.canvas[:] = pad_value
+        self.inner = np.empty((inner_h, inner_w, 3), dtype=np.uint8)
+        self.box = (slice(dy, dy + inner_h), slice(dx, dx + inner_w))
+        self.geometry = Geometry(size / ratio, size / ratio, round(dx / ratio), round(dy / ratio))
+
+
+class Preprocessor:
+    """Builds the 1x3xSxS float32 blob without per-frame allocations
+
+    Resizes into a persistent uint8 canvas, converts and scales into a
+    persistent float32 image, then copies channel-swapped into a persistent
+    NCHW blob. Without letterboxing the result equals
+    cv2.dnn.blobFromImage(frame, 1/255, (S, S), swapRB=True).
+
+    Buffers are kept per (input size, frame size), so scheduler switches
+    between sizes reuse them. The returned blob is overwritten by the next
+    call, so one Preprocessor must not be shared between threads.
+    """
+
+    def __init__(self, letterbox=False, pad_value=114):
+        self.letterbox = letterbox
+        self.pad_value = pad_value
+        self.buffers = {}
+
+    def __call__(self, frame, size):
+        """Returns (blob, Geometry) for frame at network input size"""
+        height, width = frame.shape[:2]
+        key = (size, width, height)
+        buffers = self.buffers.get(key)
+        if buffers is None:
+            if len(self.buffers) >= MAX_BUFFER_SETS:
+                self.buffers.clear()
+            buffers = self.buffers[key] = _Buffers(size, width, height, self.letterbox, self.pad_value)
+
+        if buffers.inner is None:
+            cv2.resize(frame, (size, size), dst=buffers.canvas, interpolation=cv2.INTER_LINEAR)
+        else:
+            inner_h, inner_w = buffers.inner.shape[:2]
+            cv2.resize(frame, (inner_w, inner_h), dst=buffers.inner, interpolation=cv2.INTER_LINEAR)
+            buffers.canvas[buffers.box] = buffers.inner
+
+        cv2.addWeighted(buffers.canvas, 1 / 255.0, buffers.canvas, 0, 0,
+                        dst=buffers.scaled, dtype=cv2.CV_32F)
+        # HWC BGR -> CHW RGB
+        np.copyto(buffers.blob[0], buffers.scaled.transpose(2, 0, 1)[::-1])
+        return buffers.blob, buffers.geometry
@@ -0,0 +1,262 @@
+"""Raw frame recording to a memory-mapped ring file, and zero-copy replay
+
+Usage:
+    python recording.py record SOURCE OUTPUT.frames [--max-mb 1024] [--frames N]
+    python recording.py info RECORDING.frames
+
+A recording keeps the exact pixels and capture timestamps a source
+delivered, so a performance problem or bug report replays bit-for-bit
+(CAMERA_SOURCE = "capture.frames") without the decode cost or artifacts
+of re-encoding. Frames are never encoded: each one is a single copy into
+the mapping when recorded, and a view of the mapping when replayed.
+
+File layout (little endian):
+    page 0      HEADER: magic, height, width, channels, slots, frame stride, frames written
+    index       INDEX per slot: sequence number + 1 (0 while the slot is written), timestamp
+    frames      slots * stride bytes, every frame page-aligned
+
+The file is sized once from the first frame and RECORD_MAX_BYTES; when it
+is full the oldest frames are overwritten.
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+
+import cv2
+import numpy as np
+
+MAGIC = b"YOLOFRM1"
+HEADER = struct.Struct("<8sIIIIQQ")
+INDEX = struct.Struct("<Qd")
+WRITTEN_OFFSET = HEADER.size - 8
+PAGE = mmap.PAGESIZE
+
+
+def _round_up(value, multiple):
+    return (value + multiple - 1) // multiple * multiple
+
+
+def _frames_view(buffer, offset, slots, stride, shape):
+    """(slots, *shape) uint8 array over the frame area of a mapping"""
+    inner = np.empty(shape, dtype=np.uint8).strides
+    return np.ndarray((slots,) + shape, dtype=np.uint8, buffer=buffer, offset=offset, strides=(stride,) + inner)
+
+
+def _layout(slots, stride):
+    """(offset of the frame area, file size) for a ring of slots frames"""
+    frames_offset = PAGE + _round_up(slots * INDEX.size, PAGE)
+    return frames_offset, frames_offset + slots * stride
+
+
+class FrameRecorder:
+    """Appends raw uint8 frames and capture timestamps to a bounded ring file
+
+    Frames with another shape than the first (e.g. after a camera
+    reconnect) are skipped and counted in skipped.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.file = None
+        self.map = None
+        self.frames = None
+        self.shape = None
+        self.slots = 0
+        self.written = 0
+
+        # Statistics
+        self.skipped = 0
+        self.write_time = 0.0
+
+    def _create(self, shape):
+        height, width = shape[:2]
+        channels = shape[2] if len(shape) > 2 else 1
+        stride = _round_up(height * width * channels, PAGE)
+        slots = (self.max_bytes - PAGE) // (stride + INDEX.size)
+        while slots > 0 and _layout(slots, stride)[1] > self.max_bytes:
+            slots -= 1
+        if slots < 2:
+            raise ValueError(f"RECORD_MAX_BYTES holds fewer than 2 frames of {width}x{height}")
+
+        frames_offset, size = _layout(slots, stride)
+        self.file = open(self.path, "w+b")
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+        HEADER.pack_into(self.map, 0, MAGIC, height, width, channels, slots, stride, 0)
+        self.frames = _frames_view(self.map, frames_offset, slots, stride, shape)
+        self.shape = shape
+        self.slots = slots
+
+    def write(self, frame, timestamp=None):
+        """Record one frame, captured now unless timestamp (time.time() seconds) is given"""
+        if timestamp is None:
+            timestamp = time.time()
+        start = time.perf_counter()
+        if self.map is None:
+            if frame.dtype != np.uint8:
+                raise ValueError(f"Only uint8 frames can be recorded, got {frame.dtype}")
+            self._create(frame.shape)
+        elif frame.shape != self.shape or frame.dtype != np.uint8:
+            self.skipped += 1
+            return
+
+        slot = self.written % self.slots
+        index = PAGE + slot * INDEX.size
+        # A reader never takes a half-written slot for the frame it held before
+        INDEX.pack_into(self.map, index, 0, 0.0)
+        self.frames[slot] = frame
+        INDEX.pack_into(self.map, index, self.written + 1, timestamp)
+        self.written += 1
+        struct.pack_into("<Q", self.map, WRITTEN_OFFSET, self.written)
+        self.write_time += time.perf_counter() - start
+
+    def close(self):
+        if self.map is not None:
+            self.frames = None
+            self.map.flush()
+            self.map.close()
+            self.file.close()
+            self.map = None
+
+    def summary(self):
+        kept = min(self.written, self.slots)
+        mean = 1000 * self.write_time / self.written if self.written else 0.0
+        return (f"recorder: {self.written} frames written, {kept} kept in {self.path}, "
+                f"{self.skipped} skipped, {mean:.2f} ms per frame")
+
+
+class RecordingCapture:
+    """cv2.VideoCapture look-alike replaying a FrameRecorder file, oldest frame first
+
+    read() returns views into a copy-on-write mapping: nothing is copied
+    until a consumer draws on a frame, and drawing never reaches the file.
+    timestamp holds the capture time of the frame read last.
+    """
+
+    def __init__(self, path):
+        self.map = None
+        self.frames = None
+        self.slots = []
+        self.timestamps = []
+        self.position = 0
+        self.timestamp = None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < PAGE:
+                return
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, height, width, channels, slots, stride, written = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a frame recording")
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        frames_offset, size = _layout(slots, stride)
+        if size > len(self.map):
+            raise ValueError(f"{path} is truncated")
+        self.frames = _frames_view(self.map, frames_offset, slots, stride, shape)
+
+        # Slots overwritten or torn by a crash mid-write carry another sequence number
+        for sequence in range(max(0, written - slots), written):
+            slot = sequence % slots
+            stored, timestamp = INDEX.unpack_from(self.map, PAGE + slot * INDEX.size)
+            if stored == sequence + 1:
+                self.slots.append(slot)
+                self.timestamps.append(timestamp)
+
+    def read(self):
+        if self.position >= len(self.slots):
+            return False, None
+        self.timestamp = self.timestamps[self.position]
+        frame = self.frames[self.slots[self.position]]
+        self.position += 1
+        return True, frame
+
+    def isOpened(self):
+        return bool(self.slots)
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.slots))
+        if prop == cv2.CAP_PROP_FPS and len(self.timestamps) > 1:
+            duration = self.timestamps[-1] - self.timestamps[0]
+            return (len(self.timestamps) - 1) / duration if duration > 0 else 0.0
+        if prop == cv2.CAP_PROP_FRAME_WIDTH and self.frames is not None:
+            return float(self.frames.shape[2])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT and self.frames is not None:
+            return float(self.frames.shape[1])
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        # Frames handed out keep the mapping alive; it is unmapped when the last one is collected
+        self.slots = []
+        self.frames = None
+        self.map = None
+
+
+def _option(name, default=None):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+def _record(config, source, path, max_frames):
+    from camera_manager import CameraManager, source_kind
+
+    # Replaying a recording never writes one
+    if source_kind(source) == "recording":
+        print(f"Error: {source} is already a recording, copy the file instead")
+        return
+    config.RECORD_PATH = path
+    camera = CameraManager(config, source, realtime=True)
+    if not camera.is_opened():
+        print(f"Error: Could not open {source}")
+        return
+    try:
+        while max_frames is None or camera.frames_read < max_frames:
+            ret, _ = camera.read_frame()
+            if not ret:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if camera.recorder is not None:
+            print(camera.recorder.summary())
+        camera.release()
+
+
+def _info(path):
+    cap = RecordingCapture(path)
+    if not cap.isOpened():
+        print(f"{path}: no frames")
+        return
+    shape = cap.frames.shape[1:]
+    size = "x".join(str(n) for n in (shape[1], shape[0]) + shape[2:])
+    duration = cap.timestamps[-1] - cap.timestamps[0]
+    print(f"{path}: {len(cap.slots)} frames of {size} in {len(cap.frames)} slots, "
+          f"{duration:.2f} s, {cap.get(cv2.CAP_PROP_FPS):.1f} FPS, started {time.ctime(cap.timestamps[0])}")
+    cap.release()
+
+
+if __name__ == "__main__":
+    from config import Config
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    for flag in ("--max-mb", "--frames"):
+        if flag in sys.argv:
+            args.remove(sys.argv[sys.argv.index(flag) + 1])
+
+    if len(args) == 3 and args[0] == "record":
+        config = Config()
+        if "--max-mb" in sys.argv:
+            config.RECORD_MAX_BYTES = int(float(_option("--max-mb")) * 1024 * 1024)
+        frames = _option("--frames")
+        _record(config, args[1], args[2], int(frames) if frames else None)
+    elif len(args) == 2 and args[0] == "info":
+        _info(args[1])
+    else:
+        print(__doc__)
@@ -0,0 +1,150 @@
+"""Compact per-frame detection records and sinks that persist them"""
+import json
+import struct
+import sys
+
+import numpy as np
+
+# One row per detection kept by NMS, 24 bytes
+DETECTION_DTYPE = np.dtype([
+    ("x", np.int32),
+    ("y", np.int32),
+    ("w", np.int32),
+    ("h", np.int32),
+    ("score", np.float32),
+    ("class_id", np.int32),
+])
+
+
+def to_records(boxes, confidences, class_ids, idxs):
+    """Structured DETECTION_DTYPE array of the detections selected by idxs"""
+    idxs = np.asarray(idxs, dtype=np.intp).reshape(-1)
+    records = np.empty(len(idxs), dtype=DETECTION_DTYPE)
+    if len(idxs):
+        selected = np.asarray(boxes)[idxs]
+        for column, name in enumerate(("x", "y", "w", "h")):
+            records[name] = selected[:, column]
+        records["score"] = np.asarray(confidences)[idxs]
+        records["class_id"] = np.asarray(class_ids)[idxs]
+    return records
+
+
+class FrameResult:
+    """Detections of one frame with its index and capture time
+
+    timestamp is wall-clock seconds when the frame was read;
+    inference_time is 0 when the motion gate reused the previous result.
+    """
+
+    __slots__ = ("index", "timestamp", "detections", "inference_time", "reused")
+
+    def __init__(self, index, timestamp, detections, inference_time=0.0, reused=False):
+        self.index = index
+        self.timestamp = timestamp
+        self.detections = detections
+        self.inference_time = inference_time
+        self.reused = reused
+
+    def __len__(self):
+        return len(self.detections)
+
+    def __repr__(self):
+        return f"FrameResult(index={self.index}, detections={len(self.detections)})"
+
+    @property
+    def boxes(self):
+        """(N, 4) int32 [x, y, w, h] array"""
+        d = self.detections
+        return np.stack((d["x"], d["y"], d["w"], d["h"]), axis=1)
+
+    def labels(self, names):
+        return [names[class_id] for class_id in self.detections["class_id"].tolist()]
+
+    def to_dict(self, names=None):
+        """JSON-ready dict; names adds a label to each detection"""
+        detections = []
+        for x, y, w, h, score, class_id in self.detections.tolist():
+            item = {"box": [x, y, w, h], "score": round(score, 4), "class_id": class_id}
+            if names is not None:
+                item["label"] = names[class_id]
+            detections.append(item)
+        return {
+            "frame": self.index,
+            "timestamp": round(self.timestamp, 6),
+            "inference_ms": round(1000 * self.inference_time, 3),
+            "reused": self.reused,
+            "detections": detections,
+        }
+
+
+class JsonlSink:
+    """One JSON object per frame and line; path "-" writes to stdout"""
+
+    def __init__(self, path, names=None):
+        self.names = names
+        self.owned = path != "-"
+        self.file = open(path, "w", encoding="utf-8") if self.owned else sys.stdout
+
+    def write(self, result):
+        self.file.write(json.dumps(result.to_dict(self.names), separators=(",", ":")) + "\n")
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinarySink:
+    """Frames as a fixed header followed by raw DETECTION_DTYPE rows
+
+    File layout: MAGIC, then per frame HEADER (index, timestamp,
+    inference_time, reused, count) and count * 24 bytes of records, all
+    little-endian. read_binary() streams it back as FrameResults.
+    """
+
+    MAGIC = b"YOLODET1"
+    HEADER = struct.Struct("<qdd?I")
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(self.MAGIC)
+
+    def write(self, result):
+        records = np.ascontiguousarray(result.detections, dtype=DETECTION_DTYPE.newbyteorder("<"))
+        self.file.write(self.HEADER.pack(result.index, result.timestamp, result.inference_time,
+                                         result.reused, len(records)))
+        self.file.write(records.tobytes())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_binary(path):
+    """Yield the FrameResults written by BinarySink"""
+    dtype = DETECTION_DTYPE.newbyteorder("<")
+    with open(path, "rb") as f:
+        if f.read(len(BinarySink.MAGIC)) != BinarySink.MAGIC:
+            raise ValueError(f"{path} is not a detection record file")
+        while True:
+            header = f.read(BinarySink.HEADER.size)
+            if len(header) < BinarySink.HEADER.size:
+                return
+            index, timestamp, inference_time, reused, count = BinarySink.HEADER.unpack(header)
+            data = f.read(count * dtype.itemsize)
+            if len(data) < count * dtype.itemsize:
+                return  # Truncated by a writer that did not close the file
+            detections = np.frombuffer(data, dtype=dtype)
+            yield FrameResult(index, timestamp, detections, inference_time, reused)
@@ -0,0 +1,68 @@
+"""Changed-region detection and tile layout for region-of-interest inference"""
+import cv2
+import numpy as np
+
+
+class ChangedRegionFinder:
+    """Finds regions that changed since the previous frame, in frame coordinates"""
+
+    def __init__(self, config):
+        self.width = config.ROI_DIFF_WIDTH
+        self.pixel_threshold = config.MOTION_PIXEL_THRESHOLD
+        self.min_area = config.ROI_MIN_REGION_AREA
+        self.previous = None
+
+    def find(self, frame):
+        """List of [x, y, w, h] boxes around changed areas"""
+        H, W = frame.shape[:2]
+        scale = W / self.width
+        small = cv2.resize(frame, (self.width, max(1, round(H / scale))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+        previous, self.previous = self.previous, gray
+        if previous is None or previous.shape != gray.shape:
+            return [[0, 0, W, H]]
+
+        mask = cv2.threshold(cv2.absdiff(gray, previous), self.pixel_threshold, 255, cv2.THRESH_BINARY)[1]
+        mask = cv2.dilate(mask, None, iterations=2)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        regions = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w * h * scale * scale >= self.min_area:
+                regions.append([int(x * scale), int(y * scale), int(np.ceil(w * scale)), int(np.ceil(h * scale))])
+        return regions
+
+
+def tiles_for_regions(regions, width, height, tile_size, margin=0):
+    """Square tiles of at least tile_size covering each region, clipped to the frame
+
+    Tiles fully contained in another tile are dropped.
+    """
+    tiles = []
+    for x, y, w, h in regions:
+        side = max(tile_size, w + 2 * margin, h + 2 * margin)
+        tile_w, tile_h = min(side, width), min(side, height)
+        x0 = int(np.clip(x + w / 2 - tile_w / 2, 0, width - tile_w))
+        y0 = int(np.clip(y + h / 2 - tile_h / 2, 0, height - tile_h))
+        tiles.append((x0, y0, int(tile_w), int(tile_h)))
+
+    # Largest first so smaller tiles inside them are removed
+    tiles.sort(key=lambda t: t[2] * t[3], reverse=True)
+    kept = []
+    for tile in tiles:
+        x0, y0, w, h = tile
+        if not any(x0 >= kx and y0 >= ky and x0 + w <= kx + kw and y0 + h <= ky + kh
+                   for kx, ky, kw, kh in kept):
+            kept.append(tile)
+    return kept
+
+
+def grid_tiles(width, height, tile_size, overlap=0.2):
+    """Overlapping grid of tiles covering the whole frame"""
+    step = max(1, int(tile_size * (1 - overlap)))
+    xs = list(range(0, max(1, width - tile_size), step)) + [max(0, width - tile_size)]
+    ys = list(range(0, max(1, height - tile_size), step)) + [max(0, height - tile_size)]
+    return [(x, y, min(tile_size, width), min(tile_size, height))
+            for y in sorted(set(ys)) for x in sorted(set(xs))]
@@ -0,0 +1,116 @@
+"""Adaptive detection cadence / input size scheduler driven by a latency budget"""
+import time
+from collections import deque
+
+
+class AdaptiveScheduler:
+    """Picks INPUT_SIZE and PROCESS_EVERY_N_FRAMES at runtime to meet TARGET_FPS
+
+    Levels run from most to least expensive: input sizes from largest to
+    smallest, then longer detection intervals at the smallest size. Each
+    evaluation predicts the per-frame cost of every level from measured
+    stage times, drops a level as soon as the current one exceeds the
+    budget by the hysteresis margin, and only climbs back after several
+    consecutive evaluations with headroom. Decisions are written to the
+    shared config, so the detector and main loop pick them up directly.
+    """
+
+    def __init__(self, config, cadence=True):
+        self.config = config
+        self.budget = 1.0 / config.TARGET_FPS
+        self.hysteresis = config.SCHEDULER_HYSTERESIS
+        self.interval = config.SCHEDULER_INTERVAL
+        self.patience = config.SCHEDULER_PATIENCE
+
+        # Trade resolution first, then cadence (the tracker covers skipped frames)
+        sizes = sorted(config.SCHEDULER_INPUT_SIZES, reverse=True)
+        max_every_n = config.SCHEDULER_MAX_EVERY_N if cadence else 1
+        self.levels = [(size, 1) for size in sizes]
+        self.levels += [(sizes[-1], every_n) for every_n in range(2, max_every_n + 1)]
+
+        current = (config.INPUT_SIZE, config.PROCESS_EVERY_N_FRAMES if cadence else 1)
+        self.level = self.levels.index(current) if current in self.levels else 0
+
+        # Exponential moving averages of measured stage times
+        self.other_time = None  # Per-frame time outside the forward pass
+        self.unit_time = None  # Forward time per input pixel
+        self.frames = 0
+        self.headroom_streak = 0
+        self.switches = 0
+        self.decisions = deque(maxlen=config.SCHEDULER_HISTORY_SIZE)
+        self._apply()
+
+    @staticmethod
+    def _ema(current, value, alpha=0.2):
+        return value if current is None else (1 - alpha) * current + alpha * value
+
+    def observe(self, frame_time, inference_time=None):
+        """Record one frame's total time and, if the detector ran, its forward time"""
+        other = frame_time
+        if inference_time is not None:
+            size = self.config.INPUT_SIZE
+            self.unit_time = self._ema(self.unit_time, inference_time / (size * size))
+            other = max(0.0, frame_time - inference_time)
+        self.other_time = self._ema(self.other_time, other)
+
+        self.frames += 1
+        if self.frames % self.interval == 0 and self.unit_time is not None:
+            self._evaluate()
+
+    def predicted_cost(self, level):
+        """Predicted seconds per frame at a ladder level"""
+        size, every_n = self.levels[level]
+        return (self.other_time or 0.0) + self.unit_time * size * size / every_n
+
+    def _evaluate(self):
+        cost = self.predicted_cost(self.level)
+
+        if cost > self.budget * (1 + self.hysteresis) and self.level < len(self.levels) - 1:
+            # Over budget: step down to the first level that fits
+            target = self.level + 1
+            while target < len(self.levels) - 1 and self.predicted_cost(target) > self.budget:
+                target += 1
+            self._switch(target, cost, "over budget")
+            self.headroom_streak = 0
+
+        elif self.level > 0 and self.predicted_cost(self.level - 1) < self.budget * (1 - self.hysteresis):
+            # Headroom for a more accurate level, but only after it persists
+            self.headroom_streak += 1
+            if self.headroom_streak >= self.patience:
+                self._switch(self.level - 1, cost, "headroom")
+                self.headroom_streak = 0
+        else:
+            self.headroom_streak = 0
+
+    def _switch(self, level, cost, reason):
+        previous = self.levels[self.level]
+        self.level = level
+        self.switches += 1
+        self._apply()
+
+        decision = dict(self.telemetry(), time=time.time(), reason=reason,
+                        cost_before_ms=1000 * cost,
+                        previous_input_size=previous[0], previous_every_n=previous[1])
+        self.decisions.append(decision)
+        print(f"Scheduler: {reason}, {previous[0]}/{previous[1]} -> "
+              f"{decision['input_size']}/{decision['every_n']} "
+              f"({decision['cost_before_ms']:.1f} ms vs {decision['budget_ms']:.1f} ms budget)")
+
+    def _apply(self):
+        size, every_n = self.levels[self.level]
+        self.config.INPUT_SIZE = size
+        self.config.PROCESS_EVERY_N_FRAMES = every_n
+
+    def telemetry(self):
+        """Current decision and the measurements behind it"""
+        size, every_n = self.levels[self.level]
+        return {
+            "level": self.level,
+            "input_size": size,
+            "every_n": every_n,
+            "budget_ms": 1000 * self.budget,
+            "predicted_ms": 1000 * self.predicted_cost(self.level) if self.unit_time else None,
+            "other_ms": 1000 * self.other_time if self.other_time is not None else None,
+            "inference_ms": 1000 * self.unit_time * size * size if self.unit_time else None,
+            "switches": self.switches,
+        }
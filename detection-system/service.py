@@ -0,0 +1,441 @@
+"""Asyncio HTTP/WebSocket detection service with dynamic micro-batching
+
+Usage:
+    python service.py [--host 127.0.0.1] [--port 8080]
+
+Endpoints:
+    POST /detect   JPEG or PNG body -> JSON detections of that frame
+    GET  /ws       WebSocket; every binary message is a frame, every reply
+                   a JSON text message carrying the frame's sequence number
+    GET  /health   Queue depth and batching statistics
+
+Frames are decoded on a thread pool, then wait at most SERVICE_MAX_WAIT
+for other requests to join a batch of up to SERVICE_MAX_BATCH frames that
+runs as one forward on the inference thread. When SERVICE_QUEUE_SIZE
+frames are already waiting, HTTP requests are answered 503 with
+Retry-After and WebSocket frames get an "overloaded" reply instead of
+queueing without bound. Replies use the FrameResult.to_dict() layout of
+stream.py.
+
+Only the standard library is used: HTTP/1.1 with keep-alive and RFC 6455
+WebSocket framing are implemented on asyncio streams.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from records import FrameResult, to_records
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_CONTINUATION, WS_TEXT, WS_BINARY, WS_CLOSE, WS_PING, WS_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class Overloaded(Exception):
+    """The inference queue is full"""
+
+
+class MicroBatcher:
+    """Groups concurrent detect() calls into batched forwards
+
+    The first waiting frame opens a batch; it closes when max_batch frames
+    joined or max_wait passed. Batches run one at a time on a dedicated
+    thread, and the next batch fills while the current one runs.
+    """
+
+    def __init__(self, detector, max_batch=8, max_wait=0.01, queue_size=32):
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.task = None
+
+        # Statistics
+        self.batches = 0
+        self.frames = 0
+        self.rejected = 0
+        self.inference_time = 0.0
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def detect(self, frame):
+        """(boxes, confidences, class_ids, idxs, inference_time, batch info) for frame
+
+        Raises Overloaded when the queue is full.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((frame, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise Overloaded()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Clients that gave up no longer need their frame detected
+            batch = [item for item in batch if not item[1].cancelled()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results, inference_time = await loop.run_in_executor(
+                    self.executor, self.detector.detect_batch, [item[0] for item in batch]
+                )
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.frames += len(batch)
+            self.inference_time += inference_time
+            for (_, future, queued), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result + (inference_time, {
+                        "batch_size": len(batch),
+                        "queue_ms": round(1000 * (start - queued), 3),
+                    }))
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+            "frames": self.frames,
+            "rejected": self.rejected,
+            "mean_batch": round(self.frames / self.batches, 2) if self.batches else 0.0,
+            "mean_inference_ms": round(1000 * self.inference_time / self.batches, 3) if self.batches else 0.0,
+        }
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+        self.executor.shutdown(wait=False)
+
+
+def _decode(data):
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("body is not a decodable image")
+    return frame
+
+
+async def _ws_read(reader, max_size):
+    """(opcode, payload) of the next complete WebSocket message or control frame"""
+    opcode = None
+    parts = []
+    while True:
+        head = await reader.readexactly(2)
+        fin, frame_opcode = head[0] & 0x80, head[0] & 0x0F
+        masked, length = head[1] & 0x80, head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if length > max_size:
+            raise ValueError("WebSocket message too large")
+        mask = await reader.readexactly(4) if masked else None
+        payload = await reader.readexactly(length)
+        if mask is not None:
+            payload = (np.frombuffer(payload, dtype=np.uint8)
+                       ^ np.resize(np.frombuffer(mask, dtype=np.uint8), length)).tobytes()
+
+        # Control frames may arrive between the fragments of a message
+        if frame_opcode >= WS_CLOSE:
+            return frame_opcode, payload
+        if frame_opcode != WS_CONTINUATION:
+            opcode = frame_opcode
+        parts.append(payload)
+        if sum(map(len, parts)) > max_size:
+            raise ValueError("WebSocket message too large")
+        if fin:
+            return opcode, b"".join(parts)
+
+
+def _ws_frame(opcode, payload):
+    """Unmasked server-to-client frame"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+class DetectionService:
+    """HTTP and WebSocket front end of a MicroBatcher"""
+
+    def __init__(self, config, detector=None):
+        if detector is None:
+            from yolo_detector import YOLODetector
+            detector = YOLODetector(config)
+        self.config = config
+        self.detector = detector
+        self.decoder = ThreadPoolExecutor(config.SERVICE_DECODE_THREADS, thread_name_prefix="decode")
+        self.batcher = None
+        self.server = None
+
+        # Statistics
+        self.requests = 0
+        self.connections = 0
+        self.bad_requests = 0
+        self.errors = 0
+
+    async def start(self, host, port):
+        self.batcher = MicroBatcher(
+            self.detector,
+            self.config.SERVICE_MAX_BATCH,
+            self.config.SERVICE_MAX_WAIT,
+            self.config.SERVICE_QUEUE_SIZE
+        )
+        self.batcher.start()
+        self.server = await asyncio.start_server(self._connection, host, port, limit=64 * 1024)
+        address = self.server.sockets[0].getsockname()
+        print(f"Detection service on http://{address[0]}:{address[1]} (POST /detect, /ws, /health)")
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.close()
+        if self.batcher is not None:
+            self.batcher.stop()
+        self.decoder.shutdown(wait=False)
+
+    async def detect(self, data, index):
+        """FrameResult dict for an encoded image, raises ValueError or Overloaded"""
+        loop = asyncio.get_running_loop()
+        received = time.time()
+        frame = await loop.run_in_executor(self.decoder, _decode, data)
+        boxes, confidences, class_ids, idxs, inference_time, info = await self.batcher.detect(frame)
+        result = FrameResult(index, received, to_records(boxes, confidences, class_ids, idxs), inference_time)
+        reply = result.to_dict(self.detector.labels)
+        reply.update(info)
+        return reply
+
+    async def _connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request = await self._read_request(reader, writer)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self._websocket(reader, writer, headers)
+                    break
+
+                status, payload, extra = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader, writer):
+        """(method, path, headers, body), or None when the client is gone or was refused"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            await self._respond(writer, 431, {"error": "headers too large"}, keep_alive=False)
+            return None
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+            return None
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            await self._respond(writer, 400, {"error": "malformed content-length"}, keep_alive=False)
+            return None
+        if length > self.config.SERVICE_MAX_BODY:
+            await self._respond(writer, 413, {"error": "body too large"}, keep_alive=False)
+            return None
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _route(self, method, path, body):
+        """(status, JSON payload, extra headers)"""
+        if path == "/health":
+            health = {"requests": self.requests, "connections": self.connections,
+                      "bad_requests": self.bad_requests, "errors": self.errors, **self.batcher.stats()}
+            cache = self.detector.result_cache
+            if cache is not None:
+                health.update(cache_hits=cache.hits, cache_misses=cache.misses, cache_entries=len(cache.entries))
+            return 200, health, {}
+        if path != "/detect":
+            return 404, {"error": f"no route {path}"}, {}
+        if method != "POST":
+            return 405, {"error": "POST an encoded image to /detect"}, {"Allow": "POST"}
+
+        self.requests += 1
+        try:
+            return 200, await self.detect(body, self.requests), {}
+        except Overloaded:
+            return 503, {"error": "overloaded"}, {"Retry-After": "1"}
+        except ValueError as e:
+            self.bad_requests += 1
+            return 400, {"error": str(e)}, {}
+        except Exception as e:
+            return 500, {"error": self._failed(e)}, {}
+
+    def _failed(self, error):
+        """Count and log a detection that failed on the server side, returns the client message"""
+        self.errors += 1
+        print(f"Detection failed: {error!r}")
+        kind = type(error)
+        name = kind.__name__ if kind.__module__ == "builtins" else f"{kind.__module__}.{kind.__name__}"
+        return f"internal error: {name}"
+
+    async def _respond(self, writer, status, payload, extra=None, keep_alive=True):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        lines = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Access-Control-Allow-Origin: *",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines += [f"{name}: {value}" for name, value in (extra or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        send_lock = asyncio.Lock()
+        tasks = set()
+        in_flight = 0
+        sequence = 0
+
+        async def send(opcode, payload):
+            async with send_lock:
+                writer.write(_ws_frame(opcode, payload))
+                await writer.drain()
+
+        async def send_json(message):
+            await send(WS_TEXT, json.dumps(message, separators=(",", ":")).encode("utf-8"))
+
+        async def reply(seq, data):
+            nonlocal in_flight
+            try:
+                message = {"seq": seq, **await self.detect(data, seq)}
+            except Overloaded:
+                message = {"seq": seq, "error": "overloaded"}
+            except ValueError as e:
+                message = {"seq": seq, "error": str(e)}
+            except Exception as e:
+                message = {"seq": seq, "error": self._failed(e)}
+            finally:
+                in_flight -= 1
+            await send_json(message)
+
+        try:
+            while True:
+                opcode, payload = await _ws_read(reader, self.config.SERVICE_MAX_BODY)
+                if opcode == WS_CLOSE:
+                    await send(WS_CLOSE, payload[:2])
+                    break
+                if opcode == WS_PING:
+                    await send(WS_PONG, payload)
+                elif opcode == WS_BINARY:
+                    sequence += 1
+                    self.requests += 1
+                    # A camera client keeps sending; frames beyond its share are dropped, not queued
+                    if in_flight >= self.config.SERVICE_WS_INFLIGHT:
+                        await send_json({"seq": sequence, "error": "overloaded"})
+                        continue
+                    in_flight += 1
+                    task = asyncio.get_running_loop().create_task(reply(sequence, payload))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        except ValueError:
+            await send(WS_CLOSE, struct.pack("!H", 1009))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def serve(config, host, port):
+    service = DetectionService(config)
+    await service.start(host, port)
+    try:
+        await service.serve_forever()
+    finally:
+        service.stop()
+
+
+def _option(name, default=None):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+if __name__ == "__main__":
+    from config import Config
+
+    config = Config()
+    host = _option("--host", config.SERVICE_HOST)
+    port = int(_option("--port", config.SERVICE_PORT))
+    try:
+        asyncio.run(serve(config, host, port))
+    except KeyboardInterrupt:
+        print("Service stopped")
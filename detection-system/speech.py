@@ -0,0 +1,280 @@
+"""Persistent speech engine that plays pre-synthesized phrase clips"""
+import io
+import os
+import platform
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from collections import deque
+
+
+def read_wav(data):
+    """Return (pcm_bytes, (channels, sample_width, sample_rate)) from WAV bytes"""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        params = (wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+        return wav.readframes(wav.getnframes()), params
+
+
+def to_wav(pcm, params):
+    """Wrap raw PCM in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(params[0])
+        wav.setsampwidth(params[1])
+        wav.setframerate(params[2])
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------- synthesizers
+
+class EspeakSynthesizer:
+    """espeak rendering to WAV on stdout (Linux)"""
+
+    def __init__(self, speed=180):
+        self.speed = speed
+
+    def synthesize(self, text):
+        result = subprocess.run(["espeak", "-s", str(self.speed), "--stdout", text],
+                                capture_output=True, timeout=10, check=True)
+        return read_wav(result.stdout)
+
+
+class SaySynthesizer:
+    """macOS `say` rendering to a 16-bit WAV file"""
+
+    def __init__(self, rate=200):
+        self.rate = rate
+
+    def synthesize(self, text):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            subprocess.run(["say", "-r", str(self.rate), "-o", path,
+                            "--data-format=LEI16@22050", text], timeout=10, check=True)
+            with open(path, "rb") as f:
+                return read_wav(f.read())
+        finally:
+            os.remove(path)
+
+
+class PowerShellSynthesizer:
+    """One long-lived PowerShell process holding a SpeechSynthesizer (Windows)"""
+
+    MARKER = "__speech_done__"
+
+    def __init__(self, rate=2):
+        self.process = subprocess.Popen(
+            ["powershell", "-NoLogo", "-NoProfile", "-Command", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1
+        )
+        self._run("Add-Type -AssemblyName System.Speech; "
+                  "$speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; "
+                  f"$speak.Rate = {rate}")
+
+    def _run(self, command):
+        self.process.stdin.write(f"{command}; Write-Output '{self.MARKER}'\n")
+        self.process.stdin.flush()
+        for line in self.process.stdout:
+            if line.strip() == self.MARKER:
+                return
+        raise RuntimeError("PowerShell speech process exited")
+
+    def synthesize(self, text):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            text = text.replace("'", "''")
+            self._run(f"$speak.SetOutputToWaveFile('{path}'); $speak.Speak('{text}'); "
+                      f"$speak.SetOutputToNull()")
+            with open(path, "rb") as f:
+                return read_wav(f.read())
+        finally:
+            os.remove(path)
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+
+
+# ---------------------------------------------------------------- audio sinks
+
+class AplaySink:
+    """Persistent `aplay` process fed raw PCM over stdin (Linux)"""
+
+    def __init__(self, params):
+        channels, sample_width, sample_rate = params
+        self.process = subprocess.Popen(
+            ["aplay", "-q", "-t", "raw", "-f", {1: "U8", 2: "S16_LE"}[sample_width],
+             "-r", str(sample_rate), "-c", str(channels)],
+            stdin=subprocess.PIPE
+        )
+
+    def play(self, pcm):
+        self.process.stdin.write(pcm)
+        self.process.stdin.flush()
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+
+
+class WinsoundSink:
+    """In-process WAV playback from memory (Windows)"""
+
+    def __init__(self, params):
+        import winsound
+        self.winsound = winsound
+        self.params = params
+
+    def play(self, pcm):
+        self.winsound.PlaySound(to_wav(pcm, self.params), self.winsound.SND_MEMORY)
+
+    def close(self):
+        pass
+
+
+class AfplaySink:
+    """Plays each clip with afplay (macOS); synthesis is still cached"""
+
+    def __init__(self, params):
+        self.params = params
+
+    def play(self, pcm):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        with os.fdopen(fd, "wb") as f:
+            f.write(to_wav(pcm, self.params))
+        try:
+            subprocess.run(["afplay", path], timeout=10)
+        finally:
+            os.remove(path)
+
+    def close(self):
+        pass
+
+
+def default_synthesizer():
+    """Platform synthesizer, or None when no TTS tool is installed"""
+    system = platform.system().lower()
+    if system == "windows" and shutil.which("powershell"):
+        return PowerShellSynthesizer()
+    if system == "darwin" and shutil.which("say"):
+        return SaySynthesizer()
+    if system == "linux" and shutil.which("espeak"):
+        return EspeakSynthesizer()
+    return None
+
+
+def default_sink(params):
+    """Platform audio sink for PCM in the given (channels, width, rate) format"""
+    system = platform.system().lower()
+    if system == "windows":
+        return WinsoundSink(params)
+    if system == "darwin":
+        return AfplaySink(params)
+    return AplaySink(params)
+
+
+# ---------------------------------------------------------------- engine
+
+class SpeechEngine:
+    """Speaks phrases by concatenating cached clips through one long-lived sink
+
+    Text is split on ':' and ',' into units ("Detected: person, car" ->
+    "Detected", "person", "car"); each unit is synthesized once and cached,
+    so after prerender() an announcement is a memory concatenation and a
+    write to an already-open audio sink.
+    """
+
+    def __init__(self, synthesizer, sink_factory=default_sink, gap=0.08):
+        self.synthesizer = synthesizer
+        self.sink_factory = sink_factory
+        self.gap = gap
+        self.sink = None
+        self.params = None
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=100)
+
+    @staticmethod
+    def units(text):
+        return [unit.strip() for unit in re.split(r"[:,]", text) if unit.strip()]
+
+    def clip(self, unit):
+        """PCM for one unit, synthesizing it on first use"""
+        key = unit.lower()
+        # One lock: synthesizers (e.g. the PowerShell process) are not thread-safe
+        with self.lock:
+            pcm = self.cache.get(key)
+            if pcm is None:
+                pcm, params = self.synthesizer.synthesize(unit)
+                if self.params is None:
+                    self.params = params
+                self.cache[key] = pcm
+        return pcm
+
+    def prerender(self, phrases):
+        """Synthesize phrases ahead of time"""
+        for phrase in phrases:
+            for unit in self.units(phrase):
+                try:
+                    self.clip(unit)
+                except Exception as e:
+                    print(f"Speech prerender failed for '{unit}': {e}")
+
+    def prerender_async(self, phrases):
+        thread = threading.Thread(target=self.prerender, args=(list(phrases),), daemon=True)
+        thread.start()
+        return thread
+
+    def say(self, text):
+        """Play text, returns the time until the sink accepted the audio
+
+        That is when sink.play() returns: after the write for the aplay pipe,
+        after playback itself for the synchronous winsound and afplay sinks.
+        """
+        start = time.perf_counter()
+        clips = [self.clip(unit) for unit in self.units(text)]
+        if not clips:
+            return 0.0
+
+        channels, sample_width, sample_rate = self.params
+        silence = b"\x00" * (int(sample_rate * self.gap) * channels * sample_width)
+        if self.sink is None:
+            self.sink = self.sink_factory(self.params)
+
+        self.sink.play(silence.join(clips))
+        latency = time.perf_counter() - start
+        self.latencies.append(latency)
+        return latency
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+        if hasattr(self.synthesizer, "close"):
+            self.synthesizer.close()
+
+
+def create_speech_engine(labels, templates=("Detected",)):
+    """SpeechEngine for this platform with labels and templates prerendered in the background
+
+    Returns None if no synthesizer is available.
+    """
+    try:
+        synthesizer = default_synthesizer()
+    except Exception as e:
+        print(f"Speech engine unavailable: {e}")
+        return None
+    if synthesizer is None:
+        return None
+
+    engine = SpeechEngine(synthesizer)
+    engine.prerender_async(list(templates) + list(labels))
+    return engine
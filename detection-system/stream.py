@@ -0,0 +1,115 @@
+"""Detections as a stream of FrameResults, without the display loop
+
+Library use:
+    from stream import detect_stream
+    for result in detect_stream("clip.mp4"):
+        print(result.index, result.detections)
+
+Command line:
+    python stream.py [source] [--jsonl out.jsonl] [--binary out.bin] [--realtime]
+
+source is anything CameraManager accepts (default Config.CAMERA_SOURCE).
+Without sinks, JSON lines are written to stdout.
+"""
+import sys
+import time
+
+from records import BinarySink, FrameResult, JsonlSink, to_records
+
+
+def detect_stream(source=None, config=None, detector=None, sinks=(), realtime=False, max_frames=None):
+    """Yield a FrameResult for every frame read from source
+
+    Recorded sources run as fast as they decode unless realtime is set;
+    live sources always run at their own pace. Each result is written to
+    every sink before it is yielded. The source is released when the
+    generator is exhausted or closed.
+    """
+    from camera_manager import CameraManager
+
+    if config is None:
+        from config import Config
+        config = Config()
+    if detector is None:
+        from yolo_detector import YOLODetector
+        detector = YOLODetector(config)
+
+    camera = CameraManager(config, source, realtime=realtime)
+    if not camera.is_opened():
+        camera.release()
+        raise IOError(f"Could not open source {camera.source}")
+
+    try:
+        index = 0
+        while max_frames is None or index < max_frames:
+            ret, frame = camera.read_frame()
+            if not ret:
+                break
+            timestamp = time.time()
+            boxes, confidences, class_ids, idxs, inference_time = detector.detect_objects(frame)
+            result = FrameResult(index, timestamp, to_records(boxes, confidences, class_ids, idxs),
+                                 inference_time, detector.last_reused)
+            for sink in sinks:
+                sink.write(result)
+            yield result
+            index += 1
+    finally:
+        camera.release()
+
+
+async def adetect_stream(*args, **kwargs):
+    """detect_stream as an async iterator; capture and inference run in a worker thread"""
+    import asyncio
+
+    stream = detect_stream(*args, **kwargs)
+    end = object()
+    try:
+        while True:
+            result = await asyncio.to_thread(next, stream, end)
+            if result is end:
+                return
+            yield result
+    finally:
+        stream.close()
+
+
+def _option(name):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return None
+
+
+if __name__ == "__main__":
+    from config import Config
+    from yolo_detector import YOLODetector
+
+    config = Config()
+    detector = YOLODetector(config)
+
+    options = {"--jsonl", "--binary"}
+    args = [a for i, a in enumerate(sys.argv[1:], 1)
+            if not a.startswith("--") and sys.argv[i - 1] not in options]
+    source = args[0] if args else None
+
+    sinks = []
+    if _option("--jsonl"):
+        sinks.append(JsonlSink(_option("--jsonl"), detector.labels))
+    if _option("--binary"):
+        sinks.append(BinarySink(_option("--binary")))
+    if not sinks:
+        sinks.append(JsonlSink("-", detector.labels))
+
+    frames = detections = 0
+    start = time.time()
+    try:
+        for result in detect_stream(source, config, detector, sinks, realtime="--realtime" in sys.argv):
+            frames += 1
+            detections += len(result)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for sink in sinks:
+            sink.close()
+    elapsed = time.time() - start
+    print(f"{frames} frames, {detections} detections in {elapsed:.1f}s "
+          f"({frames / max(elapsed, 1e-9):.1f} FPS)", file=sys.stderr)
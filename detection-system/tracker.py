@@ -0,0 +1,125 @@
+"""Lightweight IoU tracker that carries detections across skipped frames"""
+import threading
+
+import numpy as np
+
+
+class Track:
+    __slots__ = ("track_id", "box", "anchor", "velocity", "class_id", "confidence",
+                 "hits", "misses", "steps")
+
+    def __init__(self, track_id, box, class_id, confidence):
+        self.track_id = track_id
+        self.box = box.astype(np.float32)
+        self.anchor = self.box.copy()  # Box at the last detector update
+        self.velocity = np.zeros(2, dtype=np.float32)  # Pixels per frame for x, y
+        self.class_id = int(class_id)
+        self.confidence = float(confidence)
+        self.hits = 1
+        self.misses = 0
+        self.steps = 0  # Frames predicted since the last update
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between (N, 4) and (M, 4) [x, y, w, h] boxes"""
+    a_x2 = a[:, 0] + a[:, 2]
+    a_y2 = a[:, 1] + a[:, 3]
+    b_x2 = b[:, 0] + b[:, 2]
+    b_y2 = b[:, 1] + b[:, 3]
+
+    inter_w = np.minimum(a_x2[:, None], b_x2[None]) - np.maximum(a[:, 0, None], b[None, :, 0])
+    inter_h = np.minimum(a_y2[:, None], b_y2[None]) - np.maximum(a[:, 1, None], b[None, :, 1])
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None] - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+class IoUTracker:
+    """Greedy per-class IoU association with a constant-velocity motion model
+
+    update() is called with detector output, predict() on every frame the
+    detector skipped. Both are safe to call from different threads.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=2, min_hits=3):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.tracks = []
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def update(self, boxes, confidences, class_ids, idxs):
+        """Associate the NMS survivors of one detector run with existing tracks"""
+        idxs = np.asarray(idxs, dtype=np.int64).reshape(-1)
+        det_boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)[idxs]
+        det_conf = np.asarray(confidences)[idxs]
+        det_ids = np.asarray(class_ids)[idxs]
+
+        with self.lock:
+            matched_tracks, matched_dets = set(), set()
+            if self.tracks and len(det_boxes):
+                track_boxes = np.array([t.box for t in self.tracks])
+                track_ids = np.array([t.class_id for t in self.tracks])
+                iou = iou_matrix(track_boxes, det_boxes)
+                iou[track_ids[:, None] != det_ids[None]] = 0
+
+                # Greedy: best overlaps first
+                for flat in np.argsort(iou, axis=None)[::-1]:
+                    t, d = np.unravel_index(flat, iou.shape)
+                    if iou[t, d] < self.iou_threshold:
+                        break
+                    if t in matched_tracks or d in matched_dets:
+                        continue
+                    matched_tracks.add(t)
+                    matched_dets.add(d)
+                    self._correct(self.tracks[t], det_boxes[d], det_conf[d])
+
+            survivors = []
+            for t, track in enumerate(self.tracks):
+                if t not in matched_tracks:
+                    track.misses += 1
+                    if track.misses > self.max_misses:
+                        continue
+                survivors.append(track)
+
+            for d in range(len(det_boxes)):
+                if d not in matched_dets:
+                    survivors.append(Track(self.next_id, det_boxes[d], det_ids[d], det_conf[d]))
+                    self.next_id += 1
+
+            self.tracks = survivors
+
+    def _correct(self, track, box, confidence):
+        """Snap a track to its new detection and refresh its velocity estimate"""
+        steps = track.steps + 1
+        measured = (box[:2] - track.anchor[:2]) / steps
+        track.velocity = 0.5 * track.velocity + 0.5 * measured
+        track.box = box.copy()
+        track.anchor = track.box.copy()
+        track.confidence = float(confidence)
+        track.hits += 1
+        track.misses = 0
+        track.steps = 0
+
+    def predict(self):
+        """Advance every track by one frame of its velocity"""
+        with self.lock:
+            for track in self.tracks:
+                track.box[:2] += track.velocity
+                track.steps += 1
+
+    def results(self):
+        """Tracks in detector format: (boxes, confidences, class_ids, idxs, track_ids)"""
+        with self.lock:
+            tracks = list(self.tracks)
+        boxes = np.array([t.box for t in tracks], dtype=np.float32).reshape(-1, 4).astype(np.int32)
+        confidences = np.array([t.confidence for t in tracks], dtype=np.float32)
+        class_ids = np.array([t.class_id for t in tracks], dtype=np.int32)
+        track_ids = np.array([t.track_id for t in tracks], dtype=np.int32)
+        return boxes, confidences, class_ids, np.arange(len(tracks)), track_ids
+
+    def stable(self):
+        """Tracks that have been matched at least min_hits times"""
+        with self.lock:
+            return [t for t in self.tracks if t.hits >= self.min_hits]
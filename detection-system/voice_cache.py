@@ -0,0 +1,197 @@
+"""Background gTTS playback with a content-addressed on-disk audio cache"""
+import hashlib
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+
+class AudioCache:
+    """MP3 files keyed by sha1(lang, text), evicted least-recently-used by size
+
+    Recency is kept in the file mtime so it survives restarts; hits touch
+    the file, and the directory is trimmed to max_bytes after every insert.
+    """
+
+    def __init__(self, directory, max_bytes=20 * 1024 * 1024, suffix=".mp3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # Oldest first
+        self.entries = OrderedDict()
+        files = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(suffix)]
+        for path in sorted(files, key=os.path.getmtime):
+            self.entries[path] = os.path.getsize(path)
+        self.size = sum(self.entries.values())
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, text, lang):
+        digest = hashlib.sha1(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + self.suffix)
+
+    def get(self, text, lang, synthesize):
+        """Path of the clip for text, calling synthesize(text, lang, path) on a miss"""
+        path = self.path_for(text, lang)
+        with self.lock:
+            if path in self.entries and os.path.exists(path):
+                self.hits += 1
+                self.entries.move_to_end(path)
+                os.utime(path)
+                return path
+            self.misses += 1
+
+        # Synthesize outside the lock into a temp name, then publish atomically
+        partial = f"{path}.{threading.get_ident()}.part"
+        try:
+            synthesize(text, lang, partial)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        with self.lock:
+            self.size -= self.entries.pop(path, 0)
+            self.entries[path] = os.path.getsize(path)
+            self.size += self.entries[path]
+            self._evict(keep=path)
+        return path
+
+    def _evict(self, keep):
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            path, size = next(iter(self.entries.items()))
+            if path == keep:
+                break
+            del self.entries[path]
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def summary(self):
+        return (f"audio cache: {self.hits} hits, {self.misses} misses, {self.evictions} evicted, "
+                f"{len(self.entries)} files / {self.size / 1024:.0f} KiB")
+
+
+def gtts_synthesize(text, lang, path):
+    """Render text to an MP3 file with Google TTS (needs network)"""
+    from gtts import gTTS
+    gTTS(text=text, lang=lang).save(path)
+
+
+class PygamePlayer:
+    """Plays clips through a mixer initialized once
+
+    Completion is waited for on a threading.Event with the clip length as
+    timeout, so the worker sleeps instead of polling get_busy().
+    """
+
+    def __init__(self):
+        import pygame
+        self.pygame = pygame
+        pygame.mixer.init()
+
+    def play(self, path, interrupt):
+        sound = self.pygame.mixer.Sound(path)
+        channel = sound.play()
+        if interrupt.wait(sound.get_length()) and channel is not None:
+            channel.stop()
+
+    def close(self):
+        self.pygame.mixer.quit()
+
+
+class VoiceWorker:
+    """Speaks phrases on a background thread so callers never block
+
+    speak() drops the phrase when queue_size announcements are already
+    waiting, matching the drop-when-busy behaviour of AudioManager. If
+    the player cannot be opened the worker is dead: queued phrases are
+    discarded and speak() drops everything.
+    """
+
+    def __init__(self, cache, synthesize=gtts_synthesize, player_factory=PygamePlayer,
+                 lang="en", queue_size=2):
+        self.cache = cache
+        self.synthesize = synthesize
+        self.player_factory = player_factory
+        self.lang = lang
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+        self.pending = 0
+        self.done = threading.Condition()
+        self.dropped = 0
+        self.dead = False
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def speak(self, text):
+        """Queue text for playback, returns False if it was dropped"""
+        with self.done:
+            if self.dead:
+                self.dropped += 1
+                return False
+            try:
+                self.queue.put_nowait(text)
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self.pending += 1
+        return True
+
+    def _worker(self):
+        # The mixer is opened on the first phrase, not while the model loads
+        player = None
+        while not self.stopped.is_set():
+            try:
+                text = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            if player is None:
+                try:
+                    player = self.player_factory()
+                except Exception as e:
+                    print(f"Audio playback unavailable: {e}")
+                    with self.done:
+                        self.dead = True
+                        while True:
+                            try:
+                                self.queue.get_nowait()
+                            except queue.Empty:
+                                break
+                        self.pending = 0
+                        self.done.notify_all()
+                    return
+
+            try:
+                path = self.cache.get(text, self.lang, self.synthesize)
+                player.play(path, self.stopped)
+            except PermissionError as e:
+                print(f"Permission error: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+            finally:
+                with self.done:
+                    self.pending -= 1
+                    self.done.notify_all()
+
+        if player is not None:
+            player.close()
+
+    def wait_idle(self, timeout=None):
+        """Block until every queued phrase has been played"""
+        with self.done:
+            return self.done.wait_for(lambda: self.pending == 0, timeout)
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join(timeout=2)
@@ -2,7 +2,12 @@
 import cv2
 import numpy as np
 import time
-from collections import deque
+
+from engines import create_engine
+from postprocess import decode_outputs, batched_nms
+from preprocess import Preprocessor
+from roi import ChangedRegionFinder, tiles_for_regions
+from tracker import iou_matrix
 
 
 class YOLODetector:
@@ -14,137 +19,389 @@ class YOLODetector:
     def _load_model(self):
         """Load YOLO model and configure backend"""
         print("Loading YOLO model...")
-        self.net = cv2.dnn.readNetFromDarknet(
-            self.config.CONFIG_PATH,
-            self.config.WEIGHTS_PATH
-        )
+        self.engine = create_engine(self.config)
+        self.engine.load()
 
-        # Configure backend (GPU if available)
-        if cv2.cuda.getCudaEnabledDeviceCount() > 0:
-            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-            print("Using GPU acceleration")
-        else:
-            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
-            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
-            print("Using CPU backend")
-
-        # Get output layers
-        layer_names = self.net.getLayerNames()
-        self.output_layers = [layer_names[i - 1] for i in self.net.getUnconnectedOutLayers()]
+        # The first forward at each size pays for allocation and layer fusion
+        if self.config.WARMUP_RUNS:
+            sizes = (self.config.INPUT_SIZE,) + tuple(self.config.WARMUP_SIZES)
+            if self.config.CASCADE_MODE:
+                sizes += (self.config.CASCADE_LOW_SIZE, self.config.CASCADE_HIGH_SIZE)
+            for size in dict.fromkeys(sizes):
+                self.engine.warmup(size, self.config.WARMUP_RUNS)
 
         # Load class labels
         with open(self.config.LABELS_PATH, "r") as f:
             self.labels = f.read().strip().split("\n")
 
+        # Score columns decoded when only some classes matter
+        self.classes = None
+        if self.config.CLASS_ALLOWLIST:
+            unknown = set(self.config.CLASS_ALLOWLIST) - set(self.labels)
+            if unknown:
+                raise ValueError(f"CLASS_ALLOWLIST has unknown labels: {sorted(unknown)}")
+            self.classes = np.array(sorted(self.labels.index(label) for label in self.config.CLASS_ALLOWLIST),
+                                    dtype=np.int32)
+
     def _setup_detection_state(self):
         """Initialize detection state and colors"""
-        self.last_detections = deque(maxlen=self.config.DETECTION_HISTORY_SIZE)
+        # Motion gate reuses the previous result while the scene is static
+        self.motion_gate = None
+        if self.config.MOTION_GATING:
+            from motion_gate import MotionGate
+            self.motion_gate = MotionGate(self.config)
+        self.last_result = None
+        self.last_reused = False
+
+        # Result cache answers repeated still images without a forward pass
+        self.result_cache = None
+        if self.config.RESULT_CACHE:
+            from result_cache import ResultCache
+            self.result_cache = ResultCache(
+                self.config,
+                self.config.RESULT_CACHE_MODE,
+                self.config.RESULT_CACHE_DISTANCE,
+                self.config.RESULT_CACHE_ENTRIES,
+                self.config.RESULT_CACHE_BYTES,
+                self.config.RESULT_CACHE_TTL
+            )
+
+        # ROI mode runs the network only on tiles around changed regions
+        self.region_finder = None
+        if self.config.ROI_MODE:
+            self.region_finder = ChangedRegionFinder(self.config)
+        self.roi_frames = 0
+
+        # Cascade statistics: frames run, and escalations to the high size per reason
+        self.cascade_frames = 0
+        self.cascade_escalations = {"borderline": 0, "small": 0, "tracks": 0}
+
+        # Reusable blob buffers (and letterboxing) for full-frame detection
+        self.preprocessor = None
+        if self.config.PREPROCESS_BUFFERS or self.config.LETTERBOX:
+            self.preprocessor = Preprocessor(letterbox=self.config.LETTERBOX)
+
+        # Set by the owner when instrumentation is enabled (metrics.Metrics)
+        self.metrics = None
 
         # Pre-generate colors for consistent visualization
         np.random.seed(42)
         self.colors = np.random.randint(0, 255, size=(len(self.labels), 3), dtype="uint8")
 
-    def detect_objects(self, frame):
-        """Perform object detection on frame"""
+    def detect_objects(self, frame, extra_regions=()):
+        """Perform object detection on frame
+
+        extra_regions (e.g. tracked boxes) are also searched in ROI mode,
+        and in cascade mode escalate when the low-resolution pass misses them.
+        """
         H, W = frame.shape[:2]
 
+        # Skip the forward pass entirely when nothing changed
+        self.last_reused = (
+            self.motion_gate is not None
+            and not self.motion_gate.should_detect(frame)
+            and self.last_result is not None
+        )
+        if self.last_reused:
+            return self.last_result + (0.0,)
+
+        # ROI results depend on the previous frame, and track-driven cascade
+        # escalation on the tracks, so only frame-determined results are cached
+        cache_key = None
+        if (self.result_cache is not None and self.region_finder is None
+                and not (self.config.CASCADE_MODE and len(extra_regions))):
+            cache_key = self.result_cache.key(frame, "cascade" if self.config.CASCADE_MODE else "full")
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                self.last_reused = True
+                self.last_result = cached
+                return cached + (0.0,)
+
+        if self.region_finder is not None:
+            result = self.detect_regions(frame, extra_regions)
+        elif self.config.CASCADE_MODE:
+            result = self.detect_cascade(frame, extra_regions)
+        else:
+            result = self._detect_full(frame)
+
+        if cache_key is not None:
+            self.result_cache.put(cache_key, result[:4])
+        if self.metrics is not None:
+            self.metrics.inc("nms_survivors_total", len(result[3]))
+        self.last_result = result[:4]
+        return result
+
+    def _detect_full(self, frame, size=None, threshold=None):
+        """Detect on the whole frame resized to the network input
+
+        size and threshold default to INPUT_SIZE and CONFIDENCE_THRESHOLD.
+        """
+        H, W = frame.shape[:2]
+        size = size or self.config.INPUT_SIZE
+        threshold = threshold or self.config.CONFIDENCE_THRESHOLD
+
         # Create blob
-        blob = cv2.dnn.blobFromImage(
-            frame,
+        blob_start = time.perf_counter()
+        geometry = None
+        if self.preprocessor is not None:
+            blob, geometry = self.preprocessor(frame, size)
+        else:
+            blob = cv2.dnn.blobFromImage(
+                frame,
+                1 / 255.0,
+                (size, size),
+                swapRB=True,
+                crop=False
+            )
+
+        # Run inference
+        start_time = time.perf_counter()
+        outputs = self.engine.infer_batch(blob)
+        decode_start = time.perf_counter()
+        inference_time = decode_start - start_time
+
+        # Process detections
+        if geometry is None:
+            boxes, confidences, class_ids = self._process_detections(outputs, W, H, threshold)
+        else:
+            boxes, confidences, class_ids = self._process_detections(
+                outputs, geometry.width, geometry.height, threshold
+            )
+            geometry.unmap(boxes)
+
+        # Apply per-class Non-Maximum Suppression
+        nms_start = time.perf_counter()
+        idxs = batched_nms(
+            boxes, confidences, class_ids,
+            threshold,
+            self.config.NMS_THRESHOLD
+        )
+
+        if self.metrics is not None:
+            self.metrics.observe("blob", start_time - blob_start)
+            self.metrics.observe("forward", inference_time)
+            self.metrics.observe("decode", nms_start - decode_start)
+            self.metrics.observe("nms", time.perf_counter() - nms_start)
+
+        return boxes, confidences, class_ids, idxs, inference_time
+
+    def detect_cascade(self, frame, expected=()):
+        """Low-resolution pass on every frame, high-resolution pass only when needed
+
+        The low pass is decoded down to CASCADE_MIN_SCORE. It escalates to
+        CASCADE_HIGH_SIZE when an NMS survivor scores between that and
+        CONFIDENCE_THRESHOLD (borderline), when a detection is smaller than
+        CASCADE_MIN_BOX network pixels, or when an expected (tracked) box
+        has no low-pass detection overlapping it by CASCADE_TRACK_IOU.
+        Otherwise the low pass survivors above the threshold are returned.
+        """
+        H, W = frame.shape[:2]
+        self.cascade_frames += 1
+        low_size = self.config.CASCADE_LOW_SIZE
+        boxes, confidences, class_ids, idxs, low_time = self._detect_full(
+            frame, low_size, self.config.CASCADE_MIN_SCORE
+        )
+        idxs = np.asarray(idxs).reshape(-1)
+
+        # Lower-scored candidates cannot suppress higher ones, so the confident
+        # survivors are the ones NMS at the full threshold would keep
+        confident = confidences[idxs] > self.config.CONFIDENCE_THRESHOLD
+        kept = boxes[idxs[confident]]
+
+        reason = None
+        if not confident.all():
+            reason = "borderline"
+        elif len(kept) and (np.minimum(kept[:, 2] * low_size / W, kept[:, 3] * low_size / H)
+                            < self.config.CASCADE_MIN_BOX).any():
+            reason = "small"
+        elif len(expected):
+            expected = np.asarray(expected, dtype=np.float32).reshape(-1, 4)
+            if not len(kept) or (iou_matrix(expected, kept.astype(np.float32)).max(axis=1)
+                                 < self.config.CASCADE_TRACK_IOU).any():
+                reason = "tracks"
+
+        if reason is None:
+            return boxes, confidences, class_ids, idxs[confident], low_time
+
+        self.cascade_escalations[reason] += 1
+        boxes, confidences, class_ids, idxs, high_time = self._detect_full(frame, self.config.CASCADE_HIGH_SIZE)
+        return boxes, confidences, class_ids, idxs, low_time + high_time
+
+    def cascade_summary(self):
+        escalated = sum(self.cascade_escalations.values())
+        reasons = ", ".join(f"{count} {reason}" for reason, count in self.cascade_escalations.items())
+        share = 100 * escalated / self.cascade_frames if self.cascade_frames else 0.0
+        return f"cascade: {self.cascade_frames} frames, {escalated} escalated ({share:.0f}%: {reasons})"
+
+    def detect_regions(self, frame, extra_regions=()):
+        """Detect only inside tiles around changed (and optionally tracked) regions
+
+        Previous detections outside every tile are carried over, then tile and
+        carried detections go through one cross-tile NMS. Falls back to a
+        full-frame pass periodically or when the changed area is too large.
+        """
+        H, W = frame.shape[:2]
+        self.roi_frames += 1
+        regions = self.region_finder.find(frame) + [list(r) for r in extra_regions]
+        tiles = tiles_for_regions(regions, W, H, self.config.ROI_TILE_SIZE, self.config.ROI_MARGIN)
+
+        if (self.last_result is None
+                or self.roi_frames % self.config.ROI_FULL_FRAME_EVERY == 0
+                or len(tiles) > self.config.ROI_MAX_TILES
+                or sum(w * h for _, _, w, h in tiles) > self.config.ROI_MAX_AREA * W * H):
+            return self._detect_full(frame)
+
+        if not tiles:
+            # Nothing changed: a reuse like the motion gate's, not a 0 s forward pass
+            self.last_reused = True
+            return self.last_result + (0.0,)
+
+        boxes, confidences, class_ids, inference_time = self._tile_candidates(frame, tiles)
+
+        # Keep previous detections whose centers lie outside all tiles
+        prev_boxes, prev_confidences, prev_class_ids, prev_idxs = self.last_result
+        carried = prev_boxes[prev_idxs]
+        centers = carried[:, :2] + carried[:, 2:] / 2
+        inside = np.zeros(len(carried), dtype=bool)
+        for x, y, w, h in tiles:
+            inside |= ((centers[:, 0] >= x) & (centers[:, 0] < x + w)
+                       & (centers[:, 1] >= y) & (centers[:, 1] < y + h))
+        keep = prev_idxs[~inside]
+
+        boxes = np.concatenate([boxes, prev_boxes[keep]])
+        confidences = np.concatenate([confidences, prev_confidences[keep]])
+        class_ids = np.concatenate([class_ids, prev_class_ids[keep]])
+        idxs = batched_nms(
+            boxes, confidences, class_ids,
+            self.config.CONFIDENCE_THRESHOLD,
+            self.config.NMS_THRESHOLD
+        )
+        return boxes, confidences, class_ids, idxs, inference_time
+
+    def detect_tiles(self, frame, tiles):
+        """Detect inside the given (x, y, w, h) tiles with one batched forward"""
+        boxes, confidences, class_ids, inference_time = self._tile_candidates(frame, tiles)
+        idxs = batched_nms(
+            boxes, confidences, class_ids,
+            self.config.CONFIDENCE_THRESHOLD,
+            self.config.NMS_THRESHOLD
+        )
+        return boxes, confidences, class_ids, idxs, inference_time
+
+    def _tile_candidates(self, frame, tiles):
+        """Decoded candidates from all tiles, mapped back to frame coordinates"""
+        crops = [frame[y:y + h, x:x + w] for x, y, w, h in tiles]
+        blob = cv2.dnn.blobFromImages(
+            crops,
             1 / 255.0,
             (self.config.INPUT_SIZE, self.config.INPUT_SIZE),
             swapRB=True,
             crop=False
         )
 
-        # Run inference
-        self.net.setInput(blob)
         start_time = time.time()
-        outputs = self.net.forward(self.output_layers)
+        outputs = self.engine.infer_batch(blob)
         inference_time = time.time() - start_time
+        if self.metrics is not None:
+            self.metrics.observe("forward", inference_time)
+
+        parts = []
+        for b, (x, y, w, h) in enumerate(tiles):
+            tile_outputs = [self._batch_item(output, b, len(tiles)) for output in outputs]
+            boxes, confidences, class_ids = self._process_detections(tile_outputs, w, h)
+            boxes[:, 0] += x
+            boxes[:, 1] += y
+            parts.append((boxes, confidences, class_ids))
+
+        boxes, confidences, class_ids = (np.concatenate(column) for column in zip(*parts))
+        return boxes, confidences, class_ids, inference_time
+
+    def detect_batch(self, frames):
+        """Perform object detection on several frames with a single forward pass
+
+        Returns a list of (boxes, confidences, class_ids, idxs) per frame and
+        the inference time of the shared forward pass. With the result cache,
+        only frames it cannot answer go through the network.
+        """
+        if self.result_cache is None:
+            return self._detect_batch(frames)
+
+        # Batches always stretch to INPUT_SIZE, so they never share entries with detect_objects()
+        keys = [self.result_cache.key(frame, "batch") for frame in frames]
+        results = [self.result_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results, 0.0
+
+        detected, inference_time = self._detect_batch([frames[i] for i in missing])
+        for i, result in zip(missing, detected):
+            results[i] = result
+            self.result_cache.put(keys[i], result)
+        return results, inference_time
+
+    def _detect_batch(self, frames):
+        blob = cv2.dnn.blobFromImages(
+            frames,
+            1 / 255.0,
+            (self.config.INPUT_SIZE, self.config.INPUT_SIZE),
+            swapRB=True,
+            crop=False
+        )
 
-        # Process detections
-        boxes, confidences, class_ids = self._process_detections(outputs, W, H)
+        # Run inference
+        start_time = time.time()
+        outputs = self.engine.infer_batch(blob)
+        inference_time = time.time() - start_time
 
-        # Apply Non-Maximum Suppression
-        idxs = []
-        if boxes:
-            idxs = cv2.dnn.NMSBoxes(
-                boxes, confidences,
+        results = []
+        for b, frame in enumerate(frames):
+            H, W = frame.shape[:2]
+            frame_outputs = [self._batch_item(output, b, len(frames)) for output in outputs]
+            boxes, confidences, class_ids = self._process_detections(frame_outputs, W, H)
+            idxs = batched_nms(
+                boxes, confidences, class_ids,
                 self.config.CONFIDENCE_THRESHOLD,
                 self.config.NMS_THRESHOLD
             )
+            results.append((boxes, confidences, class_ids, idxs))
 
-        return boxes, confidences, class_ids, idxs, inference_time
-
-    def _process_detections(self, outputs, width, height):
-        """Process raw YOLO outputs"""
-        boxes = []
-        confidences = []
-        class_ids = []
-
-        for output in outputs:
-            for detection in output:
-                scores = detection[5:]
-                class_id = np.argmax(scores)
-                confidence = scores[class_id]
-
-                if confidence > self.config.CONFIDENCE_THRESHOLD:
-                    box = detection[0:4] * np.array([width, height, width, height])
-                    centerX, centerY, w, h = box.astype("int")
-
-                    x = int(centerX - (w / 2))
-                    y = int(centerY - (h / 2))
+        return results, inference_time
 
-                    boxes.append([x, y, int(w), int(h)])
-                    confidences.append(float(confidence))
-                    class_ids.append(class_id)
+    @staticmethod
+    def _batch_item(output, index, batch_size):
+        """Rows belonging to one image of a batched YOLO output"""
+        if output.ndim == 3:
+            return output[index]
+        return output.reshape(batch_size, -1, output.shape[-1])[index]
 
-        return boxes, confidences, class_ids
+    def _process_detections(self, outputs, width, height, threshold=None):
+        """Process raw YOLO outputs"""
+        return decode_outputs(outputs, width, height, threshold or self.config.CONFIDENCE_THRESHOLD, self.classes)
 
     def draw_detections(self, frame, boxes, confidences, class_ids, idxs):
         """Draw bounding boxes and labels on frame"""
+        start = time.perf_counter()
         detected_objects = []
 
-        if len(idxs) > 0:
-            for i in idxs.flatten():
-                x, y, w, h = boxes[i]
-                class_id = class_ids[i]
-                confidence = confidences[i]
+        for i in idxs:
+            x, y, w, h = boxes[i].tolist()
+            class_id = class_ids[i]
+            confidence = confidences[i]
 
-                # Get color and label
-                color = [int(c) for c in self.colors[class_id]]
-                label = self.labels[class_id]
+            # Get color and label
+            color = [int(c) for c in self.colors[class_id]]
+            label = self.labels[class_id]
 
-                # Draw bounding box
-                cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+            # Draw bounding box
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
 
-                # Draw label
-                text = f"{label} {confidence:.2f}"
-                cv2.putText(frame, text, (x, y - 5),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+            # Draw label
+            text = f"{label} {confidence:.2f}"
+            cv2.putText(frame, text, (x, y - 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
 
-                detected_objects.append(label)
+            detected_objects.append(label)
 
+        if self.metrics is not None:
+            self.metrics.observe("draw", time.perf_counter() - start)
         return detected_objects
-
-    def should_announce(self, current_objects):
-        """Determine if current detections should be announced"""
-        if not current_objects:
-            return False
-
-        # Add to detection history
-        self.last_detections.append(set(current_objects))
-
-        # Need at least 3 frames of history
-        if len(self.last_detections) < 3:
-            return False
-
-        # Check if objects are stable across recent frames
-        recent_sets = list(self.last_detections)[-3:]
-        stable_objects = set.intersection(*recent_sets)
-
-        return len(stable_objects) > 0
-
-
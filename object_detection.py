@@ -6,6 +6,14 @@ import time
 from collections import deque
 import subprocess
 import platform
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "detection-system"))
+from announcer import Announcer  # noqa: E402
+from postprocess import batched_nms, decode_outputs  # noqa: E402
+from tracker import IoUTracker  # noqa: E402
+from speech import create_speech_engine  # noqa: E402
 
 
 # Optimized YOLO Configuration
@@ -45,7 +53,8 @@ class FastYOLODetector:
         self.nms_threshold = 0.4
 
         # Detection state
-        self.last_detections = deque(maxlen=10)  # Store recent detections
+        self.tracker = IoUTracker(iou_threshold=0.3, max_misses=2, min_hits=3)
+        self.announcer = Announcer(max_objects=3)
         self.detection_queue = queue.Queue(maxsize=2)  # Audio queue
         self.audio_thread = None
         self.running = True
@@ -58,6 +67,9 @@ class FastYOLODetector:
         np.random.seed(42)  # Consistent colors
         self.colors = np.random.randint(0, 255, size=(len(self.labels), 3), dtype="uint8")
 
+        # Persistent TTS with label clips prerendered in the background
+        self.speech_engine = create_speech_engine(self.labels)
+
         self.start_audio_thread()
 
     def start_audio_thread(self):
@@ -79,6 +91,13 @@ class FastYOLODetector:
 
     def speak_fast(self, text):
         """Optimized offline TTS"""
+        if self.speech_engine is not None:
+            try:
+                self.speech_engine.say(text)
+                return
+            except Exception:
+                self.speech_engine = None  # Fall back to one process per phrase
+
         try:
             system = platform.system().lower()
 
@@ -117,80 +136,50 @@ class FastYOLODetector:
         outputs = self.net.forward(self.output_layers)
         inference_time = time.time() - start_time
 
-        # Process detections
-        boxes = []
-        confidences = []
-        class_ids = []
+        # Process detections (vectorized over all output heads)
+        boxes, confidences, class_ids = self.decode_outputs(outputs, W, H)
 
-        for output in outputs:
-            for detection in output:
-                scores = detection[5:]
-                class_id = np.argmax(scores)
-                confidence = scores[class_id]
+        # Apply per-class NMS
+        idxs = self.batched_nms(boxes, confidences, class_ids)
 
-                if confidence > self.confidence_threshold:
-                    box = detection[0:4] * np.array([W, H, W, H])
-                    (centerX, centerY, width, height) = box.astype("int")
-
-                    x = int(centerX - (width / 2))
-                    y = int(centerY - (height / 2))
-
-                    boxes.append([x, y, int(width), int(height)])
-                    confidences.append(float(confidence))
-                    class_ids.append(class_id)
+        return boxes, confidences, class_ids, idxs, inference_time
 
-        # Apply NMS
-        if boxes:
-            idxs = cv2.dnn.NMSBoxes(boxes, confidences,
-                                    self.confidence_threshold, self.nms_threshold)
-        else:
-            idxs = []
+    def decode_outputs(self, outputs, W, H):
+        """Decode all YOLO heads at once into (N, 4) boxes, confidences, class ids"""
+        return decode_outputs(outputs, W, H, self.confidence_threshold)
 
-        return boxes, confidences, class_ids, idxs, inference_time
+    def batched_nms(self, boxes, confidences, class_ids):
+        """NMS per class, so overlapping boxes of different classes both survive"""
+        return batched_nms(boxes, confidences, class_ids, self.confidence_threshold, self.nms_threshold)
 
     def draw_detections(self, frame, boxes, confidences, class_ids, idxs):
         """Fast drawing of detections"""
         detected_objects = []
 
-        if len(idxs) > 0:
-            for i in idxs.flatten():
-                x, y, w, h = boxes[i]
-                class_id = class_ids[i]
-                confidence = confidences[i]
+        for i in idxs:
+            x, y, w, h = boxes[i].tolist()
+            class_id = class_ids[i]
+            confidence = confidences[i]
 
-                # Use pre-generated colors
-                color = [int(c) for c in self.colors[class_id]]
+            # Use pre-generated colors
+            color = [int(c) for c in self.colors[class_id]]
 
-                # Draw bounding box
-                cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+            # Draw bounding box
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
 
-                # Draw label (simplified)
-                label = self.labels[class_id]
-                text = f"{label} {confidence:.2f}"
-                cv2.putText(frame, text, (x, y - 5),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+            # Draw label (simplified)
+            label = self.labels[class_id]
+            text = f"{label} {confidence:.2f}"
+            cv2.putText(frame, text, (x, y - 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
 
-                detected_objects.append(label)
+            detected_objects.append(label)
 
         return detected_objects
 
-    def should_announce(self, current_objects):
-        """Smart announcement logic"""
-        if not current_objects:
-            return False
-
-        # Add to recent detections
-        self.last_detections.append(set(current_objects))
-
-        # Only announce if objects are consistently detected
-        if len(self.last_detections) < 3:
-            return False
-
-        # Check if objects are stable across recent frames
-        recent_sets = list(self.last_detections)[-3:]
-        intersection = set.intersection(*recent_sets)
-
-        return len(intersection) > 0
+    def objects_to_announce(self):
+        """Smart announcement logic: labels of stable tracks that just came into view"""
+        return self.announcer.update([self.labels[t.class_id] for t in self.tracker.stable()])
 
     def run(self):
         """Main detection loop"""
@@ -220,17 +209,23 @@ class FastYOLODetector:
                 # Process only every Nth frame for speed
                 if self.frame_count % self.process_every_n_frames == 0:
                     boxes, confidences, class_ids, idxs, inf_time = self.detect_objects(frame)
-                    detected_objects = self.draw_detections(frame, boxes, confidences, class_ids, idxs)
+                    self.tracker.update(boxes, confidences, class_ids, idxs)
 
                     # Smart audio announcement
-                    if self.should_announce(detected_objects):
-                        unique_objects = list(set(detected_objects))
-                        if unique_objects and not self.detection_queue.full():
-                            objects_text = ", ".join(unique_objects[:3])  # Limit to 3 objects
-                            try:
-                                self.detection_queue.put_nowait(f"Detected: {objects_text}")
-                            except queue.Full:
-                                pass
+                    unique_objects = self.objects_to_announce()
+                    if unique_objects and not self.detection_queue.full():
+                        objects_text = ", ".join(unique_objects[:3])  # Limit to 3 objects
+                        try:
+                            self.detection_queue.put_nowait(f"Detected: {objects_text}")
+                        except queue.Full:
+                            pass
+                else:
+                    # Skipped frame: move tracks forward instead of running the net
+                    self.tracker.predict()
+
+                # Draw tracked boxes on every frame
+                boxes, confidences, class_ids, idxs, _ = self.tracker.results()
+                detected_objects = self.draw_detections(frame, boxes, confidences, class_ids, idxs)
 
                 # Calculate and display FPS
                 fps_counter.append(time.time() - loop_start)
@@ -257,6 +252,8 @@ class FastYOLODetector:
         self.running = False
         if self.audio_thread and self.audio_thread.is_alive():
             self.audio_thread.join(timeout=1.0)
+        if self.speech_engine is not None:
+            self.speech_engine.close()
         cap.release()
         cv2.destroyAllWindows()
         print("Detection stopped.")
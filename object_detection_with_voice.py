@@ -1,7 +1,7 @@
 import cv2 # opencv
 import numpy as np
-from gtts import gTTS
 import os
+import sys
 
 # Load YOLO model
 weights_path = "yolo-coco/yolov3.weights"
@@ -20,29 +20,19 @@ with open(labels_path, "r") as f:
 # Initialize video capture
 cap = cv2.VideoCapture(0)
 
-# Function for text-to-speech
-import tempfile
-import pygame
-from gtts import gTTS
+# Shared decoding, and text-to-speech on a background worker with an on-disk clip cache
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "detection-system"))
+from postprocess import batched_nms, decode_outputs  # noqa: E402
+from voice_cache import AudioCache, VoiceWorker  # noqa: E402
 
-def speak(text):
-    try:
-        tts = gTTS(text=text, lang='en')
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-            temp_path = temp_file.name
-            tts.save(temp_path)
-
-        pygame.mixer.init()
-        pygame.mixer.music.load(temp_path)
-        pygame.mixer.music.play()
+tts_cache_dir = "tts-cache"
+tts_cache_max_bytes = 20 * 1024 * 1024
+voice = VoiceWorker(AudioCache(tts_cache_dir, tts_cache_max_bytes), lang='en')
 
-        while pygame.mixer.music.get_busy():
-            pass
 
-    except PermissionError as e:
-        print(f"Permission error: {e}")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+def speak(text):
+    """Queue text for playback without blocking the detection loop"""
+    voice.speak(text)
 
 
 # Detection Loop
@@ -56,33 +46,13 @@ while True:
     net.setInput(blob)
     outputs = net.forward(output_layers)
 
-    boxes = []
-    confidences = []
-    class_ids = []
-
-    for output in outputs:
-        for detection in output:
-            scores = detection[5:]
-            class_id = np.argmax(scores)
-            confidence = scores[class_id]
-
-            if confidence > 0.5:  # Threshold
-                box = detection[0:4] * np.array([W, H, W, H])
-                (centerX, centerY, width, height) = box.astype("int")
-
-                x = int(centerX - (width / 2))
-                y = int(centerY - (height / 2))
-
-                boxes.append([x, y, int(width), int(height)])
-                confidences.append(float(confidence))
-                class_ids.append(class_id)
-
-    idxs = cv2.dnn.NMSBoxes(boxes, confidences, 0.5, 0.4)
+    boxes, confidences, class_ids = decode_outputs(outputs, W, H, 0.5)
+    idxs = batched_nms(boxes, confidences, class_ids, 0.5, 0.4)
 
     if len(idxs) > 0:
         detected_objects = []
-        for i in idxs.flatten():
-            x, y, w, h = boxes[i]
+        for i in idxs:
+            x, y, w, h = boxes[i].tolist()
             color = [int(c) for c in np.random.randint(0, 255, size=(3,), dtype="uint8")]
             cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
             text = f"{labels[class_ids[i]]}: {confidences[i]:.2f}"
@@ -91,7 +61,7 @@ while True:
             detected_objects.append(labels[class_ids[i]])
 
         if detected_objects:
-            unique_objects = ", ".join(set(detected_objects))
+            unique_objects = ", ".join(sorted(set(detected_objects)))
             speak(f"I see: {unique_objects}")
 
     cv2.imshow("YOLO Object Detection", frame)
@@ -101,4 +71,6 @@ while True:
 
 cap.release()
 cv2.destroyAllWindows()
+voice.stop()
+print(voice.cache.summary())
 